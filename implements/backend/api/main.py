@@ -1,18 +1,30 @@
 import sys
 import os
+import json
+import asyncio
+import hashlib
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query
+from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 # 모듈 경로 추가 (backend 디렉토리 기준 실행 가정)
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
 from db.database import DatabaseConnection
-from db.managers import RepositoryManager, HistoryManager, SettingsManager
+from db.managers import (
+    RepositoryManager, HistoryManager, SettingsManager, add_history_listener, add_repository_listener,
+    select_resolution, bucket_start
+)
+from db.cache import ResultCache
 from core.worker import get_worker, start_midnight_scheduler
+from core.events import get_event_broker
+from core.downsample import downsample_points
+from core.aggregate import sum_datasets
 
 app = FastAPI(title="CodeMonitor API")
 
@@ -20,6 +32,8 @@ app = FastAPI(title="CodeMonitor API")
 async def startup_event():
     # 백그라운드 스케줄러 시작
     start_midnight_scheduler(DB_PATH)
+    # 이전 프로세스에서 중단된 백필은 체크포인트부터 이어서 실행
+    worker.resume_interrupted_tasks()
     print(f"[{datetime.now()}] Background Scheduler started.")
 
 # CORS 설정 (Vite 프론트엔드 연동)
@@ -31,11 +45,31 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 대량 시계열 응답 압축 (작은 응답은 압축 오버헤드가 더 크므로 제외)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # 의존성 주입용 DB 컨텍스트
 DB_PATH = os.environ.get("CODEMONITOR_DB", "codemonitor.db")
 db_conn = DatabaseConnection(DB_PATH)
 worker = get_worker(DB_PATH)
 
+# /api/stats, /api/summary 결과 캐시 (LRU): 키에 저장소별 history_version이 포함되며,
+# 워커가 히스토리를 기록하면 해당 저장소 항목을 즉시 제거하여 오래된 결과가 자리를 차지하지 않게 함
+stats_cache = ResultCache()
+add_history_listener(stats_cache.invalidate)
+
+# 상태 변경 푸시(SSE): 워커/요청에서 발생한 변경을 /api/events 구독자에게 전달하여 대시보드 폴링을 대체
+# - repo: 저장소 상태/마지막 스캔 시각 변경, 추가/삭제
+# - task: 작업 상태 전환과 진행률 (워커가 직접 발행)
+# - history: 저장소에 새 히스토리가 기록됨 (클라이언트는 since 커서로 증분 조회)
+# - settings: 전역 설정 변경
+event_broker = get_event_broker()
+add_history_listener(lambda repo_id: event_broker.publish("history", {"repo_id": repo_id}))
+add_repository_listener(lambda repo_id, changes: event_broker.publish("repo", {"repo_id": repo_id, **changes}))
+
+# 연결 유지용 주석 전송 간격 (프록시의 유휴 연결 종료 방지 및 끊긴 연결 감지)
+SSE_KEEPALIVE_SECONDS = 15
+
 def get_repo_manager():
     return RepositoryManager(db_conn)
 
@@ -45,6 +79,33 @@ def get_history_manager():
 def get_settings_manager():
     return SettingsManager(db_conn)
 
+# --- HTTP 캐싱 (ETag) ---
+
+def _digest(*parts) -> str:
+    return hashlib.blake2b(repr(parts).encode(), digest_size=12).hexdigest()
+
+def _make_etag(*parts) -> str:
+    """응답을 결정하는 값들(저장소별 history_version, 조회 조건 등)로 만든 weak ETag (gzip 여부와 무관)"""
+    return f'W/"{_digest(*parts)}"'
+
+def _not_modified(request: Request, etag: str) -> bool:
+    """If-None-Match가 현재 ETag와 일치하는지 확인 (weak 비교)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    current = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == current for tag in header.split(","))
+
+def _etag_response(request: Request, response: Response, etag: str) -> Optional[Response]:
+    """ETag 헤더를 설정하고, 클라이언트 캐시가 최신이면 본문 없는 304 응답을 반환합니다."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(request, etag):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
+
 # --- Models ---
 
 class RepoCreate(BaseModel):
@@ -52,6 +113,9 @@ class RepoCreate(BaseModel):
     path: str
     include_path: Optional[str] = None
 
+class RepoUpdate(BaseModel):
+    scan_interval_minutes: Optional[int] = None
+
 class SettingsUpdate(BaseModel):
     key: str
     value: str
@@ -59,9 +123,17 @@ class SettingsUpdate(BaseModel):
 # --- Routes ---
 
 @app.get("/api/repos")
-def list_repositories(repo_mgr: RepositoryManager = Depends(get_repo_manager)):
+def list_repositories(
+    request: Request,
+    response: Response,
+    repo_mgr: RepositoryManager = Depends(get_repo_manager)
+):
     """등록된 모든 저장소 목록과 상태 반환"""
     repos = repo_mgr.get_all_repositories()
+    # 상태/스캔 시각도 응답에 포함되므로 history_version만이 아닌 행 전체로 ETag 생성
+    not_modified = _etag_response(request, response, _make_etag("repos", [tuple(r.values()) for r in repos]))
+    if not_modified:
+        return not_modified
     return {"repositories": repos}
 
 @app.post("/api/repos")
@@ -90,10 +162,26 @@ def delete_repository(
     repo_id: int,
     repo_mgr: RepositoryManager = Depends(get_repo_manager)
 ):
-    """저장소 및 히스토리 삭제"""
+    """저장소 및 히스토리 삭제 (진행 중인 백필/동기화는 먼저 취소하고 기록이 끝날 때까지 대기)"""
+    worker.cancel_repo_tasks(repo_id)
     repo_mgr.delete_repository(repo_id)
     return {"message": "Repository and its history deleted."}
 
+@app.patch("/api/repos/{repo_id}")
+def update_repository(
+    repo_id: int,
+    update: RepoUpdate,
+    repo_mgr: RepositoryManager = Depends(get_repo_manager)
+):
+    """저장소 설정 변경: 주기 스캔 간격(분, null이면 자정 동기화만)"""
+    if not any(r['id'] == repo_id for r in repo_mgr.get_all_repositories()):
+        raise HTTPException(status_code=404, detail="Repository not found")
+    if update.scan_interval_minutes is not None and update.scan_interval_minutes < 1:
+        raise HTTPException(status_code=400, detail="scan_interval_minutes must be at least 1")
+
+    repo_mgr.set_scan_interval(repo_id, update.scan_interval_minutes)
+    return {"message": "Repository updated.", "repo_id": repo_id}
+
 @app.post("/api/repos/{repo_id}/sync")
 def sync_repository(
     repo_id: int,
@@ -106,22 +194,38 @@ def sync_repository(
     if not repo:
         raise HTTPException(status_code=404, detail="Repository not found")
 
-    # 워커에 동기화 작업 위임
-    worker.start_sync(repo_id, repo['path'], repo['include_path'])
+    # 워커 스케줄러에 동기화 작업 등록 (이미 대기 중이면 중복 등록하지 않음)
+    task_id = worker.start_sync(repo_id, repo['path'], repo['include_path'])
+    queued = task_id is not None
     
-    return {"message": "Sync started.", "repo_id": repo_id}
+    return {"message": "Sync started." if queued else "Sync already queued.", "repo_id": repo_id,
+            "queued": queued, "task_id": task_id}
 
 @app.get("/api/stats")
 def get_statistics(
+    request: Request,
+    response: Response,
     repo_ids: Optional[str] = Query(None, description="Comma-separated repo IDs or 'all'"),
     days: int = Query(30, description="Fetch history for the last N days"),
     start_date: Optional[str] = Query(None, description="Explicit start date (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Explicit end date (YYYY-MM-DD)"),
+    group_by: Optional[str] = Query(None, description="'language' for per-language LOC breakdown"),
+    resolution: Optional[str] = Query(None, description="'day', 'week' or 'month' (default: chosen by range)"),
+    max_points: Optional[int] = Query(None, ge=3, description="Downsample each dataset to at most N points (LTTB), e.g. chart pixel width"),
+    aggregate: bool = Query(False, description="Return a single summed series across the selected repositories"),
+    since: Optional[str] = Query(None, description="Cursor from a previous response; returns only points added or changed after it"),
     history_mgr: HistoryManager = Depends(get_history_manager),
     repo_mgr: RepositoryManager = Depends(get_repo_manager)
 ):
-    """그래프 렌더링을 위한 시계열 통계 데이터 반환"""
-    all_repos = {r['id']: r['name'] for r in repo_mgr.get_all_repositories()}
+    """
+    그래프 렌더링을 위한 시계열 통계 데이터 반환.
+    응답의 cursor를 since로 다시 보내면 증분 응답(incremental=true)을 받습니다. 증분 응답의 각 Dataset은
+    날짜(x의 YYYY-MM-DD)가 from 이후인 점들이므로, 클라이언트는 기존 점 중 해당 구간을 버리고 이어 붙이면 됩니다.
+    조회 조건이나 보정 상태(기준선, 체크포인트)가 커서 발급 시점과 다르면 전체 응답을 반환합니다.
+    """
+    repos = repo_mgr.get_all_repositories()
+    all_repos = {r['id']: r['name'] for r in repos}
+    versions = {r['id']: r['history_version'] for r in repos}
     
     target_ids = []
     if repo_ids == 'all' or not repo_ids:
@@ -132,6 +236,11 @@ def get_statistics(
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid repo_ids format")
 
+    if group_by not in (None, "language"):
+        raise HTTPException(status_code=400, detail="Invalid group_by value")
+    if resolution not in (None, "day", "week", "month"):
+        raise HTTPException(status_code=400, detail="Invalid resolution value")
+
     if start_date and end_date:
         start_str = f"{start_date} 00:00:00"
         end_str = f"{end_date} 23:59:59"
@@ -140,33 +249,237 @@ def get_statistics(
         start = now - timedelta(days=days)
         start_str = start.strftime("%Y-%m-%d 00:00:00")
         end_str = now.strftime("%Y-%m-%d 23:59:59")
+
+    # 증분 조회가 같은 버킷 기준을 쓰도록 해상도를 여기서 확정
+    resolution = resolution or select_resolution(start_str, end_str)
+
+    # 저장소별 history_version이 키에 포함되므로, 데이터가 바뀌면 ETag와 캐시 키가 함께 바뀜
+    repo_versions = tuple((rid, versions.get(rid)) for rid in sorted(set(target_ids)))
+    cache_key = ("stats", repo_versions, start_str, end_str, group_by, resolution, max_points, aggregate)
+    not_modified = _etag_response(request, response, _make_etag(*cache_key, since))
+    if not_modified:
+        return not_modified
+
+    # 언어별 통계는 증분 조회를 지원하지 않음 (항상 전체 응답)
+    if group_by == "language":
+        since = None
+        cursor = None
+    else:
+        # 커서는 데이터 조회 전에 발급해야 조회 도중 추가된 행을 다음 증분 조회에서 놓치지 않음
+        last_ids, offset_state = history_mgr.get_history_cursor(target_ids)
+        query_token = _digest(sorted(set(target_ids)), start_str, end_str, resolution, aggregate, offset_state)
+        cursor = "-".join(str(last_ids[rid]) for rid in sorted(last_ids)) + f".{query_token}"
+
+    since_ids = _parse_cursor(since, query_token, sorted(set(target_ids))) if since else None
+    if since_ids is not None:
+        return _incremental_stats(history_mgr, target_ids, all_repos, since_ids, cursor,
+                                  start_str, end_str, resolution, aggregate)
+
+    cached = stats_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = stats_cache.generation
     
-    raw_stats = history_mgr.get_stats(target_ids, start_str, end_str)
-    
-    # 프론트엔드가 사용하기 쉬운 형태로 변환 (Dataset 형태로 그룹화)
+    if group_by == "language":
+        datasets = _group_by_language(
+            history_mgr.get_language_stats(target_ids, start_str, end_str), all_repos, len(target_ids) > 1
+        )
+    else:
+        datasets = _group_by_repo(history_mgr.get_stats(target_ids, start_str, end_str, resolution), all_repos)
+
+    if aggregate:
+        datasets = [sum_datasets(datasets)]
+
+    result = {"datasets": _downsample(datasets, max_points), "cursor": cursor, "incremental": False}
+    stats_cache.put(cache_key, target_ids, result, generation)
+    return result
+
+def _parse_cursor(since: str, query_token: str, repo_ids: List[int]) -> Optional[Dict[int, int]]:
+    """
+    '<저장소별 history seq를 repo_id 순으로 '-'로 이은 값>.<조회 조건 토큰>' 형식의 커서를 해석.
+    현재 조회 조건과 다르면 None (전체 응답)
+    """
+    last_ids, _, token = since.partition(".")
+    seqs = last_ids.split("-")
+    if token != query_token or len(seqs) != len(repo_ids) or not all(seq.isdigit() for seq in seqs):
+        return None
+    return dict(zip(repo_ids, map(int, seqs)))
+
+def _incremental_stats(history_mgr: HistoryManager, target_ids: List[int], all_repos: dict, since_ids: Dict[int, int],
+                       cursor: str, start_str: str, end_str: str, resolution: str, aggregate: bool) -> dict:
+    """
+    저장소별 since seq 이후 추가된 행이 속한 가장 이른 버킷부터 끝까지의 점만 반환합니다.
+    버킷 값은 버킷의 마지막 커밋 기준이므로 그 이전 버킷들은 바뀌지 않습니다.
+    증분 응답은 다운샘플링하지 않습니다 (새로 추가되는 점은 소수).
+    """
+    changed_at = history_mgr.get_changed_since(target_ids, since_ids)
+    if changed_at is None:
+        return {"datasets": [], "cursor": cursor, "incremental": True, "from": None}
+
+    from_day = max(start_str[:10], bucket_start(changed_at, resolution))
+    if aggregate:
+        # 합산 시계열은 각 저장소의 직전 값을 이어 붙여(forward fill) 계산하므로 전체 구간으로 합산 후 잘라냄
+        total = sum_datasets(_group_by_repo(history_mgr.get_stats(target_ids, start_str, end_str, resolution), all_repos))
+        total["data"] = [p for p in total["data"] if p["x"][:10] >= from_day]
+        datasets = [total]
+    else:
+        datasets = _group_by_repo(
+            history_mgr.get_stats(target_ids, f"{from_day} 00:00:00", end_str, resolution), all_repos
+        )
+    return {"datasets": datasets, "cursor": cursor, "incremental": True, "from": from_day}
+
+@app.get("/api/summary")
+def get_summary(
+    request: Request,
+    response: Response,
+    history_mgr: HistoryManager = Depends(get_history_manager),
+    repo_mgr: RepositoryManager = Depends(get_repo_manager)
+):
+    """전체 저장소 수, 총 라인수, 최근 변화량(1/7/30일) 요약"""
+    repos = repo_mgr.get_all_repositories()
+    repo_ids = [r['id'] for r in repos]
+    today = datetime.now().date()
+
+    # 응답에 상태(status)도 포함되므로 history_version과 함께 키에 포함
+    repo_versions = tuple(sorted((r['id'], r['history_version'], r['status']) for r in repos))
+    cache_key = ("summary", repo_versions, today.isoformat())
+    not_modified = _etag_response(request, response, _make_etag(*cache_key))
+    if not_modified:
+        return not_modified
+
+    cached = stats_cache.get(cache_key)
+    if cached is not None:
+        return cached
+    generation = stats_cache.generation
+
+    periods = [1, 7, 30]
+    cutoffs = [today.isoformat()] + [(today - timedelta(days=d)).isoformat() for d in periods]
+    totals = history_mgr.get_totals_at(repo_ids, cutoffs)
+
+    repositories = []
+    for repo in repos:
+        current, *previous = totals.get(repo['id'], [None] * len(cutoffs))
+        repositories.append({
+            "repo_id": repo['id'],
+            "name": repo['name'],
+            "status": repo['status'],
+            "total_loc": current or 0,
+            "recent_changes": {
+                f"{d}d": (current or 0) - (prev or 0) for d, prev in zip(periods, previous)
+            }
+        })
+
+    result = {
+        "total_repos": len(repos),
+        "total_loc": sum(r['total_loc'] for r in repositories),
+        "recent_changes": {
+            f"{d}d": sum(r['recent_changes'][f"{d}d"] for r in repositories) for d in periods
+        },
+        "repositories": repositories
+    }
+    stats_cache.put(cache_key, repo_ids, result, generation)
+    return result
+
+def _downsample(datasets: List[dict], max_points: Optional[int]) -> List[dict]:
+    """max_points가 지정되면 각 Dataset을 형태를 보존하는 LTTB로 다운샘플링"""
+    if max_points:
+        for dataset in datasets:
+            dataset["data"] = downsample_points(dataset["data"], max_points)
+    return datasets
+
+def _group_by_repo(raw_stats: List[dict], all_repos: dict) -> List[dict]:
+    """저장소별 통계를 프론트엔드가 사용하기 쉬운 형태(저장소 단위 Dataset)로 변환"""
     datasets = {}
     for stat in raw_stats:
         rid = stat['repo_id']
         repo_name = all_repos.get(rid, f"Repo {rid}")
-        
+
         if repo_name not in datasets:
             datasets[repo_name] = {"label": repo_name, "data": []}
-            
+
         datasets[repo_name]["data"].append({
             "x": stat['timestamp'],
             "y": stat['total_loc']
         })
+    return list(datasets.values())
 
-    return {"datasets": list(datasets.values())}
+def _group_by_language(raw_stats: List[dict], all_repos: dict, multi_repo: bool) -> List[dict]:
+    """언어별 통계를 (저장소, 언어) 단위 Dataset으로 변환"""
+    datasets = {}
+    for stat in raw_stats:
+        rid = stat['repo_id']
+        language = stat['language']
+        label = f"{all_repos.get(rid, f'Repo {rid}')} · {language}" if multi_repo else language
+
+        if label not in datasets:
+            datasets[label] = {"label": label, "language": language, "data": []}
+
+        datasets[label]["data"].append({
+            "x": stat['timestamp'],
+            "y": stat['total_loc']
+        })
+    return list(datasets.values())
+
+@app.get("/api/events")
+async def stream_events(request: Request):
+    """
+    Server-Sent Events 스트림. 'event: <type>' / 'data: <json>' 형식으로 repo, task, history, settings 이벤트를 보냅니다.
+    연결이 (재)수립되면 'hello' 이벤트를 먼저 보내므로, 클라이언트는 이때 한 번 전체를 조회하면 됩니다.
+    """
+    queue = event_broker.subscribe()
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\nevent: hello\ndata: {}\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event['data'])}\n\n"
+        finally:
+            event_broker.unsubscribe(queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 @app.get("/api/tasks/{task_id}")
 def get_task_status(task_id: str):
-    """특정 작업(백필) 상태 조회"""
+    """특정 작업(백필/동기화) 상태 조회"""
     status = worker.get_task_status(task_id)
     if not status:
         raise HTTPException(status_code=404, detail="Task not found")
     return status
 
+def _control_task(action, task_id: str):
+    """작업 제어 공통 처리: 없는 작업은 404, 현재 상태에서 할 수 없는 요청은 409"""
+    try:
+        status = action(task_id)
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if not status:
+        raise HTTPException(status_code=404, detail="Task not found")
+    return status
+
+@app.post("/api/tasks/{task_id}/cancel")
+def cancel_task(task_id: str):
+    """대기/실행/일시정지 중인 작업 취소 (이미 기록된 히스토리는 유지)"""
+    return _control_task(worker.cancel_task, task_id)
+
+@app.post("/api/tasks/{task_id}/pause")
+def pause_task(task_id: str):
+    """작업 일시정지: 실행 중이면 다음 커밋 경계에서 git 프로세스를 종료하고 체크포인트를 남김"""
+    return _control_task(worker.pause_task, task_id)
+
+@app.post("/api/tasks/{task_id}/resume")
+def resume_task(task_id: str):
+    """일시정지된 작업을 마지막 체크포인트부터 다시 실행"""
+    return _control_task(worker.resume_task, task_id)
+
 @app.get("/api/settings")
 def get_settings(settings_mgr: SettingsManager = Depends(get_settings_manager)):
     """전역 설정 반환 (theme, comparison_start, comparison_end 등)"""
@@ -180,6 +493,9 @@ def update_settings(
 ):
     """설정값 업데이트 (Upsert)"""
     settings_mgr.set_value(setting.key, setting.value)
+    # 저장 모드 등 조회 결과에 영향을 주는 설정이 있으므로 캐시 전체 무효화
+    stats_cache.clear()
+    event_broker.publish("settings", {"key": setting.key, "value": setting.value})
     return {"message": "Setting updated"}
 
 if __name__ == "__main__":
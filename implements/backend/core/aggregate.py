@@ -0,0 +1,34 @@
+from typing import List, Dict, Any
+
+import numpy as np
+
+def sum_datasets(datasets: List[Dict[str, Any]], label: str = "All Repositories (Total)") -> Dict[str, Any]:
+    """
+    여러 저장소의 시계열을 공통 날짜 축(모든 데이터셋 날짜의 합집합)에 맞춰 합산합니다.
+    각 저장소는 해당 날짜 이전의 마지막 값으로 채우고(forward-fill), 첫 기록 이전은 0으로 봅니다.
+    """
+    series = []
+    for dataset in datasets:
+        if not dataset["data"]:
+            continue
+        days = np.asarray([point["x"][:10] for point in dataset["data"]])
+        values = np.asarray([point["y"] for point in dataset["data"]], dtype=np.int64)
+        # 같은 날짜가 여러 번 있으면 마지막 값 사용
+        order = np.argsort(days, kind="stable")
+        days, values = days[order], values[order]
+        series.append((days, values))
+
+    if not series:
+        return {"label": label, "data": []}
+
+    grid = np.unique(np.concatenate([days for days, _ in series]))
+    total = np.zeros(len(grid), dtype=np.int64)
+    for days, values in series:
+        # grid의 각 날짜 이하인 마지막 관측 위치 (없으면 -1)
+        idx = np.searchsorted(days, grid, side="right") - 1
+        total += np.where(idx >= 0, values[np.maximum(idx, 0)], 0)
+
+    return {
+        "label": label,
+        "data": [{"x": str(day), "y": int(value)} for day, value in zip(grid, total)]
+    }
@@ -0,0 +1,60 @@
+from datetime import datetime
+from typing import List, Dict, Any
+
+import numpy as np
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링. 선택된 점들의 인덱스를 반환합니다.
+    첫 점과 마지막 점은 항상 유지되며, 나머지는 (threshold - 2)개 버킷에서
+    직전 선택점과 다음 버킷 평균점으로 만든 삼각형 넓이가 가장 큰 점을 하나씩 고릅니다.
+    버킷 반복은 출력 점 수만큼만 돌고, 버킷 내부 계산은 NumPy로 벡터화되어 있습니다.
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # 버킷 경계 (첫/마지막 점 제외한 구간을 threshold - 2개로 균등 분할)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # 다음 버킷 평균점 계산을 누적합으로 한 번에 준비
+    cum_x = np.concatenate(([0.0], np.cumsum(x, dtype=np.float64)))
+    cum_y = np.concatenate(([0.0], np.cumsum(y, dtype=np.float64)))
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    prev = 0
+
+    for b in range(threshold - 2):
+        start, end = edges[b], edges[b + 1]
+        if b + 2 < len(edges):
+            next_start, next_end = edges[b + 1], edges[b + 2]
+        else:
+            next_start, next_end = n - 1, n
+        count = max(1, next_end - next_start)
+        avg_x = (cum_x[next_end] - cum_x[next_start]) / count
+        avg_y = (cum_y[next_end] - cum_y[next_start]) / count
+
+        if end <= start:
+            end = start + 1
+        px, py = x[prev], y[prev]
+        areas = np.abs((px - avg_x) * (y[start:end] - py) - (px - x[start:end]) * (avg_y - py))
+        prev = start + int(np.argmax(areas))
+        selected[b + 1] = prev
+
+    return selected
+
+def _to_epoch(timestamp: str) -> float:
+    # 'YYYY-MM-DD HH:MM:SS(+ZZZZ)' 또는 'YYYY-MM-DD'(합산 데이터) 형식. 모양 보존용이므로 시간대 차이는 무시
+    if len(timestamp) < 19:
+        return datetime.strptime(timestamp[:10], "%Y-%m-%d").timestamp()
+    return datetime.strptime(timestamp[:19], "%Y-%m-%d %H:%M:%S").timestamp()
+
+def downsample_points(points: List[Dict[str, Any]], max_points: int) -> List[Dict[str, Any]]:
+    """{'x': timestamp, 'y': value} 형태의 차트 데이터를 최대 max_points개로 줄입니다."""
+    if max_points is None or len(points) <= max_points or max_points < 3:
+        return points
+
+    x = np.fromiter((_to_epoch(p['x']) for p in points), dtype=np.float64, count=len(points))
+    y = np.fromiter((p['y'] for p in points), dtype=np.float64, count=len(points))
+    return [points[i] for i in lttb_indices(x, y, max_points)]
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+from typing import Any, Dict, List, Tuple
+
+# 구독자(SSE 연결)별 대기 이벤트 수 한도. 넘치면 쌓인 이벤트를 버리고 'resync' 하나로 대체
+SUBSCRIBER_QUEUE_SIZE = 256
+
+class EventBroker:
+    """
+    워커 스레드/API 요청에서 발생한 이벤트를 SSE 연결(asyncio)들로 전달하는 스레드 안전 pub/sub.
+    이벤트는 {'type': str, 'data': dict} 형태이며, 각 연결의 이벤트 루프에서 큐에 넣어집니다.
+    느린 구독자의 큐가 가득 차면 'resync' 이벤트로 대체하여 클라이언트가 전체를 다시 조회하게 합니다.
+    """
+
+    def __init__(self, queue_size: int = SUBSCRIBER_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self._lock = threading.Lock()
+
+    def subscribe(self) -> asyncio.Queue:
+        """현재 실행 중인 이벤트 루프에서 이벤트를 받을 큐를 등록합니다 (async 함수 안에서 호출)."""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.append((asyncio.get_running_loop(), queue))
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue):
+        with self._lock:
+            self._subscribers = [(loop, q) for loop, q in self._subscribers if q is not queue]
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event_type: str, data: Dict[str, Any]):
+        """모든 구독자에게 이벤트를 보냅니다. 어느 스레드에서나 호출할 수 있으며 블록되지 않습니다."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        event = {"type": event_type, "data": data}
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(self._deliver, queue, event)
+            except RuntimeError:
+                # 이벤트 루프가 이미 종료됨 (연결 정리 전)
+                pass
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: Dict[str, Any]):
+        try:
+            queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait({"type": "resync", "data": {}})
+
+_broker = EventBroker()
+
+def get_event_broker() -> EventBroker:
+    """프로세스 전역 이벤트 브로커 (워커와 API 서버가 같은 프로세스에서 공유)"""
+    return _broker
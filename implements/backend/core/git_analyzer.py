@@ -1,7 +1,109 @@
 import subprocess
-import re
+import sys
+import os
+import time
 from datetime import datetime
-from typing import Iterator, Dict, Optional
+from collections import deque
+from typing import Iterator, Dict, Optional, List, Tuple
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from core.languages import classify_path
+from db.numstat_cache import NumstatCache
+
+# git log 출력 파이프에서 한 번에 읽어들이는 바이트 수
+READ_CHUNK_SIZE = 1 << 20
+
+# numstat 캐시 사용 시 한 번에 조회하고, 없는 커밋을 git 한 번으로 채우는 커밋 수
+CACHE_FILL_CHUNK = 1000
+
+# include_path 접두사 라우팅에서 지원하지 않는 pathspec (glob, magic signature)
+PATHSPEC_SPECIAL_CHARS = set("*?[:")
+
+def normalize_include_path(include_path: Optional[str]) -> Optional[str]:
+    """
+    include_path를 디렉터리/파일 접두사로 정규화합니다 ('./a/b/' -> 'a/b', 빈 값은 None = 저장소 전체).
+    glob 등 접두사로 해석할 수 없는 pathspec이면 ValueError를 발생시킵니다.
+    """
+    if not include_path:
+        return None
+    path = include_path.strip()
+    while path.startswith("./"):
+        path = path[2:]
+    path = path.rstrip("/")
+    if PATHSPEC_SPECIAL_CHARS & set(path):
+        raise ValueError(f"include_path is not a plain path: {include_path}")
+    return path or None
+
+def merge_commit_orders(orders: List[List[str]]) -> List[str]:
+    """
+    등록별 커밋 순서(rev-list --reverse) 목록을 각 목록의 순서를 모두 지키는 하나의 순서로 합칩니다.
+    같은 히스토리에서 나온 목록은 서로 모순되지 않으므로 위상 정렬 결과를 그대로 쓰고,
+    (이론상) 모순이 있으면 남은 커밋 중 먼저 등장한 것부터 내보냅니다.
+    """
+    if len(orders) == 1:
+        return list(orders[0])
+    first_seen: Dict[str, int] = {}
+    successors: Dict[str, List[str]] = {}
+    indegree: Dict[str, int] = {}
+    for order in orders:
+        for position, commit_hash in enumerate(order):
+            first_seen.setdefault(commit_hash, len(first_seen))
+            indegree.setdefault(commit_hash, 0)
+            if position:
+                successors.setdefault(order[position - 1], []).append(commit_hash)
+                indegree[commit_hash] += 1
+
+    merged: List[str] = []
+    emitted = set()
+    ready = deque(h for h in first_seen if indegree[h] == 0)
+    remaining = iter(first_seen)
+    while len(merged) < len(first_seen):
+        if not ready:
+            ready.append(next(h for h in remaining if h not in emitted))
+        commit_hash = ready.popleft()
+        if commit_hash in emitted:
+            continue
+        emitted.add(commit_hash)
+        merged.append(commit_hash)
+        for successor in successors.get(commit_hash, ()):
+            indegree[successor] -= 1
+            if indegree[successor] == 0 and successor not in emitted:
+                ready.append(successor)
+    return merged
+
+class CommitRecord:
+    """
+    커밋 하나의 라인수 증감 정보. 대량 백필 시 커밋마다 dict를 만드는 비용을 줄이기 위해
+    __slots__를 사용하며, 기존 코드와의 호환을 위해 commit['hash'] 형태의 접근도 지원합니다.
+    """
+    __slots__ = ("hash", "date", "insertions", "deletions", "languages", "parts")
+
+    def __init__(self, hash: str, date: str, insertions: int = 0, deletions: int = 0,
+                 languages: Optional[Dict[str, int]] = None):
+        self.hash = hash
+        self.date = date
+        self.insertions = insertions
+        self.deletions = deletions
+        # 언어별 순증감 (insertions - deletions). track_languages가 꺼져 있으면 None
+        self.languages = languages
+        # 여러 include_path 라우팅 분석(get_routed_commits_for_hashes)에서 경로 인덱스별 증감. 그 외에는 None
+        self.parts: Optional[Dict[int, "CommitRecord"]] = None
+
+    def __getitem__(self, key: str):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def as_tuple(self) -> tuple:
+        return (self.hash, self.date, self.insertions, self.deletions, self.languages)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CommitRecord) and self.as_tuple() == other.as_tuple()
+
+    def __repr__(self) -> str:
+        return f"CommitRecord({self.hash[:8]}, {self.date}, +{self.insertions}, -{self.deletions})"
 
 class GitAnalyzer:
     """
@@ -9,16 +111,36 @@ class GitAnalyzer:
     대규모 저장소 지원을 위해 subprocess.Popen과 제너레이터를 사용합니다.
     """
 
-    def __init__(self, repo_path: str, include_path: Optional[str] = None):
+    def __init__(self, repo_path: str, include_path: Optional[str] = None, track_languages: bool = False,
+                 timings: Optional[Dict[str, float]] = None, cache: Optional[NumstatCache] = None):
         self.repo_path = repo_path
         self.include_path = include_path
+        # True이면 numstat 경로를 언어별로 분류하여 CommitRecord.languages에 순증감을 집계
+        self.track_languages = track_languages
+        # 지정하면 git 출력을 기다린 시간(초)을 timings['git']에 누적 (작업 단계별 소요 시간 보고용)
+        self.timings = timings
+        # 지정하면 커밋 분석 시 캐시에 있는 커밋은 git 없이 캐시 항목을 include_path로 걸러 사용하고,
+        # 없는 커밋만 git으로 분석해 캐시에 채움. 접두사로 해석할 수 없는 include_path(glob 등)는 캐시를 쓰지 않음
+        self.cache = cache
+        self._cache_route: Optional[Tuple[bytes, bytes]] = None
+        if cache is not None:
+            try:
+                prefix = normalize_include_path(include_path)
+            except ValueError:
+                self.cache = None
+            else:
+                self._cache_route = None if prefix is None else (prefix.encode(), prefix.encode() + b"/")
 
-    def get_commits_generator(self, since_hash: Optional[str] = None) -> Iterator[Dict]:
+    def get_commits_generator(self, since_hash: Optional[str] = None) -> Iterator[CommitRecord]:
         """
         저장소의 커밋 정보를 추출하는 제너레이터.
         since_hash가 있으면 해당 커밋 이후부터(exclusive), 없으면 처음부터 최신 커밋까지 추출.
-        수행 명령어: git log [since_hash..HEAD] --reverse --numstat --pretty=format:"commit:%H author_date:%ai"
+        수행 명령어: git log [since_hash..HEAD] --reverse -z --numstat --pretty=format:"commit:%H author_date:%ai"
+        (캐시 사용 시: git rev-list로 커밋 목록을 구한 뒤 캐시에 없는 커밋만 분석)
         """
+        if self.cache is not None:
+            return self._iter_cached(self.get_commit_hashes(since_hash))
+
         range_spec = f"{since_hash}..HEAD" if since_hash else "--reverse"
         
         cmd = ["git", "log"]
@@ -30,6 +152,7 @@ class GitAnalyzer:
             cmd.append("--reverse")
             
         cmd.extend([
+            "-z",
             "--numstat", 
             "--pretty=format:commit:%H author_date:%ai"
         ])
@@ -37,62 +160,306 @@ class GitAnalyzer:
         if self.include_path:
             cmd.extend(["--", self.include_path])
 
+        return self._parse_numstat_log(cmd)
+
+    def get_commit_hashes(self, since_hash: Optional[str] = None) -> List[str]:
+        """
+        git log --reverse와 동일한 순서로 (include_path 기준) 커밋 해시 목록을 반환합니다.
+        병렬 백필 시 커밋 범위를 샤드로 나누는 경계로, 여러 include_path를 한 번에 분석할 때는 등록별 커밋 집합으로 사용됩니다.
+        since_hash가 있으면 그 이후 커밋만 반환합니다 (exclusive).
+        수행 명령어: git rev-list --reverse [since_hash..]HEAD [-- include_path]
+        """
+        cmd = ["git", "rev-list", "--reverse", f"{since_hash}..HEAD" if since_hash else "HEAD"]
+        if self.include_path:
+            cmd.extend(["--", self.include_path])
+
+        try:
+            result = subprocess.run(
+                cmd,
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except subprocess.CalledProcessError:
+            # 커밋이 없는 빈 저장소
+            return []
+        return result.stdout.split()
+
+    def count_commits(self, ref: str = "HEAD") -> int:
+        """
+        백필할 커밋 수를 numstat 분석 없이 미리 셉니다 (진행률/예상 시간 계산용).
+        수행 명령어: git rev-list --count HEAD [-- include_path]
+        """
+        cmd = ["git", "rev-list", "--count", ref]
+        if self.include_path:
+            cmd.extend(["--", self.include_path])
+        try:
+            result = subprocess.run(cmd, cwd=self.repo_path, capture_output=True, text=True, check=True)
+        except subprocess.CalledProcessError:
+            return 0
+        return int(result.stdout.strip() or 0)
+
+    def get_commits_for_hashes(self, hashes: List[str]) -> Iterator[CommitRecord]:
+        """
+        지정한 커밋들만 주어진 순서 그대로 분석하는 제너레이터 (병렬 백필의 샤드 단위 처리용).
+        수행 명령어: git log --no-walk=unsorted --stdin -z --numstat ... [-- include_path]
+        """
+        if self.cache is not None:
+            return self._iter_cached(hashes)
+
+        cmd = [
+            "git", "log", "--no-walk=unsorted", "--stdin",
+            "-z", "--numstat",
+            "--pretty=format:commit:%H author_date:%ai"
+        ]
+        if self.include_path:
+            cmd.extend(["--", self.include_path])
+
+        return self._parse_numstat_log(cmd, stdin_data="\n".join(hashes) + "\n")
+
+    def get_routed_commits_for_hashes(self, hashes: List[str],
+                                      include_paths: List[Optional[str]]) -> Iterator[CommitRecord]:
+        """
+        같은 저장소의 여러 include_path(등록)를 numstat 한 번으로 분석하는 제너레이터.
+        include_paths 전체를 덮는 pathspec으로 지정한 커밋들을 순서대로 분석하고, 파일 항목마다 그 경로를 포함하는
+        모든 include_path에 증감을 더해 CommitRecord.parts[인덱스]로 돌려줍니다 (변경이 없는 인덱스는 빠짐).
+        include_path는 normalize_include_path로 정규화된 접두사여야 하며 None은 저장소 전체입니다.
+        이름 변경을 경로 간 이동으로 나누어 세기 위해 --no-renames로 분석합니다 (순증감은 동일).
+        수행 명령어: git log --no-walk=unsorted --stdin -z --numstat --no-renames ... [-- include_path...]
+        """
+        cmd = [
+            "git", "log", "--no-walk=unsorted", "--stdin",
+            "-z", "--numstat", "--no-renames",
+            "--pretty=format:commit:%H author_date:%ai"
+        ]
+        if None not in include_paths:
+            cmd.append("--")
+            cmd.extend(dict.fromkeys(include_paths))
+        routes = [None if path is None else (path.encode(), path.encode() + b"/") for path in include_paths]
+        if self.cache is not None:
+            return self._iter_cached(hashes, routes)
+
+        return self._parse_numstat_log(cmd, stdin_data="\n".join(hashes) + "\n", routes=routes)
+
+    def _iter_cached(self, hashes: List[str],
+                     routes: Optional[List[Optional[Tuple[bytes, bytes]]]] = None) -> Iterator[CommitRecord]:
+        """
+        캐시를 거쳐 hashes 순서대로 CommitRecord를 만드는 제너레이터.
+        CACHE_FILL_CHUNK개씩 캐시를 조회하고, 없는 커밋만 _fetch_numstat으로 분석해 캐시에 기록한 뒤 사용합니다.
+        git이 일부 커밋을 분석하지 못하면 커밋을 빠뜨린 채 누적하지 않도록 RuntimeError를 발생시킵니다.
+        """
+        for start in range(0, len(hashes), CACHE_FILL_CHUNK):
+            chunk = hashes[start:start + CACHE_FILL_CHUNK]
+            found = self.cache.get_many(chunk)
+            missing = [commit_hash for commit_hash in chunk if commit_hash not in found]
+            if missing:
+                fetched = self._fetch_numstat(missing)
+                lost = [commit_hash for commit_hash in missing if commit_hash not in fetched]
+                if lost:
+                    raise RuntimeError(f"git numstat returned no data for {len(lost)} commits (first: {lost[0]})")
+                self.cache.put_many(fetched)
+                found.update(fetched)
+            for commit_hash in chunk:
+                author_date, entries = found[commit_hash]
+                yield self._cached_record(commit_hash, author_date, entries, routes)
+
+    def _fetch_numstat(self, hashes: List[str]) -> Dict[str, Tuple[str, bytes]]:
+        """
+        캐시에 넣을 커밋들의 저장소 전체 numstat을 분석합니다. {해시: (author_date, NUL로 이은 항목 바이트)}
+        같은 커밋을 어떤 include_path로든 재사용할 수 있도록 pathspec 없이, 이름 변경은 경로별로 나눠(--no-renames) 기록합니다.
+        git이 실패하면(없는 커밋 객체, 락 충돌 등) CalledProcessError를 발생시킵니다.
+        수행 명령어: git log --no-walk=unsorted --stdin -z --numstat --no-renames --pretty=format:"commit:%H author_date:%ai"
+        """
+        cmd = [
+            "git", "log", "--no-walk=unsorted", "--stdin",
+            "-z", "--numstat", "--no-renames",
+            "--pretty=format:commit:%H author_date:%ai"
+        ]
+        started = time.perf_counter()
+        result = subprocess.run(cmd, cwd=self.repo_path, input=("\n".join(hashes) + "\n").encode(),
+                                capture_output=True, check=True)
+        if self.timings is not None:
+            self.timings["git"] = self.timings.get("git", 0.0) + time.perf_counter() - started
+
+        commits: Dict[str, Tuple[str, List[bytes]]] = {}
+        entries: Optional[List[bytes]] = None
+        for token in result.stdout.split(b"\0"):
+            if token.startswith(b"commit:"):
+                header, _, token = token.partition(b"\n")
+                commit_hash, _, date_str = header[7:].partition(b" author_date:")
+                entries = []
+                commits[commit_hash.decode()] = (date_str.decode(), entries)
+            if token and entries is not None:
+                entries.append(token)
+        return {commit_hash: (date, b"\0".join(items)) for commit_hash, (date, items) in commits.items()}
+
+    def _cached_record(self, commit_hash: str, author_date: str, entries: bytes,
+                       routes: Optional[List[Optional[Tuple[bytes, bytes]]]]) -> CommitRecord:
+        """캐시 항목을 include_path(또는 routes)로 걸러 git 분석과 같은 형태의 CommitRecord로 만듭니다."""
+        track_languages = self.track_languages and routes is None
+        commit = CommitRecord(commit_hash, author_date, 0, 0, {} if track_languages else None)
+        if routes is not None:
+            commit.parts = {}
+        if not entries:
+            return commit
+
+        route = self._cache_route
+        for token in entries.split(b"\0"):
+            added, deleted, path = token.split(b"\t", 2)
+            if route is not None and path != route[0] and not path.startswith(route[1]):
+                continue
+            added = 0 if added == b"-" else int(added)
+            deleted = 0 if deleted == b"-" else int(deleted)
+            commit.insertions += added
+            commit.deletions += deleted
+            if routes is not None:
+                self._route_entry(commit, routes, path, added, deleted)
+            elif track_languages and added != deleted:
+                language = classify_path(path)
+                languages = commit.languages
+                languages[language] = languages.get(language, 0) + added - deleted
+        return commit
+
+    def _route_entry(self, commit: CommitRecord, routes: List[Optional[Tuple[bytes, bytes]]],
+                     path: bytes, added: int, deleted: int):
+        """numstat 항목 하나를 경로를 포함하는 모든 include_path의 부분 레코드에 더합니다."""
+        language = None
+        for index, route in enumerate(routes):
+            if route is not None and path != route[0] and not path.startswith(route[1]):
+                continue
+            part = commit.parts.get(index)
+            if part is None:
+                part = commit.parts[index] = CommitRecord(
+                    commit.hash, commit.date, 0, 0, {} if self.track_languages else None
+                )
+            part.insertions += added
+            part.deletions += deleted
+            if self.track_languages and added != deleted:
+                if language is None:
+                    language = classify_path(path)
+                part.languages[language] = part.languages.get(language, 0) + added - deleted
+
+    def _parse_numstat_log(self, cmd: List[str], stdin_data: Optional[str] = None,
+                           routes: Optional[List[Optional[Tuple[bytes, bytes]]]] = None) -> Iterator[CommitRecord]:
+        """
+        git log -z --numstat 출력을 커밋 단위 CommitRecord로 파싱하는 공통 루틴.
+        정규식/라인 버퍼링 없이 큰 바이너리 청크를 NUL 기준으로 토큰화합니다.
+
+        -z 출력 토큰 규칙:
+        - 'commit:HASH author_date:DATE' 헤더 (numstat이 이어지면 '\n' 뒤에 첫 항목이 붙음)
+        - 'added\tdeleted\tpath' 항목 (바이너리는 '-')
+        - 이름 변경은 'added\tdeleted\t' 뒤에 이전 경로, 새 경로 토큰 2개가 따로 옴
+        - 커밋 사이에는 빈 토큰
+        routes가 있으면 항목을 언어별 집계 대신 _route_entry로 include_path별 부분 레코드(parts)에 나눠 담습니다.
+        """
         process = subprocess.Popen(
-            cmd, 
-            cwd=self.repo_path, 
-            stdout=subprocess.PIPE, 
-            stderr=subprocess.PIPE, 
-            text=True,
-            bufsize=1  # Line buffered
+            cmd,
+            cwd=self.repo_path,
+            stdin=subprocess.PIPE if stdin_data is not None else None,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=READ_CHUNK_SIZE
         )
 
+        # --stdin 사용 시 git은 출력 전에 입력을 모두 읽으므로 먼저 전부 기록 후 닫음
+        if stdin_data is not None:
+            process.stdin.write(stdin_data.encode())
+            process.stdin.close()
+
         current_commit = None
+        skip_paths = 0  # 이름 변경 항목 뒤에 따라오는 경로 토큰 수
+        rename_delta = 0  # 이름 변경 항목의 순증감 (새 경로 토큰을 만나면 언어에 반영)
+        rename_counts = (0, 0)  # 라우팅 시 새 경로 토큰에 배정할 이름 변경 항목의 (added, deleted)
+        track_languages = self.track_languages and routes is None
+        carry = b""
 
+        timings = self.timings
+        chunk = b""
         try:
-            for line in process.stdout:
-                line = line.strip()
-                if not line:
-                    continue
-
-                # 새로운 커밋 헤더 시작
-                if line.startswith("commit:"):
-                    if current_commit:
-                        yield current_commit
-                    
-                    # commit:HASH author_date:YYYY-MM-DD HH:MM:SS +ZZZZ
-                    parts = line.split(" author_date:")
-                    commit_hash = parts[0].replace("commit:", "").strip()
-                    date_str = parts[1].strip()
-                    
-                    current_commit = {
-                        "hash": commit_hash,
-                        "date": date_str,
-                        "insertions": 0,
-                        "deletions": 0
-                    }
-                
-                # numstat 라인 파싱 (added deleted path)
-                elif current_commit and re.match(r'^(\d+|-)\s+(\d+|-)\s+.*', line):
-                    parts = line.split()
-                    if len(parts) >= 2:
-                        added = 0 if parts[0] == "-" else int(parts[0])
-                        deleted = 0 if parts[1] == "-" else int(parts[1])
-                        current_commit["insertions"] += added
-                        current_commit["deletions"] += deleted
+            while True:
+                if timings is not None:
+                    wait_started = time.perf_counter()
+                    chunk = process.stdout.read1(READ_CHUNK_SIZE)
+                    timings["git"] = timings.get("git", 0.0) + time.perf_counter() - wait_started
+                else:
+                    chunk = process.stdout.read1(READ_CHUNK_SIZE)
+                if chunk:
+                    tokens = (carry + chunk).split(b"\0")
+                    # 마지막 토큰은 다음 청크와 이어질 수 있으므로 보류
+                    carry = tokens.pop()
+                elif carry:
+                    # 출력 끝: 보류한 마지막 토큰도 처리 (numstat이 없는 병합/빈 커밋이 마지막이면 헤더만 남음)
+                    tokens, carry = [carry], b""
+                else:
+                    break
+
+                for token in tokens:
+                    if skip_paths:
+                        skip_paths -= 1
+                        if routes is not None and not skip_paths:
+                            self._route_entry(current_commit, routes, token, *rename_counts)
+                        elif track_languages and not skip_paths and rename_delta:
+                            language = classify_path(token)
+                            languages = current_commit.languages
+                            languages[language] = languages.get(language, 0) + rename_delta
+                        continue
+                    if not token:
+                        continue
+
+                    if token.startswith(b"commit:"):
+                        if current_commit:
+                            yield current_commit
+
+                        header, _, token = token.partition(b"\n")
+                        commit_hash, _, date_str = header[7:].partition(b" author_date:")
+                        current_commit = CommitRecord(
+                            commit_hash.decode(), date_str.decode(), 0, 0,
+                            {} if track_languages else None
+                        )
+                        if routes is not None:
+                            current_commit.parts = {}
+                        if not token:
+                            continue
+
+                    if current_commit is None:
+                        continue
+
+                    # numstat 항목 (added deleted path)
+                    added, deleted, path = token.split(b"\t", 2)
+                    added = 0 if added == b"-" else int(added)
+                    deleted = 0 if deleted == b"-" else int(deleted)
+                    current_commit.insertions += added
+                    current_commit.deletions += deleted
+
+                    if not path:
+                        # 이름 변경: 이전 경로, 새 경로 토큰이 뒤따름
+                        skip_paths = 2
+                        rename_delta = added - deleted
+                        rename_counts = (added, deleted)
+                    elif routes is not None:
+                        self._route_entry(current_commit, routes, path, added, deleted)
+                    elif track_languages and added != deleted:
+                        language = classify_path(path)
+                        languages = current_commit.languages
+                        languages[language] = languages.get(language, 0) + added - deleted
 
             # 마지막 커밋 전송
             if current_commit:
                 yield current_commit
 
         finally:
+            # 소비자가 중간에 제너레이터를 닫으면(작업 취소/일시정지) 남은 출력을 기다리지 않고 git을 종료
+            if chunk and process.poll() is None:
+                process.terminate()
             process.stdout.close()
             process.wait()
 
-    def get_latest_commit_hash(self) -> Optional[str]:
-        """최신 커밋 해시를 반환합니다."""
+    def get_latest_commit_hash(self, ref: str = "HEAD") -> Optional[str]:
+        """ref(기본: HEAD)가 가리키는 최신 커밋 해시를 반환합니다."""
         try:
             result = subprocess.run(
-                ["git", "rev-parse", "HEAD"],
+                ["git", "rev-parse", "--verify", "--quiet", f"{ref}^{{commit}}"],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
@@ -102,6 +469,94 @@ class GitAnalyzer:
         except subprocess.CalledProcessError:
             return None
 
+    def get_upstream_commit_hash(self) -> Optional[str]:
+        """현재 브랜치의 upstream(원격 추적 브랜치) 커밋 해시. upstream이 없으면 None"""
+        return self.get_latest_commit_hash("@{upstream}")
+
+    def get_last_tracked_commit(self, ref: str = "HEAD") -> Optional[str]:
+        """
+        ref까지의 히스토리에서 분석 대상(include_path)을 변경한 마지막 커밋.
+        get_commits_generator가 기록하는 마지막 커밋과 같으므로 저장된 해시와 비교해 변경 여부를 판단합니다.
+        """
+        if not self.include_path:
+            return self.get_latest_commit_hash(ref)
+        try:
+            result = subprocess.run(
+                ["git", "rev-list", "-1", ref, "--", self.include_path],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            return result.stdout.strip() or None
+        except subprocess.CalledProcessError:
+            return None
+
+    def is_ancestor(self, commit: str, ref: str = "HEAD") -> bool:
+        """commit이 ref의 조상(또는 같은 커밋)인지 여부. 커밋 객체가 없으면(gc 등) False"""
+        result = subprocess.run(
+            ["git", "merge-base", "--is-ancestor", commit, ref],
+            cwd=self.repo_path,
+            capture_output=True,
+            text=True
+        )
+        return result.returncode == 0
+
+    def get_merge_base(self, commit: str, ref: str = "HEAD") -> Optional[str]:
+        """두 커밋의 공통 조상 (커밋 객체가 없거나 공통 조상이 없으면 None)"""
+        try:
+            result = subprocess.run(
+                ["git", "merge-base", commit, ref],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+            return result.stdout.strip() or None
+        except subprocess.CalledProcessError:
+            return None
+
+    def reset_to(self, ref: str, timeout: Optional[float] = None) -> bool:
+        """
+        현재 브랜치를 ref로 옮깁니다 (force-push된 upstream을 따라갈 때 사용).
+        --keep이므로 커밋되지 않은 변경과 충돌하면 작업 트리를 건드리지 않고 실패합니다.
+        """
+        try:
+            subprocess.run(
+                ["git", "reset", "--keep", ref],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=timeout
+            )
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"Git Reset Error in {self.repo_path}: {e.stderr}")
+            return False
+        except subprocess.TimeoutExpired:
+            print(f"Git Reset Timeout in {self.repo_path} ({timeout}s)")
+            return False
+
+    def fetch(self, timeout: Optional[float] = None) -> bool:
+        """원격 저장소의 새 커밋을 가져옵니다 (작업 트리는 변경하지 않음)."""
+        try:
+            subprocess.run(
+                ["git", "fetch", "--quiet"],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True,
+                timeout=timeout
+            )
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"Git Fetch Error in {self.repo_path}: {e.stderr}")
+            return False
+        except subprocess.TimeoutExpired:
+            print(f"Git Fetch Timeout in {self.repo_path} ({timeout}s)")
+            return False
+
     def get_incremental_change(self, base_commit: str, target_commit: str = "HEAD") -> Dict:
         """
         두 커밋 사이의 변경 사항(증감)을 계산합니다.
@@ -129,17 +584,21 @@ class GitAnalyzer:
         
         return summary
 
-    def pull(self) -> bool:
-        """원격 저장소로부터 최신 코드를 풀(pull)합니다."""
+    def pull(self, timeout: Optional[float] = None) -> bool:
+        """원격 저장소로부터 최신 코드를 풀(pull)합니다. timeout(초)을 넘기면 중단하고 False를 반환합니다."""
         try:
             subprocess.run(
                 ["git", "pull"],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
-                check=True
+                check=True,
+                timeout=timeout
             )
             return True
         except subprocess.CalledProcessError as e:
             print(f"Git Pull Error in {self.repo_path}: {e.stderr}")
             return False
+        except subprocess.TimeoutExpired:
+            print(f"Git Pull Timeout in {self.repo_path} ({timeout}s)")
+            return False
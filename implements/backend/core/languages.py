@@ -0,0 +1,103 @@
+from typing import Dict
+
+# 파일 확장자 -> 언어 매핑 (cloc 언어 이름 기준)
+EXTENSION_LANGUAGES: Dict[str, str] = {
+    "c": "C",
+    "h": "C/C++ Header",
+    "hh": "C/C++ Header",
+    "hpp": "C/C++ Header",
+    "hxx": "C/C++ Header",
+    "cc": "C++",
+    "cpp": "C++",
+    "cxx": "C++",
+    "c++": "C++",
+    "m": "Objective-C",
+    "mm": "Objective-C++",
+    "java": "Java",
+    "kt": "Kotlin",
+    "kts": "Kotlin",
+    "scala": "Scala",
+    "groovy": "Groovy",
+    "gradle": "Gradle",
+    "go": "Go",
+    "rs": "Rust",
+    "swift": "Swift",
+    "cs": "C#",
+    "py": "Python",
+    "pyi": "Python",
+    "rb": "Ruby",
+    "php": "PHP",
+    "pl": "Perl",
+    "pm": "Perl",
+    "lua": "Lua",
+    "dart": "Dart",
+    "js": "JavaScript",
+    "mjs": "JavaScript",
+    "cjs": "JavaScript",
+    "jsx": "JSX",
+    "ts": "TypeScript",
+    "tsx": "TypeScript",
+    "vue": "Vue",
+    "html": "HTML",
+    "htm": "HTML",
+    "css": "CSS",
+    "scss": "SCSS",
+    "less": "LESS",
+    "sh": "Bourne Shell",
+    "bash": "Bourne Again Shell",
+    "zsh": "zsh",
+    "bat": "DOS Batch",
+    "ps1": "PowerShell",
+    "sql": "SQL",
+    "proto": "Protocol Buffers",
+    "aidl": "AIDL",
+    "hal": "HIDL",
+    "bp": "Blueprint",
+    "mk": "make",
+    "cmake": "CMake",
+    "xml": "XML",
+    "json": "JSON",
+    "yaml": "YAML",
+    "yml": "YAML",
+    "toml": "TOML",
+    "ini": "INI",
+    "md": "Markdown",
+    "rst": "reStructuredText",
+    "txt": "Text",
+}
+
+# 확장자 없이 파일명으로 판별하는 경우
+FILENAME_LANGUAGES: Dict[str, str] = {
+    "makefile": "make",
+    "gnumakefile": "make",
+    "dockerfile": "Dockerfile",
+    "cmakelists.txt": "CMake",
+    "android.bp": "Blueprint",
+    "android.mk": "make",
+    "build.gradle": "Gradle",
+}
+
+OTHER_LANGUAGE = "Other"
+
+_cache: Dict[bytes, str] = {}
+
+def classify_path(path: bytes) -> str:
+    """
+    파일 경로(git 출력 그대로의 bytes)를 언어 이름으로 분류합니다.
+    numstat 스트리밍 중 라인마다 호출되므로 결과를 경로 파일명 단위로 캐시합니다.
+    """
+    name = path.rpartition(b"/")[2]
+    language = _cache.get(name)
+    if language is not None:
+        return language
+
+    lowered = name.decode("utf-8", "replace").lower()
+    language = FILENAME_LANGUAGES.get(lowered)
+    if language is None:
+        stem, dot, ext = lowered.rpartition(".")
+        language = EXTENSION_LANGUAGES.get(ext, OTHER_LANGUAGE) if dot and stem else OTHER_LANGUAGE
+
+    # 파일명 종류가 지나치게 많아지는 저장소에서 캐시가 무한히 커지지 않도록 제한
+    if len(_cache) < 100_000:
+        _cache[name] = language
+    return language
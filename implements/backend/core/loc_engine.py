@@ -1,16 +1,27 @@
 import subprocess
 import json
 import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 
+def _tmpfs_dir() -> Optional[str]:
+    """커밋 트리를 풀어둘 tmpfs 경로 (없으면 None: 시스템 기본 임시 디렉토리 사용)"""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return None
+
 class LOCEngine:
     """
     cloc (Count Lines of Code) 도구를 사용하여 특정 시점의 전체 라인수를 측정하는 클래스.
     """
 
-    def __init__(self, repo_path: str, cloc_path: str = "cloc"):
+    def __init__(self, repo_path: str, cloc_path: str = "cloc", include_path: Optional[str] = None):
         self.repo_path = repo_path
         self.cloc_path = cloc_path
+        self.include_path = include_path
 
     def is_cloc_available(self) -> bool:
         """시스템에 cloc이 설치되어 있는지 확인합니다."""
@@ -23,44 +34,90 @@ class LOCEngine:
     def count_loc(self, commit_hash: str = "HEAD") -> Dict:
         """
         특정 커밋 시점의 전체 라인수를 측정합니다.
-        성능을 위해 --json 출력을 사용하며, 임시 체크아웃 없이 git archive를 활용할 수 있습니다.
-        하지만 cloc은 디렉토리 스캔에 최적화되어 있으므로, 
-        대규모 저장소의 경우 특정 시점으로 'git checkout'이 되어 있는 상태에서 실행하는 것이 일반적입니다.
-        (백필 시에는 git log 기반 증분 계산을 우선하고, 체크포인트에서만 count_loc을 호출하는 전략)
+        작업 트리를 체크아웃하지 않고, 'git archive <commit> | tar -x'로 해당 커밋의 트리만
+        임시 디렉토리(가능하면 tmpfs인 /dev/shm)에 풀어 cloc으로 측정한 뒤 삭제합니다.
+        include_path가 지정되어 있으면 해당 하위 경로만 추출합니다.
         """
-        
-        # 임시로 현재 작업 디렉토리의 상태를 측정하는 로직
-        # 실제 구현에서는 특정 커밋을 측정하기 위해 git archive | cloc --stdin-name=... 또는 
-        # 임시 디렉토리 클론 등을 고려해야 함.
-        # 여기서는 단순화를 위해 현재 repo_path의 상태를 측정합니다.
-        
-        cmd = [self.cloc_path, ".", "--json", "--quiet"]
+        tmp_dir = tempfile.mkdtemp(prefix="cm_loc_", dir=_tmpfs_dir())
         try:
-            result = subprocess.run(
-                cmd, 
-                cwd=self.repo_path, 
-                capture_output=True, 
-                text=True, 
-                check=True
-            )
-            data = json.loads(result.stdout)
-            
-            # cloc 결과에서 'SUM' 섹션 추출
-            if "SUM" in data:
-                return {
-                    "total_files": data["SUM"]["nFiles"],
-                    "total_loc": data["SUM"]["code"],
-                    "blank": data["SUM"]["blank"],
-                    "comment": data["SUM"]["comment"]
-                }
-            return {"total_loc": 0}
+            if not self._export_tree(commit_hash, tmp_dir):
+                return {"total_loc": 0}
+
+            cmd = [self.cloc_path, ".", "--json", "--quiet"]
+            try:
+                result = subprocess.run(
+                    cmd, 
+                    cwd=tmp_dir, 
+                    capture_output=True, 
+                    text=True, 
+                    check=True
+                )
+                data = json.loads(result.stdout) if result.stdout.strip() else {}
+                
+                # cloc 결과에서 'SUM' 섹션 추출
+                if "SUM" in data:
+                    return {
+                        "total_files": data["SUM"]["nFiles"],
+                        "total_loc": data["SUM"]["code"],
+                        "blank": data["SUM"]["blank"],
+                        "comment": data["SUM"]["comment"]
+                    }
+                return {"total_loc": 0}
+
+            except subprocess.CalledProcessError as e:
+                print(f"Error running cloc: {e.stderr}")
+                return {"total_loc": 0}
+            except FileNotFoundError:
+                print(f"cloc not found: {self.cloc_path}")
+                return {"total_loc": 0}
+            except json.JSONDecodeError:
+                print("Error parsing cloc output as JSON")
+                return {"total_loc": 0}
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    def count_loc_many(self, commit_hashes: List[str], max_workers: Optional[int] = None) -> Dict[str, Dict]:
+        """
+        여러 커밋(체크포인트)의 라인수를 동시에 측정합니다.
+        실제 작업은 git/tar/cloc 외부 프로세스가 수행하므로, 크기가 제한된 스레드 풀로
+        동시에 실행되는 측정 프로세스 수만 제한합니다.
+        반환값: {commit_hash: count_loc 결과}
+        """
+        if not commit_hashes:
+            return {}
+
+        workers = max(1, min(max_workers or os.cpu_count() or 1, len(commit_hashes)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = pool.map(self.count_loc, commit_hashes)
+            return dict(zip(commit_hashes, results))
+
+    def _export_tree(self, commit_hash: str, dest_dir: str) -> bool:
+        """git archive 출력을 tar로 바로 풀어 커밋의 트리를 dest_dir에 기록합니다."""
+        archive_cmd = ["git", "archive", "--format=tar", commit_hash]
+        if self.include_path:
+            archive_cmd.extend(["--", self.include_path])
 
-        except subprocess.CalledProcessError as e:
-            print(f"Error running cloc: {e.stderr}")
-            return {"total_loc": 0}
-        except json.JSONDecodeError:
-            print("Error parsing cloc output as JSON")
-            return {"total_loc": 0}
+        archive = subprocess.Popen(
+            archive_cmd,
+            cwd=self.repo_path,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE
+        )
+        extract = subprocess.run(
+            ["tar", "-x", "-f", "-", "-C", dest_dir],
+            stdin=archive.stdout,
+            capture_output=True
+        )
+        archive.stdout.close()
+        archive_err = archive.stderr.read().decode(errors="replace")
+        archive.stderr.close()
+        archive.wait()
+
+        if archive.returncode != 0 or extract.returncode != 0:
+            print(f"Error exporting {commit_hash} from {self.repo_path}: "
+                  f"{archive_err or extract.stderr.decode(errors='replace')}")
+            return False
+        return True
 
     def get_supported_languages(self) -> List[str]:
         """cloc이 지원하는 언어 목록을 반환합니다."""
@@ -0,0 +1,94 @@
+import subprocess
+from typing import Dict, List, Optional
+
+import sys
+import os
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
+
+from core.loc_engine import LOCEngine
+from db.database import DatabaseConnection
+from db.managers import HistoryManager
+
+def physical_lines(measured: Dict) -> int:
+    """
+    cloc 측정 결과의 물리적 줄 수 (code + comment + blank).
+    numstat 누적값은 빈 줄/주석을 포함한 모든 줄을 세므로, code만 비교하면 빈 줄과 주석이 영구적인 드리프트로 보정됩니다.
+    """
+    return measured['total_loc'] + measured.get('comment', 0) + measured.get('blank', 0)
+
+class DriftReconciler:
+    """
+    numstat 누적 합산으로 만든 라인수 시계열의 드리프트(바이너리 파일, 벤더 코드 일괄 추가,
+    0 하한 보정 등으로 생기는 오차)를 cloc 실측값으로 보정하는 클래스.
+    샘플 커밋(N 커밋마다 / 릴리스 태그 / 최신 커밋)을 병렬로 측정하여 loc_checkpoints에 저장하고,
+    조회 시 HistoryManager.get_stats가 체크포인트 구간별 offset을 적용합니다.
+    실측값은 numstat과 같은 기준인 물리적 줄 수(physical_lines)이며, cloc이 인식하지 않는 파일(일반 텍스트 등)의 줄은
+    실측에 포함되지 않으므로 그만큼은 offset에 남습니다.
+    """
+
+    def __init__(self, db: DatabaseConnection, repo_id: int, repo_path: str,
+                 include_path: Optional[str] = None, cloc_path: str = "cloc"):
+        self.repo_id = repo_id
+        self.repo_path = repo_path
+        self.history_manager = HistoryManager(db)
+        self.loc_engine = LOCEngine(repo_path, cloc_path=cloc_path, include_path=include_path)
+
+    def get_tag_commits(self) -> List[str]:
+        """태그가 가리키는 커밋 해시 목록 (annotated 태그는 대상 커밋으로 변환)"""
+        try:
+            result = subprocess.run(
+                ["git", "for-each-ref", "--format=%(objectname) %(*objectname)", "refs/tags"],
+                cwd=self.repo_path,
+                capture_output=True,
+                text=True,
+                check=True
+            )
+        except subprocess.CalledProcessError:
+            return []
+
+        commits = []
+        for line in result.stdout.splitlines():
+            parts = line.split()
+            if parts:
+                commits.append(parts[-1])
+        return commits
+
+    def reconcile(self, every_n: int = 0, use_tags: bool = False,
+                  max_workers: Optional[int] = None, after_id: int = 0) -> int:
+        """
+        샘플 커밋을 실측하여 체크포인트를 추가합니다. after_id가 주어지면 그 이후(증분 동기화로
+        새로 추가된) 행만 샘플링합니다. 추가된 체크포인트 수를 반환합니다.
+        """
+        if not self.loc_engine.is_cloc_available():
+            print(f"Drift correction skipped for repo {self.repo_id}: cloc not available")
+            return 0
+
+        candidates = self.history_manager.get_checkpoint_candidates(
+            self.repo_id,
+            every_n,
+            after_id=after_id,
+            commit_hashes=self.get_tag_commits() if use_tags else None
+        )
+        if not candidates:
+            return 0
+
+        measurements = self.loc_engine.count_loc_many(
+            [c['commit_hash'] for c in candidates], max_workers=max_workers
+        )
+
+        checkpoints = []
+        for candidate in candidates:
+            measured = measurements.get(candidate['commit_hash'], {})
+            # 측정 실패(트리 추출/cloc 오류)는 total_files가 없으므로 제외
+            if "total_files" not in measured:
+                continue
+            checkpoints.append({
+                "history_id": candidate['id'],
+                "commit_hash": candidate['commit_hash'],
+                "estimated_loc": candidate['total_loc'],
+                "measured_loc": physical_lines(measured)
+            })
+
+        self.history_manager.add_checkpoints(self.repo_id, checkpoints)
+        print(f"Drift correction: {len(checkpoints)} checkpoints measured for repo {self.repo_id}")
+        return len(checkpoints)
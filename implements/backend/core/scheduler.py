@@ -0,0 +1,161 @@
+import heapq
+import itertools
+import os
+import threading
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+# 작업 우선순위 (값이 작을수록 먼저 실행)
+PRIORITY_USER = 0      # 사용자가 직접 요청한 동기화/백필
+PRIORITY_NIGHTLY = 10  # 자정 일괄 동기화 및 저장소별 주기 스캔
+PRIORITY_MAINTENANCE = 20  # 히스토리 보존 정책 압축 (대기 중인 동기화가 모두 끝난 뒤 실행)
+
+class JobTimeoutError(Exception):
+    """작업이 제한 시간을 넘겨 취소되었을 때 작업 함수가 발생시키는 예외"""
+
+class Job:
+    """스케줄러에 등록된 작업 하나. cancel_event는 시간 초과 시 설정되며 작업 함수가 주기적으로 확인합니다."""
+    __slots__ = ("key", "fn", "args", "priority", "timeout", "cancel_event")
+
+    def __init__(self, key: Hashable, fn: Callable[..., Any], args: Tuple, priority: int, timeout: Optional[float]):
+        self.key = key
+        self.fn = fn
+        self.args = args
+        self.priority = priority
+        self.timeout = timeout
+        self.cancel_event = threading.Event()
+
+class JobScheduler:
+    """
+    동시 실행 수가 제한된 우선순위 작업 스케줄러.
+    - 고정 개수의 실행 스레드가 우선순위 큐에서 작업을 꺼내 실행 (작업마다 스레드를 만들지 않음)
+    - 같은 key(예: ('sync', repo_id))의 작업이 이미 대기 중이면 새로 등록하지 않고,
+      더 높은 우선순위로 요청된 경우 대기 중인 작업의 우선순위만 올림
+    - 같은 key의 작업이 실행 중(또는 claim됨)이면 대기 중인 작업은 그 작업이 끝날 때까지 실행하지 않음
+    - timeout이 지나면 작업의 cancel_event를 설정하여 협조적으로 중단시킴
+    실행 스레드는 첫 submit 때 시작합니다 (모듈 import 후 fork된 서버 프로세스에서도 동작하도록).
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max(1, max_workers)
+        self._heap: List[Tuple[int, int, Job]] = []
+        self._queued: Dict[Hashable, Job] = {}
+        self._running: Dict[Hashable, int] = {}
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._pid: Optional[int] = None
+
+    def _ensure_workers(self):
+        """현재 프로세스에 실행 스레드가 없으면 시작 (_cond 보유 상태에서 호출)"""
+        if self._pid == os.getpid():
+            return
+        self._pid = os.getpid()
+        for i in range(self.max_workers):
+            threading.Thread(target=self._worker_loop, name=f"job-worker-{i}", daemon=True).start()
+
+    def submit(self, key: Hashable, fn: Callable[..., Any], *args: Any,
+               priority: int = PRIORITY_USER, timeout: Optional[float] = None) -> bool:
+        """
+        작업을 등록합니다. fn은 fn(*args, cancel_event=Event) 형태로 호출됩니다.
+        동일 key의 작업이 이미 대기 중이면 False를 반환합니다 (우선순위는 더 높은 쪽으로 조정).
+        """
+        with self._cond:
+            self._ensure_workers()
+            queued = self._queued.get(key)
+            if queued is not None:
+                if priority < queued.priority:
+                    # 힙 항목은 지연 삭제: 이전 우선순위 항목은 꺼낼 때 무시됨
+                    queued.priority = priority
+                    heapq.heappush(self._heap, (priority, next(self._seq), queued))
+                    self._cond.notify()
+                return False
+
+            job = Job(key, fn, args, priority, timeout)
+            self._queued[key] = job
+            heapq.heappush(self._heap, (priority, next(self._seq), job))
+            self._cond.notify()
+            return True
+
+    def cancel(self, key: Hashable) -> bool:
+        """
+        대기 중인 작업을 큐에서 제거합니다 (힙 항목은 꺼낼 때 무시됨).
+        이미 실행 중이거나 대기 중인 작업이 없으면 False를 반환합니다.
+        """
+        with self._cond:
+            return self._queued.pop(key, None) is not None
+
+    def claim(self, key: Hashable) -> Optional[Job]:
+        """
+        대기 중인 작업을 실행하지 않고 큐에서 꺼내 반환합니다 (다른 작업이 대신 처리하도록 넘겨받을 때 사용).
+        넘겨받은 작업은 release(key)를 호출할 때까지 실행 중으로 취급됩니다. 대기 중인 작업이 없으면 None을 반환합니다.
+        """
+        with self._cond:
+            job = self._queued.pop(key, None)
+            if job is not None:
+                self._running[key] = self._running.get(key, 0) + 1
+            return job
+
+    def release(self, key: Hashable):
+        """claim으로 넘겨받은 작업의 처리가 끝났음을 알립니다."""
+        with self._cond:
+            self._finish(key)
+
+    def is_pending(self, key: Hashable) -> bool:
+        """같은 key의 작업이 대기 중이거나 실행 중인지 여부"""
+        with self._cond:
+            return key in self._queued or key in self._running
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "queued": len(self._queued),
+                "running": sum(self._running.values()),
+            }
+
+    def _next_job(self) -> Job:
+        with self._cond:
+            while True:
+                deferred = []
+                try:
+                    while self._heap:
+                        entry = heapq.heappop(self._heap)
+                        priority, _, job = entry
+                        # 우선순위가 조정되었거나 이미 꺼내진 작업의 오래된 힙 항목은 건너뜀
+                        if self._queued.get(job.key) is not job or job.priority != priority:
+                            continue
+                        # 같은 key의 작업이 실행 중이면 끝날 때까지 미뤄 동시에 실행되지 않도록 함
+                        if job.key in self._running:
+                            deferred.append(entry)
+                            continue
+                        del self._queued[job.key]
+                        self._running[job.key] = 1
+                        return job
+                finally:
+                    for entry in deferred:
+                        heapq.heappush(self._heap, entry)
+                self._cond.wait()
+
+    def _worker_loop(self):
+        while True:
+            job = self._next_job()
+            timer = None
+            if job.timeout:
+                timer = threading.Timer(job.timeout, job.cancel_event.set)
+                timer.daemon = True
+                timer.start()
+            try:
+                job.fn(*job.args, cancel_event=job.cancel_event)
+            except Exception as e:
+                print(f"Job Error [{job.key}]: {e}")
+            finally:
+                if timer:
+                    timer.cancel()
+                with self._cond:
+                    self._finish(job.key)
+
+    def _finish(self, key: Hashable):
+        """실행 중 카운트 감소 (_cond 보유 상태에서 호출). 미뤄둔 같은 key의 작업이 실행되도록 대기 스레드를 깨움"""
+        self._running[key] -= 1
+        if not self._running[key]:
+            del self._running[key]
+            self._cond.notify_all()
@@ -1,22 +1,261 @@
+import multiprocessing
 import threading
 import uuid
 import time
-from typing import Dict, Any, Optional
-from datetime import datetime
+from collections import deque
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, Optional, List, Iterator, Tuple
+from datetime import datetime, timedelta
 
 import sys
 import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../")))
 
-from core.git_analyzer import GitAnalyzer
+from core.git_analyzer import GitAnalyzer, CommitRecord, merge_commit_orders, normalize_include_path
+from core.events import get_event_broker
+from core.reconciler import DriftReconciler
+from core.scheduler import JobScheduler, JobTimeoutError, PRIORITY_USER, PRIORITY_NIGHTLY, PRIORITY_MAINTENANCE
 from db.database import DatabaseConnection
-from db.managers import HistoryManager, RepositoryManager
+from db.managers import HistoryManager, RepositoryManager, SettingsManager, TaskManager
+from db.numstat_cache import NumstatCache
+from db.writer import HistoryWriter, get_history_writer
+
+# 병렬(샤드) 백필 설정
+# - 커밋 수가 PARALLEL_MIN_COMMITS 미만이면 프로세스 풀 기동 비용이 더 크므로 직렬 처리
+# - 샤드는 워커 수보다 잘게 나누어 (워커당 SHARDS_PER_WORKER개) 샤드 간 편차를 흡수
+PARALLEL_MIN_COMMITS = 5000
+MIN_SHARD_SIZE = 1000
+SHARDS_PER_WORKER = 4
+# 샤드 프로세스 시작 방식: 서버 프로세스는 스케줄러/writer 스레드와 SQLite 커넥션을 들고 있으므로
+# fork로 복제하면 다른 스레드가 잡고 있던 잠금까지 복사되어 자식이 멈출 수 있음. 깨끗한 프로세스에서 시작
+PARALLEL_START_METHODS = ("forkserver", "spawn")
+
+# 히스토리 기록 배치 크기 (커밋 수). 배치마다 writer에 넘기고 진행률을 갱신
+BATCH_SIZE = 500
+
+# 작업 스케줄러 기본값 (settings로 변경 가능)
+# - 'max_concurrent_jobs': 동시에 실행할 백필/동기화 작업 수 (변경 시 서버 재시작 필요)
+# - 'sync_timeout_seconds' / 'backfill_timeout_seconds': 작업 제한 시간 (0이면 제한 없음)
+DEFAULT_MAX_CONCURRENT_JOBS = min(4, os.cpu_count() or 1)
+DEFAULT_SYNC_TIMEOUT_SECONDS = 1800
+DEFAULT_BACKFILL_TIMEOUT_SECONDS = 0
+
+# 백필 체크포인트(진행 상태) 저장 간격. 체크포인트는 writer가 커밋을 마친 배치까지만 기록됨
+TASK_CHECKPOINT_INTERVAL_SECONDS = 5
+
+# 진행 속도(커밋/초)와 예상 남은 시간 계산에 사용하는 최근 구간 길이
+RATE_WINDOW_SECONDS = 30
+
+# 진행률 이벤트(SSE) 최소 간격. 상태 전환(status 변경)은 간격과 관계없이 즉시 전송
+TASK_EVENT_INTERVAL_SECONDS = 1
+
+# 메모리에 유지하는 작업 수 한도 (넘으면 종료된 작업부터 제거, 백필은 tasks 테이블에서 계속 조회 가능)
+MAX_TASKS_IN_MEMORY = 256
+
+def _pool_context() -> multiprocessing.context.BaseContext:
+    """샤드 프로세스 풀의 시작 방식 컨텍스트 (forkserver를 지원하지 않는 플랫폼은 spawn)"""
+    available = multiprocessing.get_all_start_methods()
+    method = next(method for method in PARALLEL_START_METHODS if method in available)
+    return multiprocessing.get_context(method)
+
+def _open_cache(cache_path: Optional[str]) -> Optional[NumstatCache]:
+    return NumstatCache(cache_path) if cache_path else None
+
+def _parse_shard(repo_path: str, include_path: Optional[str], hashes: List[str],
+                 cache_path: Optional[str] = None) -> List[Tuple]:
+    """프로세스 풀에서 실행되는 샤드 파서. CommitRecord.as_tuple() 배열을 반환합니다."""
+    analyzer = GitAnalyzer(repo_path, include_path, track_languages=True, cache=_open_cache(cache_path))
+    return [commit.as_tuple() for commit in analyzer.get_commits_for_hashes(hashes)]
+
+def split_shards(hashes: List[str], workers: int, min_shard_size: int = MIN_SHARD_SIZE) -> List[List[str]]:
+    """커밋 해시 목록을 순서를 유지한 채 연속 구간(샤드)으로 분할합니다."""
+    if not hashes:
+        return []
+    shard_count = max(1, min(workers * SHARDS_PER_WORKER, len(hashes) // max(1, min_shard_size)))
+    shard_size = -(-len(hashes) // shard_count)  # ceil
+    return [hashes[i:i + shard_size] for i in range(0, len(hashes), shard_size)]
+
+def _parse_routed_shard(repo_path: str, include_paths: List[Optional[str]], hashes: List[str],
+                        cache_path: Optional[str] = None) -> List[Tuple]:
+    """프로세스 풀에서 실행되는 라우팅 샤드 파서. (hash, date, {경로 인덱스: CommitRecord.as_tuple()}) 배열을 반환합니다."""
+    analyzer = GitAnalyzer(repo_path, track_languages=True, cache=_open_cache(cache_path))
+    return [
+        (commit.hash, commit.date, {index: part.as_tuple() for index, part in commit.parts.items()})
+        for commit in analyzer.get_routed_commits_for_hashes(hashes, include_paths)
+    ]
+
+def _routed_record(fields: Tuple) -> CommitRecord:
+    commit_hash, date, parts = fields
+    commit = CommitRecord(commit_hash, date)
+    commit.parts = {index: CommitRecord(*part) for index, part in parts.items()}
+    return commit
+
+def iter_commits_sharded(repo_path: str, include_path: Optional[str], hashes: List[str], workers: int,
+                         min_shard_size: int = MIN_SHARD_SIZE,
+                         timings: Optional[Dict[str, float]] = None,
+                         include_paths: Optional[List[Optional[str]]] = None,
+                         cache_path: Optional[str] = None) -> Iterator[CommitRecord]:
+    """
+    rev-list 경계(hashes)로 히스토리를 샤드로 나누어 프로세스 풀에서 numstat을 병렬 파싱하고,
+    샤드 순서대로 이어 붙여 직렬 get_commits_generator()와 동일한 순서의 커밋을 반환합니다.
+    include_paths를 지정하면 include_path 대신 여러 경로를 한 번에 라우팅 분석합니다 (get_routed_commits_for_hashes).
+    timings를 지정하면 샤드 결과를 기다린 시간을 timings['git']에 누적합니다.
+    cache_path를 지정하면 각 샤드 프로세스가 그 numstat 캐시를 열어 사용합니다.
+    """
+    shards = split_shards(hashes, workers, min_shard_size)
+    if not shards:
+        return
+
+    pool = ProcessPoolExecutor(max_workers=min(workers, len(shards)), mp_context=_pool_context())
+    try:
+        if include_paths is not None:
+            results = pool.map(_parse_routed_shard, [repo_path] * len(shards), [include_paths] * len(shards), shards,
+                               [cache_path] * len(shards))
+        else:
+            results = pool.map(_parse_shard, [repo_path] * len(shards), [include_path] * len(shards), shards,
+                               [cache_path] * len(shards))
+        while True:
+            wait_started = time.perf_counter()
+            shard = next(results, None)
+            if timings is not None:
+                timings["git"] = timings.get("git", 0.0) + time.perf_counter() - wait_started
+            if shard is None:
+                break
+            for fields in shard:
+                yield _routed_record(fields) if include_paths is not None else CommitRecord(*fields)
+    finally:
+        # 중간에 닫히면(작업 취소/일시정지) 아직 시작하지 않은 샤드는 실행하지 않음
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def build_language_records(commit: CommitRecord, language_totals: Dict[str, int]) -> List[Dict[str, Any]]:
+    """커밋의 언어별 순증감을 누적 벡터(language_totals)에 반영하고, 변경된 언어의 레코드를 반환합니다."""
+    records = []
+    for language, delta in (commit.languages or {}).items():
+        # 전체 라인수와 동일하게 음수가 나오지 않도록 보정
+        total = max(0, language_totals.get(language, 0) + delta)
+        language_totals[language] = total
+        records.append({
+            "timestamp": commit.date,
+            "commit_hash": commit.hash,
+            "language": language,
+            "total_loc": total
+        })
+    return records
+
+class ProgressTracker:
+    """
+    작업 진행 지표 계산기.
+    - 미리 센 전체 커밋 수 대비 진행률
+    - 최근 RATE_WINDOW_SECONDS 구간의 처리 속도(커밋/초)와 예상 남은 시간
+    - 단계별 누적 소요 시간: count(사전 집계), git(출력/샤드 대기), db(writer 대기), reconcile(드리프트 보정),
+      parse(나머지: 토큰화와 레코드 생성)
+    """
+
+    def __init__(self, processed_commits: int = 0):
+        self.total_commits = 0
+        self.timings: Dict[str, float] = {"count": 0.0, "git": 0.0, "db": 0.0, "reconcile": 0.0}
+        self._started = time.perf_counter()
+        self._samples = deque([(time.monotonic(), processed_commits)])
+
+    @contextmanager
+    def measure(self, phase: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.perf_counter() - started
+
+    def snapshot(self, processed_commits: int) -> Dict[str, Any]:
+        now = time.monotonic()
+        samples = self._samples
+        samples.append((now, processed_commits))
+        # 구간 시작 직전의 표본 하나만 남기고 오래된 표본 제거
+        while len(samples) > 2 and now - samples[1][0] >= RATE_WINDOW_SECONDS:
+            samples.popleft()
+        window_started, window_commits = samples[0]
+        elapsed = now - window_started
+        rate = (processed_commits - window_commits) / elapsed if elapsed > 0 else 0.0
+
+        total = max(self.total_commits, processed_commits)
+        phases = dict(self.timings)
+        phases["parse"] = max(0.0, time.perf_counter() - self._started - sum(self.timings.values()))
+        return {
+            "progress_commits": processed_commits,
+            "total_commits": total,
+            "progress_percentage": round(processed_commits * 100 / total, 1) if total else 0.0,
+            "commits_per_second": round(rate, 1),
+            "eta_seconds": round((total - processed_commits) / rate) if rate > 0 else None,
+            "phase_seconds": {phase: round(seconds, 2) for phase, seconds in phases.items()},
+        }
+
+class SeriesState:
+    """
+    같은 저장소의 여러 등록(include_path)을 한 번에 분석할 때 등록 하나의 누적 상태.
+    라우팅된 커밋을 순서대로 받아 누적 라인수/언어별 누적값을 계산하고, BATCH_SIZE마다 writer에 기록을 넘깁니다.
+    """
+
+    def __init__(self, task_id: str, repo_id: int, include_path: Optional[str], writer: HistoryWriter):
+        self.task_id = task_id
+        self.repo_id = repo_id
+        self.include_path = include_path
+        self.writer = writer
+        self.hashes: List[str] = []
+        self.current_loc = 0
+        self.language_totals: Dict[str, int] = {}
+        self.processed_commits = 0
+        self.tracker = ProgressTracker()
+        self.batch_records: List[Dict[str, Any]] = []
+        self.language_records: List[Dict[str, Any]] = []
+        # [(future, 처리 커밋 수, 마지막 커밋, 누적 LOC), ...] (_checkpoint_task 형식)
+        self.pending_writes: List[Tuple] = []
+
+    def add(self, commit: CommitRecord, index: int) -> bool:
+        """커밋에서 이 등록(index)에 해당하는 증감을 반영합니다. 배치가 찼으면 True"""
+        part = (commit.parts or {}).get(index) or CommitRecord(commit.hash, commit.date, 0, 0, {})
+        # 경로 간 이동처럼 언어 순증감이 0인 항목은 언어별 기록을 남기지 않음
+        part.languages = {language: delta for language, delta in (part.languages or {}).items() if delta}
+        self.current_loc = max(0, self.current_loc + part.insertions - part.deletions)
+        self.batch_records.append({
+            "timestamp": part.date,
+            "commit_hash": part.hash,
+            "total_loc": self.current_loc,
+            "insertions": part.insertions,
+            "deletions": part.deletions
+        })
+        self.language_records.extend(build_language_records(part, self.language_totals))
+        self.processed_commits += 1
+        return len(self.batch_records) >= BATCH_SIZE
+
+    def submit(self):
+        """모인 배치를 writer에 넘깁니다."""
+        if not self.batch_records:
+            return
+        with self.tracker.measure("db"):
+            future = self.writer.submit(self.repo_id, self.batch_records, self.language_records)
+        self.pending_writes.append((future, self.processed_commits, self.batch_records[-1]['commit_hash'],
+                                    self.current_loc))
+        self.batch_records = []
+        self.language_records = []
+
+class TaskType:
+    BACKFILL = "BACKFILL"
+    SCAN = "SCAN"
 
 class TaskState:
     PENDING = "PENDING"
     RUNNING = "RUNNING"
+    PAUSED = "PAUSED"
     COMPLETED = "COMPLETED"
     FAILED = "FAILED"
+    CANCELLED = "CANCELLED"
+
+class TaskInterrupted(Exception):
+    """사용자 요청으로 작업이 중단됨. state는 TaskState.PAUSED 또는 TaskState.CANCELLED"""
+
+    def __init__(self, state: str):
+        super().__init__(state)
+        self.state = state
 
 class BackfillWorker:
     """백그라운드에서 저장소의 전체 히스토리를 스캔하는 워커 클래스"""
@@ -24,9 +263,31 @@ class BackfillWorker:
     def __init__(self, db_path: str):
         self.db_path = db_path
         self._tasks: Dict[str, Dict[str, Any]] = {}
+        self._task_event_times: Dict[str, float] = {}
+        # 일시정지/취소 요청 (task_id -> 목표 상태)과 실행 중인 작업의 cancel_event
+        self._interrupts: Dict[str, str] = {}
+        self._cancel_events: Dict[str, threading.Event] = {}
         self._lock = threading.Lock()
         self._path_locks: Dict[str, threading.Lock] = {}
         self._path_lock_mutex = threading.Lock()
+        # 작업마다 스레드를 만드는 대신 동시 실행 수가 제한된 우선순위 스케줄러에서 실행
+        db = DatabaseConnection(db_path)
+        self._scheduler = JobScheduler(
+            self._get_int_setting(db, "max_concurrent_jobs", DEFAULT_MAX_CONCURRENT_JOBS)
+        )
+
+    def _get_int_setting(self, db: DatabaseConnection, key: str, default: int) -> int:
+        value = SettingsManager(db).get_value(key)
+        try:
+            return int(value) if value else default
+        except ValueError:
+            return default
+
+    def _get_job_timeout(self, db: DatabaseConnection, kind: str) -> Optional[float]:
+        """작업 종류('sync'|'backfill')별 제한 시간(초). 0 이하면 None(제한 없음)"""
+        default = DEFAULT_SYNC_TIMEOUT_SECONDS if kind == "sync" else DEFAULT_BACKFILL_TIMEOUT_SECONDS
+        timeout = self._get_int_setting(db, f"{kind}_timeout_seconds", default)
+        return timeout if timeout > 0 else None
 
     def _get_path_lock(self, repo_path: str) -> threading.Lock:
         # 경로 정규화 (끝 슬래시 제거, 절대 경로)
@@ -36,22 +297,252 @@ class BackfillWorker:
                 self._path_locks[norm_path] = threading.Lock()
             return self._path_locks[norm_path]
 
-    def _update_task(self, task_id: str, **kwargs):
+    def _get_backfill_workers(self, db: DatabaseConnection) -> int:
+        """settings의 'backfill_workers' 값 (미설정 시 CPU 코어 수)"""
+        value = SettingsManager(db).get_value("backfill_workers")
+        try:
+            return max(1, int(value)) if value else (os.cpu_count() or 1)
+        except ValueError:
+            return os.cpu_count() or 1
+
+    def _get_numstat_cache(self, db: DatabaseConnection) -> Optional[NumstatCache]:
+        """settings의 'numstat_cache'가 'false'가 아니면 메인 DB 옆의 커밋별 numstat 캐시를 사용"""
+        if SettingsManager(db).get_value("numstat_cache", "true") == "false":
+            return None
+        return NumstatCache(db.numstat_cache_path)
+
+    def _run_drift_correction(self, db: DatabaseConnection, repo_id: int, repo_path: str,
+                              include_path: Optional[str] = None, after_id: int = 0):
+        """
+        설정에 따라 샘플 커밋을 cloc으로 실측하여 드리프트 보정 체크포인트를 추가합니다.
+        - 'drift_correction_interval': N 커밋마다 샘플링 (0 또는 미설정 시 비활성)
+        - 'drift_correction_tags': 'true'이면 릴리스 태그 커밋도 샘플링
+        두 설정이 모두 꺼져 있으면 아무것도 하지 않습니다.
+        """
+        settings = SettingsManager(db)
+        try:
+            every_n = int(settings.get_value("drift_correction_interval", "0") or 0)
+        except ValueError:
+            every_n = 0
+        use_tags = settings.get_value("drift_correction_tags", "false") == "true"
+        if every_n <= 0 and not use_tags:
+            return
+
+        try:
+            reconciler = DriftReconciler(db, repo_id, repo_path, include_path)
+            reconciler.reconcile(every_n, use_tags, self._get_backfill_workers(db), after_id=after_id)
+        except Exception as e:
+            # 보정 실패는 히스토리 자체에는 영향이 없으므로 로그만 남김
+            print(f"Drift correction error [repo {repo_id}]: {e}")
+
+    def _iter_backfill_commits(self, analyzer: GitAnalyzer, workers: int, hashes: Optional[List[str]] = None,
+                               timings: Optional[Dict[str, float]] = None) -> Iterator[CommitRecord]:
+        """
+        분석할 커밋 목록(hashes, rev-list 순서)의 규모와 워커 수에 따라 샤드 병렬 파서 또는 직렬 파서를 선택합니다.
+        hashes가 None이면 전체 히스토리를 직렬 로그 파서로 분석합니다.
+        """
+        if hashes is None:
+            return analyzer.get_commits_generator()
+        if not hashes:
+            return iter(())
+        if workers > 1 and len(hashes) >= PARALLEL_MIN_COMMITS:
+            print(f"Backfill: {len(hashes)} commits, sharded parsing with {workers} workers")
+            return iter_commits_sharded(analyzer.repo_path, analyzer.include_path, hashes, workers, timings=timings,
+                                        cache_path=analyzer.cache.path if analyzer.cache else None)
+        return analyzer.get_commits_for_hashes(hashes)
+
+    def _update_task(self, task_id: str, persist: bool = True, **kwargs):
+        """
+        메모리의 작업 상태를 갱신하고, persist이면 tasks 테이블에도 반영합니다.
+        상태 전환은 즉시, 진행률은 TASK_EVENT_INTERVAL_SECONDS마다 'task' 이벤트로 전송합니다.
+        """
         with self._lock:
-            if task_id in self._tasks:
-                self._tasks[task_id].update(kwargs)
+            if task_id not in self._tasks:
+                return
+            self._tasks[task_id].update(kwargs)
+            # 동기화(SCAN) 작업은 메모리에서만 추적
+            persist = persist and self._tasks[task_id]["task_type"] == TaskType.BACKFILL
+            now = time.monotonic()
+            publish = "status" in kwargs or \
+                now - self._task_event_times.get(task_id, 0.0) >= TASK_EVENT_INTERVAL_SECONDS
+            if publish:
+                self._task_event_times[task_id] = now
+                task = dict(self._tasks[task_id])
+        if persist:
+            TaskManager(DatabaseConnection(self.db_path)).update_task(task_id, **kwargs)
+        if publish:
+            get_event_broker().publish("task", task)
 
     def get_task_status(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """진행 중인 작업은 메모리에서, 이전 프로세스의 작업은 tasks 테이블에서 조회합니다."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                return dict(task)
+        return TaskManager(DatabaseConnection(self.db_path)).get_task(task_id)
+
+    def _register_task(self, task: Dict[str, Any]):
+        """메모리에 작업을 등록하고, 한도를 넘으면 오래된 종료 작업부터 제거합니다 (_lock 보유 상태에서 호출)."""
+        self._tasks[task["task_id"]] = task
+        if len(self._tasks) <= MAX_TASKS_IN_MEMORY:
+            return
+        for task_id, old in list(self._tasks.items()):
+            if len(self._tasks) <= MAX_TASKS_IN_MEMORY:
+                break
+            if old["status"] in (TaskState.COMPLETED, TaskState.FAILED, TaskState.CANCELLED):
+                del self._tasks[task_id]
+                self._task_event_times.pop(task_id, None)
+
+    def _job_key(self, task: Dict[str, Any]) -> Tuple[str, int]:
+        kind = "backfill" if task["task_type"] == TaskType.BACKFILL else "sync"
+        return (kind, task["repo_id"])
+
+    def _begin_job(self, task_id: str, cancel_event: Optional[threading.Event]):
+        """실행을 시작한 작업의 cancel_event를 등록 (대기 중에 들어온 중단 요청이 있으면 즉시 반영)"""
+        if cancel_event is None:
+            return
+        with self._lock:
+            self._cancel_events[task_id] = cancel_event
+            if task_id in self._interrupts:
+                cancel_event.set()
+
+    def _end_job(self, task_id: str):
+        with self._lock:
+            self._cancel_events.pop(task_id, None)
+            self._interrupts.pop(task_id, None)
+
+    def _check_interrupted(self, task_id: str, cancel_event: Optional[threading.Event], repo_id: int):
+        """
+        배치/커밋 사이에 호출하는 협조적 중단 지점. cancel_event는 제한 시간 초과나 사용자 요청 시 설정되며,
+        사용자 요청이면 TaskInterrupted, 아니면 JobTimeoutError를 발생시킵니다.
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            state = self._interrupts.get(task_id)
+            if state:
+                raise TaskInterrupted(state)
+            raise JobTimeoutError(f"job for repo {repo_id} exceeded its time limit")
+
+    def _finish_interrupted(self, task_id: str, repo_id: int, state: str):
+        """중단된 작업의 상태를 기록합니다. 일시정지된 백필의 저장소는 'paused', 그 외에는 'idle'로 표시"""
         with self._lock:
-            return self._tasks.get(task_id)
+            task = self._tasks.get(task_id)
+            self._interrupts.pop(task_id, None)
+        paused_backfill = state == TaskState.PAUSED and task is not None and task["task_type"] == TaskType.BACKFILL
+        RepositoryManager(DatabaseConnection(self.db_path)).update_status(repo_id, "paused" if paused_backfill else "idle")
+        if state == TaskState.CANCELLED:
+            self._update_task(task_id, status=state, completed_at=datetime.now().isoformat())
+        else:
+            self._update_task(task_id, status=state)
+        print(f"Task [{task_id}] {state.lower()} for repo {repo_id}")
+
+    def _load_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """메모리에 없는 작업(이전 프로세스에서 일시정지된 백필 등)은 tasks 테이블에서 불러와 등록합니다."""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                return task
+        row = TaskManager(DatabaseConnection(self.db_path)).get_task(task_id)
+        if row is None:
+            return None
+        with self._lock:
+            return self._tasks.setdefault(task_id, {
+                "task_id": row['task_id'],
+                "repo_id": row['repo_id'],
+                "task_type": row['task_type'],
+                "include_path": row['include_path'],
+                "status": row['status'],
+                "progress_commits": row['progress_commits'] or 0,
+                "total_commits": row['total_commits'] or 0,
+                "error": row['error'],
+                "started_at": row['started_at']
+            })
+
+    def _interrupt_task(self, task_id: str, state: str) -> Optional[Dict[str, Any]]:
+        task = self._load_task(task_id)
+        if task is None:
+            return None
+        with self._lock:
+            status = task["status"]
+            if status == TaskState.PAUSED and state == TaskState.CANCELLED:
+                event = None
+            elif status in (TaskState.PENDING, TaskState.RUNNING):
+                self._interrupts[task_id] = state
+                event = self._cancel_events.get(task_id)
+            else:
+                raise ValueError(f"Task is {status.lower()}")
+
+        if status == TaskState.PAUSED:
+            self._finish_interrupted(task_id, task["repo_id"], state)
+        elif event is not None:
+            # 실행 중: 다음 중단 지점에서 작업 스레드가 git 프로세스를 종료하고 상태를 기록함
+            event.set()
+        elif self._scheduler.cancel(self._job_key(task)):
+            # 아직 대기 중이던 작업은 큐에서 빼고 바로 상태 기록
+            self._finish_interrupted(task_id, task["repo_id"], state)
+        return self.get_task_status(task_id)
+
+    def cancel_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """대기/실행/일시정지 중인 작업을 취소합니다. 이미 기록된 히스토리는 유지됩니다."""
+        return self._interrupt_task(task_id, TaskState.CANCELLED)
+
+    def pause_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """
+        작업을 일시정지합니다. 실행 중이면 커밋이 끝난 배치까지 체크포인트를 남기고 git 프로세스와
+        실행 슬롯을 반납하므로, 다른 작업(예: 급한 동기화)이 먼저 실행될 수 있습니다.
+        """
+        return self._interrupt_task(task_id, TaskState.PAUSED)
+
+    def resume_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        """일시정지된 작업을 다시 등록합니다. 백필은 체크포인트부터, 동기화는 마지막 기록 커밋부터 이어서 실행"""
+        task = self._load_task(task_id)
+        if task is None:
+            return None
+        if task["status"] != TaskState.PAUSED:
+            raise ValueError(f"Task is {task['status'].lower()}")
+        repo = next((r for r in RepositoryManager(DatabaseConnection(self.db_path)).get_all_repositories()
+                     if r['id'] == task["repo_id"]), None)
+        if repo is None:
+            raise ValueError("Repository not found")
+
+        self._update_task(task_id, status=TaskState.PENDING)
+        if task["task_type"] == TaskType.BACKFILL:
+            submitted = self._submit_backfill(task_id, repo['id'], repo['path'], repo['include_path'], resume=True)
+        else:
+            submitted = self._submit_sync(task_id, repo['id'], repo['path'], repo['include_path'], PRIORITY_USER)
+        if not submitted:
+            self._update_task(task_id, status=TaskState.PAUSED)
+            raise ValueError("Another job for this repository is already queued")
+        return self.get_task_status(task_id)
+
+    def cancel_repo_tasks(self, repo_id: int, timeout: float = 30.0):
+        """저장소의 모든 미완료 작업을 취소하고, 실행 중인 작업이 기록을 마치고 끝날 때까지 대기 (저장소 삭제 전 호출)"""
+        with self._lock:
+            task_ids = [t["task_id"] for t in self._tasks.values() if t["repo_id"] == repo_id and
+                        t["status"] in (TaskState.PENDING, TaskState.RUNNING, TaskState.PAUSED)]
+        for task_id in task_ids:
+            try:
+                self.cancel_task(task_id)
+            except ValueError:
+                pass
+        # 압축은 작업 목록에 없으므로 대기 중인 항목만 제거 (실행 중인 압축은 구간 단위로 끝나고 저장소가 없으면 멈춤)
+        self._scheduler.cancel(("compact", repo_id))
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and any(self._scheduler.is_pending((kind, repo_id))
+                                                  for kind in ("backfill", "sync", "compact")):
+            time.sleep(0.05)
 
     def start_backfill(self, repo_id: int, repo_path: str, include_path: Optional[str] = None) -> str:
+        """백필 작업을 스케줄러에 등록합니다. 같은 저장소의 백필이 이미 대기 중이면 그 task_id를 반환합니다."""
         task_id = str(uuid.uuid4())
         
         with self._lock:
-            self._tasks[task_id] = {
+            for task in self._tasks.values():
+                if task["repo_id"] == repo_id and task["status"] == TaskState.PENDING:
+                    return task["task_id"]
+            task = {
                 "task_id": task_id,
                 "repo_id": repo_id,
+                "task_type": TaskType.BACKFILL,
                 "include_path": include_path,
                 "status": TaskState.PENDING,
                 "progress_commits": 0,
@@ -59,42 +550,150 @@ class BackfillWorker:
                 "error": None,
                 "started_at": datetime.now().isoformat()
             }
+            self._register_task(task)
+        TaskManager(DatabaseConnection(self.db_path)).save_task(task)
+        get_event_broker().publish("task", dict(task))
 
-        thread = threading.Thread(
-            target=self._run_backfill_process,
-            args=(task_id, repo_id, repo_path, include_path),
-            daemon=True
-        )
-        thread.start()
-        
+        self._submit_backfill(task_id, repo_id, repo_path, include_path)
         return task_id
 
-    def _run_backfill_process(self, task_id: str, repo_id: int, repo_path: str, include_path: Optional[str] = None):
+    def _submit_backfill(self, task_id: str, repo_id: int, repo_path: str, include_path: Optional[str],
+                         resume: bool = False) -> bool:
+        return self._scheduler.submit(
+            ("backfill", repo_id), self._run_backfill_process, task_id, repo_id, repo_path, include_path, resume,
+            priority=PRIORITY_USER,
+            timeout=self._get_job_timeout(DatabaseConnection(self.db_path), "backfill")
+        )
+
+    def resume_interrupted_tasks(self) -> List[str]:
+        """
+        서버 시작 시 호출: 이전 프로세스에서 끝나지 않은 백필을 마지막 체크포인트부터 이어서 실행하고,
+        동기화 도중 중단된('syncing' 상태) 저장소는 증분 동기화를 다시 등록합니다. 재개한 task_id 목록을 반환합니다.
+        """
+        db = DatabaseConnection(self.db_path)
+        task_manager = TaskManager(db)
+        repos = {repo['id']: repo for repo in RepositoryManager(db).get_all_repositories()}
+        resumed, resumed_repos = [], set()
+
+        for task in task_manager.get_unfinished_tasks(TaskType.BACKFILL):
+            repo = repos.get(task['repo_id'])
+            if repo is None:
+                task_manager.update_task(task['task_id'], status=TaskState.FAILED, error="Repository not found")
+                continue
+            with self._lock:
+                self._register_task({
+                    "task_id": task['task_id'],
+                    "repo_id": task['repo_id'],
+                    "task_type": TaskType.BACKFILL,
+                    "include_path": task['include_path'],
+                    "status": TaskState.PENDING,
+                    "progress_commits": task['progress_commits'] or 0,
+                    "total_commits": task['total_commits'] or 0,
+                    "error": None,
+                    "started_at": task['started_at']
+                })
+            print(f"Resuming backfill [{task['task_id']}] for repo {task['repo_id']} "
+                  f"from {task['progress_commits'] or 0} commits")
+            self._submit_backfill(task['task_id'], repo['id'], repo['path'], repo['include_path'], resume=True)
+            resumed.append(task['task_id'])
+            resumed_repos.add(repo['id'])
+
+        for repo in repos.values():
+            if repo['status'] == "syncing" and repo['id'] not in resumed_repos:
+                self.start_sync(repo['id'], repo['path'], repo['include_path'])
+        return resumed
+
+    def _run_backfill_process(self, task_id: str, repo_id: int, repo_path: str, include_path: Optional[str] = None,
+                              resume: bool = False, cancel_event: Optional[threading.Event] = None):
+        """
+        전체 히스토리를 분석하여 기록합니다. resume이면 이미 기록된 마지막 커밋(체크포인트) 다음부터 이어서 분석합니다.
+        writer가 커밋을 마친 배치의 마지막 커밋과 누적값을 TASK_CHECKPOINT_INTERVAL_SECONDS마다 tasks 테이블에 기록합니다.
+        같은 저장소 경로의 다른 등록에 대한 백필이 대기 중이면 넘겨받아 numstat 한 번으로 함께 분석합니다.
+        """
+        siblings = self._claim_group("backfill", repo_id, repo_path, include_path)
+        if siblings:
+            members = [(task_id, repo_id, include_path, resume)]
+            members += [(job.args[0], job.args[1], job.args[3], job.args[4]) for job in siblings]
+            try:
+                self._run_backfill_group(members, repo_path, cancel_event)
+            finally:
+                for job in siblings:
+                    self._scheduler.release(job.key)
+            return
+
+        self._begin_job(task_id, cancel_event)
         self._update_task(task_id, status=TaskState.RUNNING)
+        commits: Iterator[CommitRecord] = iter(())
+        pending_writes: List[Tuple] = []
         
         try:
             # DB 연결은 스레드 내에서 독립적으로 생성
             db = DatabaseConnection(self.db_path)
             repo_manager = RepositoryManager(db)
-            history_manager = HistoryManager(db)
+            # 히스토리 기록은 단일 writer 스레드에 위임 (여러 워커의 쓰기를 묶어서 커밋)
+            writer = get_history_writer(self.db_path, repo_id)
             
             repo_manager.update_status(repo_id, "backfilling")
+            workers = self._get_backfill_workers(db)
 
             # 동일 경로에 대해 한 번에 하나만 실행되도록 락 적용
             path_lock = self._get_path_lock(repo_path)
             with path_lock:
-                analyzer = GitAnalyzer(repo_path, include_path)
+                analyzer = GitAnalyzer(repo_path, include_path, track_languages=True,
+                                       cache=self._get_numstat_cache(db))
                 
                 # 여기서 cloc를 통한 초기(가장 첫 커밋 직전 상태) 베이스라인 측정을 생략하고,
             # 단순히 0에서 시작하여 insertions/deletions 만으로 계산.
             # (보다 정밀하게 하려면 cloc과 혼합해야 하지만 성능을 위해 로그 기반 누적 계산)
             
             current_loc = 0
+            language_totals: Dict[str, int] = {}
             batch_records = []
-            BATCH_SIZE = 500
+            language_records = []
             processed_commits = 0
+            hashes = None
+
+            if resume:
+                # history와 언어별 기록은 writer가 한 트랜잭션으로 커밋하므로, 기록된 마지막 행이 곧 일관된 재개 지점
+                history_manager = HistoryManager(db)
+                last_record = history_manager.get_history_record(repo_id)
+                if last_record:
+                    hashes = analyzer.get_commit_hashes()
+                    try:
+                        position = hashes.index(last_record['commit_hash']) + 1
+                    except ValueError:
+                        # 중단된 사이 히스토리가 재작성됨: 처음부터 다시 분석
+                        history_manager.rewind_history(repo_id, 0)
+                        hashes = None
+                    else:
+                        hashes = hashes[position:]
+                        processed_commits = position
+                        current_loc = last_record['total_loc']
+                        language_totals = history_manager.get_last_language_totals(repo_id)
+                        print(f"Backfill [{task_id}]: resuming after {position} commits ({last_record['commit_hash'][:8]})")
+                        self._update_task(task_id, progress_commits=processed_commits,
+                                          checkpoint_commit=last_record['commit_hash'], checkpoint_loc=current_loc)
+
+            # 진행률/예상 시간 계산을 위해 분석할 커밋 수를 numstat 분석 전에 미리 셈 (rev-list는 log보다 훨씬 가벼움)
+            tracker = ProgressTracker(processed_commits)
+            analyzer.timings = tracker.timings
+            with tracker.measure("count"):
+                if hashes is not None:
+                    tracker.total_commits = processed_commits + len(hashes)
+                elif workers > 1:
+                    hashes = analyzer.get_commit_hashes()
+                    tracker.total_commits = len(hashes)
+                    if len(hashes) < PARALLEL_MIN_COMMITS:
+                        # 작은 저장소는 프로세스 풀 없이 직렬 로그 파서로 분석
+                        hashes = None
+                else:
+                    tracker.total_commits = analyzer.count_commits()
+            self._update_task(task_id, **tracker.snapshot(processed_commits))
 
-            for commit in analyzer.get_commits_generator():
+            checkpointed_at = time.monotonic()
+            commits = self._iter_backfill_commits(analyzer, workers, hashes, tracker.timings)
+            for commit in commits:
+                self._check_interrupted(task_id, cancel_event, repo_id)
                 current_loc += commit['insertions']
                 current_loc -= commit['deletions']
                 
@@ -104,31 +703,63 @@ class BackfillWorker:
                 batch_records.append({
                     "timestamp": commit['date'],
                     "commit_hash": commit['hash'],
-                    "total_loc": current_loc
+                    "total_loc": current_loc,
+                    "insertions": commit['insertions'],
+                    "deletions": commit['deletions']
                 })
+                language_records.extend(build_language_records(commit, language_totals))
                 
                 processed_commits += 1
                 
                 if len(batch_records) >= BATCH_SIZE:
-                    history_manager.add_history_batch(repo_id, batch_records)
+                    # 큐가 가득 차 submit이 블록된 시간은 DB 기록 대기로 집계
+                    with tracker.measure("db"):
+                        future = writer.submit(repo_id, batch_records, language_records)
+                    pending_writes.append((future, processed_commits, commit['hash'], current_loc))
                     batch_records = []
-                    self._update_task(task_id, progress_commits=processed_commits)
+                    language_records = []
+                    self._update_task(task_id, persist=False, **tracker.snapshot(processed_commits))
+                    if time.monotonic() - checkpointed_at >= TASK_CHECKPOINT_INTERVAL_SECONDS:
+                        pending_writes = self._checkpoint_task(task_id, pending_writes)
+                        checkpointed_at = time.monotonic()
                     
             # 남은 레코드 처리
-            if batch_records:
-                history_manager.add_history_batch(repo_id, batch_records)
-                self._update_task(task_id, progress_commits=processed_commits)
+            # 보정/완료 처리는 모든 기록이 커밋된 뒤에 수행
+            with tracker.measure("db"):
+                if batch_records:
+                    future = writer.submit(repo_id, batch_records, language_records)
+                    pending_writes.append((future, processed_commits, batch_records[-1]['commit_hash'], current_loc))
+                HistoryWriter.wait([future for future, *_ in pending_writes])
+            self._checkpoint_task(task_id, pending_writes)
+            self._update_task(task_id, persist=False, **tracker.snapshot(processed_commits))
+            with tracker.measure("reconcile"):
+                self._run_drift_correction(db, repo_id, repo_path, include_path)
 
             # 완료 상태 업데이트
             repo_manager.update_status(repo_id, "idle")
             repo_manager.update_last_scanned(repo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
             self._update_task(
                 task_id, 
-                status=TaskState.COMPLETED, 
-                completed_at=datetime.now().isoformat(),
-                total_commits=processed_commits
+                **{
+                    **tracker.snapshot(processed_commits),
+                    "status": TaskState.COMPLETED,
+                    "completed_at": datetime.now().isoformat(),
+                    "total_commits": processed_commits,
+                    "progress_percentage": 100.0,
+                }
             )
 
+        except TaskInterrupted as e:
+            # git 프로세스를 먼저 종료한 뒤, 이미 넘긴 배치가 모두 기록되면 그 지점을 체크포인트로 남김
+            # (저장소 삭제 시 작업이 끝난 뒤에 writer가 행을 쓰는 일이 없도록 기록 완료까지 대기)
+            self._close_commits(commits)
+            try:
+                HistoryWriter.wait([future for future, *_ in pending_writes])
+                self._checkpoint_task(task_id, pending_writes)
+            except Exception as write_error:
+                print(f"Backfill Worker Error [{task_id}]: {write_error}")
+            self._finish_interrupted(task_id, repo_id, e.state)
+
         except Exception as e:
             print(f"Backfill Worker Error [{task_id}]: {e}")
             self._update_task(task_id, status=TaskState.FAILED, error=str(e))
@@ -141,52 +772,418 @@ class BackfillWorker:
             except Exception:
                 pass
 
-    def start_sync(self, repo_id: int, repo_path: str, include_path: Optional[str] = None):
-        """저장소의 증분 업데이트(Sync) 시작"""
-        thread = threading.Thread(
-            target=self._run_sync_process,
-            args=(repo_id, repo_path, include_path),
-            daemon=True
+        finally:
+            self._close_commits(commits)
+            self._end_job(task_id)
+
+    def _claim_group(self, kind: str, repo_id: int, repo_path: str, include_path: Optional[str]) -> List[Any]:
+        """
+        같은 저장소 경로를 가리키는 다른 등록의 대기 중인 작업(kind: 'backfill'|'sync')을 스케줄러에서 넘겨받습니다.
+        include_path가 접두사로 해석되지 않는(glob 등) 등록은 묶지 않습니다. 넘겨받은 Job 목록을 반환하며,
+        처리가 끝나면 각 job.key를 scheduler.release로 반환해야 합니다.
+        """
+        try:
+            normalize_include_path(include_path)
+        except ValueError:
+            return []
+        repo_key = os.path.realpath(repo_path)
+        claimed = []
+        for repo in RepositoryManager(DatabaseConnection(self.db_path)).get_all_repositories():
+            if repo['id'] == repo_id or os.path.realpath(repo['path']) != repo_key:
+                continue
+            try:
+                normalize_include_path(repo['include_path'])
+            except ValueError:
+                continue
+            job = self._scheduler.claim((kind, repo['id']))
+            if job is not None:
+                claimed.append(job)
+        return claimed
+
+    def _check_group_interrupted(self, task_ids: List[str], cancel_event: Optional[threading.Event],
+                                 repo_path: str):
+        """
+        묶음 분석의 중단 지점. git 출력을 공유하므로 구성원 중 하나라도 중단 요청을 받으면 전체가 같은 상태로 멈춥니다.
+        """
+        if cancel_event is not None and cancel_event.is_set():
+            with self._lock:
+                state = next((self._interrupts[t] for t in task_ids if t in self._interrupts), None)
+            if state:
+                raise TaskInterrupted(state)
+            raise JobTimeoutError(f"job for {repo_path} exceeded its time limit")
+
+    def _iter_routed_commits(self, repo_path: str, include_paths: List[Optional[str]], hashes: List[str],
+                             workers: int, timings: Optional[Dict[str, float]] = None,
+                             cache: Optional[NumstatCache] = None) -> Iterator[CommitRecord]:
+        """여러 include_path의 커밋(hashes, 합친 순서)을 규모에 따라 샤드 병렬 또는 직렬로 라우팅 분석합니다."""
+        if not hashes:
+            return iter(())
+        if workers > 1 and len(hashes) >= PARALLEL_MIN_COMMITS:
+            print(f"Backfill: {len(hashes)} commits for {len(include_paths)} registrations, "
+                  f"sharded parsing with {workers} workers")
+            return iter_commits_sharded(repo_path, None, hashes, workers, timings=timings, include_paths=include_paths,
+                                        cache_path=cache.path if cache else None)
+        analyzer = GitAnalyzer(repo_path, track_languages=True, timings=timings, cache=cache)
+        return analyzer.get_routed_commits_for_hashes(hashes, include_paths)
+
+    def _route_commits(self, series: List[SeriesState], commits: Iterator[CommitRecord],
+                       cancel_event: Optional[threading.Event], repo_path: str, on_batch: Optional[Any] = None):
+        """
+        합친 순서의 커밋을 각 등록의 커밋 집합(rev-list)에 속하는 경우에만 그 등록의 누적 상태에 반영합니다.
+        on_batch를 지정하면 배치가 찬 등록마다 on_batch(state)를 호출합니다.
+        """
+        members: Dict[str, List[int]] = {}
+        for index, state in enumerate(series):
+            for commit_hash in state.hashes:
+                members.setdefault(commit_hash, []).append(index)
+        task_ids = [state.task_id for state in series]
+        for commit in commits:
+            self._check_group_interrupted(task_ids, cancel_event, repo_path)
+            for index in members.get(commit.hash, ()):
+                if series[index].add(commit, index) and on_batch is not None:
+                    on_batch(series[index])
+
+    def _run_backfill_group(self, members: List[Tuple[str, int, Optional[str], bool]], repo_path: str,
+                            cancel_event: Optional[threading.Event] = None):
+        """
+        같은 저장소의 여러 등록 [(task_id, repo_id, include_path, resume), ...]을 한 번에 백필합니다.
+        등록마다 rev-list로 커밋 집합과 순서를 구한 뒤(재개면 기록된 마지막 커밋 이후만), 합친 커밋들을
+        numstat 한 번으로 분석하면서 파일 항목을 경로가 맞는 등록마다 나눠 누적합니다.
+        """
+        task_ids = [member[0] for member in members]
+        for task_id in task_ids:
+            self._begin_job(task_id, cancel_event)
+            self._update_task(task_id, status=TaskState.RUNNING)
+        commits: Iterator[CommitRecord] = iter(())
+        series: List[SeriesState] = []
+        finished: set = set()
+
+        try:
+            db = DatabaseConnection(self.db_path)
+            repo_manager = RepositoryManager(db)
+            history_manager = HistoryManager(db)
+            workers = self._get_backfill_workers(db)
+            include_paths = [normalize_include_path(member[2]) for member in members]
+            timings = ProgressTracker().timings
+            print(f"Backfill: analyzing {len(members)} registrations of {repo_path} in one pass")
+
+            for task_id, repo_id, include_path, resume in members:
+                repo_manager.update_status(repo_id, "backfilling")
+                state = SeriesState(task_id, repo_id, include_path, get_history_writer(self.db_path, repo_id))
+                state.tracker.timings = timings
+                with state.tracker.measure("count"):
+                    state.hashes = GitAnalyzer(repo_path, include_path).get_commit_hashes()
+                last_record = history_manager.get_history_record(repo_id) if resume else None
+                if last_record:
+                    try:
+                        position = state.hashes.index(last_record['commit_hash']) + 1
+                    except ValueError:
+                        # 중단된 사이 히스토리가 재작성됨: 처음부터 다시 분석
+                        history_manager.rewind_history(repo_id, 0)
+                    else:
+                        state.hashes = state.hashes[position:]
+                        state.processed_commits = position
+                        state.current_loc = last_record['total_loc']
+                        state.language_totals = history_manager.get_last_language_totals(repo_id)
+                        self._update_task(task_id, progress_commits=position,
+                                          checkpoint_commit=last_record['commit_hash'], checkpoint_loc=state.current_loc)
+                state.tracker = ProgressTracker(state.processed_commits)
+                state.tracker.timings = timings
+                state.tracker.total_commits = state.processed_commits + len(state.hashes)
+                self._update_task(task_id, **state.tracker.snapshot(state.processed_commits))
+                series.append(state)
+
+            checkpointed_at = time.monotonic()
+
+            def on_batch(state: SeriesState):
+                nonlocal checkpointed_at
+                state.submit()
+                self._update_task(state.task_id, persist=False, **state.tracker.snapshot(state.processed_commits))
+                if time.monotonic() - checkpointed_at >= TASK_CHECKPOINT_INTERVAL_SECONDS:
+                    for member in series:
+                        member.pending_writes = self._checkpoint_task(member.task_id, member.pending_writes)
+                    checkpointed_at = time.monotonic()
+
+            order = merge_commit_orders([state.hashes for state in series])
+            commits = self._iter_routed_commits(repo_path, include_paths, order, workers, timings,
+                                                self._get_numstat_cache(db))
+            self._route_commits(series, commits, cancel_event, repo_path, on_batch)
+
+            # 보정/완료 처리는 모든 기록이 커밋된 뒤에 수행
+            for state in series:
+                state.submit()
+            with series[0].tracker.measure("db"):
+                HistoryWriter.wait([future for state in series for future, *_ in state.pending_writes])
+            for state in series:
+                self._checkpoint_task(state.task_id, state.pending_writes)
+                with state.tracker.measure("reconcile"):
+                    self._run_drift_correction(db, state.repo_id, repo_path, state.include_path)
+                repo_manager.update_status(state.repo_id, "idle")
+                repo_manager.update_last_scanned(state.repo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                self._update_task(
+                    state.task_id,
+                    **{
+                        **state.tracker.snapshot(state.processed_commits),
+                        "status": TaskState.COMPLETED,
+                        "completed_at": datetime.now().isoformat(),
+                        "total_commits": state.processed_commits,
+                        "progress_percentage": 100.0,
+                    }
+                )
+                finished.add(state.task_id)
+
+        except TaskInterrupted as e:
+            # 단일 백필과 같이 git을 먼저 종료하고, 이미 넘긴 배치가 기록되면 등록마다 그 지점을 체크포인트로 남김
+            self._close_commits(commits)
+            for state in series:
+                try:
+                    HistoryWriter.wait([future for future, *_ in state.pending_writes])
+                    self._checkpoint_task(state.task_id, state.pending_writes)
+                except Exception as write_error:
+                    print(f"Backfill Worker Error [{state.task_id}]: {write_error}")
+            for task_id, repo_id, *_ in members:
+                self._finish_interrupted(task_id, repo_id, e.state)
+
+        except Exception as e:
+            print(f"Backfill Worker Error [{repo_path}]: {e}")
+            for task_id, repo_id, *_ in members:
+                if task_id in finished:
+                    continue
+                self._update_task(task_id, status=TaskState.FAILED, error=str(e))
+                try:
+                    RepositoryManager(DatabaseConnection(self.db_path)).update_status(repo_id, "error")
+                except Exception:
+                    pass
+
+        finally:
+            self._close_commits(commits)
+            for task_id in task_ids:
+                self._end_job(task_id)
+
+    @staticmethod
+    def _close_commits(commits: Iterator[CommitRecord]):
+        """분석 제너레이터를 닫아 git 프로세스(또는 샤드 프로세스 풀)를 정리합니다."""
+        close = getattr(commits, "close", None)
+        if close is not None:
+            close()
+
+    def _checkpoint_task(self, task_id: str, pending_writes: List[Tuple]) -> List[Tuple]:
+        """
+        pending_writes [(future, 처리 커밋 수, 마지막 커밋, 누적 LOC), ...] 중 앞에서부터 커밋이 끝난 배치까지를
+        작업 체크포인트로 기록하고, 아직 끝나지 않은 항목만 반환합니다.
+        """
+        done = 0
+        while done < len(pending_writes) and pending_writes[done][0].done():
+            pending_writes[done][0].result()  # 기록 실패는 예외로 전달
+            done += 1
+        if done:
+            _, processed, commit_hash, total_loc = pending_writes[done - 1]
+            self._update_task(task_id, progress_commits=processed,
+                              checkpoint_commit=commit_hash, checkpoint_loc=total_loc)
+        return pending_writes[done:]
+
+    def start_sync(self, repo_id: int, repo_path: str, include_path: Optional[str] = None,
+                   priority: int = PRIORITY_USER) -> Optional[str]:
+        """
+        저장소의 증분 업데이트(Sync)를 스케줄러에 등록하고 task_id를 반환합니다.
+        같은 저장소의 동기화가 이미 대기 중이면 중복 등록하지 않고 None을 반환합니다.
+        동기화 작업은 짧고 주기 스캔마다 생기므로 tasks 테이블에는 남기지 않고 메모리에서만 추적합니다.
+        """
+        task_id = str(uuid.uuid4())
+        with self._lock:
+            self._register_task({
+                "task_id": task_id,
+                "repo_id": repo_id,
+                "task_type": TaskType.SCAN,
+                "include_path": include_path,
+                "status": TaskState.PENDING,
+                "progress_commits": 0,
+                "total_commits": 0,
+                "error": None,
+                "started_at": datetime.now().isoformat()
+            })
+        if not self._submit_sync(task_id, repo_id, repo_path, include_path, priority):
+            with self._lock:
+                self._tasks.pop(task_id, None)
+            return None
+        return task_id
+
+    def _submit_sync(self, task_id: str, repo_id: int, repo_path: str, include_path: Optional[str],
+                     priority: int) -> bool:
+        return self._scheduler.submit(
+            ("sync", repo_id), self._run_sync_process, repo_id, repo_path, include_path, task_id,
+            priority=priority,
+            timeout=self._get_job_timeout(DatabaseConnection(self.db_path), "sync")
         )
-        thread.start()
 
-    def _run_sync_process(self, repo_id: int, repo_path: str, include_path: Optional[str] = None):
+    def start_compaction(self, repo_id: int) -> bool:
+        """보존 정책 압축 작업을 등록합니다 (정책이 비활성이면 실행 시 바로 종료)."""
+        return self._scheduler.submit(("compact", repo_id), self._run_compaction, repo_id,
+                                      priority=PRIORITY_MAINTENANCE)
+
+    def _run_compaction(self, repo_id: int, cancel_event: Optional[threading.Event] = None):
+        """
+        저장소 히스토리를 보존 정책('history_retention_commit_days', 'history_retention_daily_days')에 따라
+        구간 단위로 압축합니다. 구간마다 커밋하고 진행 위치를 남기므로, 취소되거나 저장소가 유휴 상태가 아니게 되면
+        바로 멈추고 다음 실행에서 이어서 진행합니다.
+        """
         try:
             db = DatabaseConnection(self.db_path)
+            commit_days = self._get_int_setting(db, "history_retention_commit_days", 0)
+            daily_days = self._get_int_setting(db, "history_retention_daily_days", 0)
+            if commit_days <= 0:
+                return
             repo_manager = RepositoryManager(db)
             history_manager = HistoryManager(db)
-            
-            # 동기화 시작 상태로 변경
-            repo_manager.update_status(repo_id, "syncing")
-            
-            analyzer = GitAnalyzer(repo_path, include_path)
-            
-            # 1. Git Pull (동일 경로에 대해 한 번에 하나만 실행되도록 락 적용)
+            total = 0
+            while not (cancel_event and cancel_event.is_set()):
+                repo = next((r for r in repo_manager.get_all_repositories() if r['id'] == repo_id), None)
+                # 백필/동기화 중인 저장소는 건드리지 않음 (백필은 오래된 커밋부터 기록)
+                if repo is None or repo['status'] != "idle":
+                    break
+                deleted, done = history_manager.compact_history_step(repo_id, commit_days, daily_days)
+                total += deleted
+                if done:
+                    break
+            if total:
+                print(f"Compacted history [repo {repo_id}]: removed {total} rows")
+        except Exception as e:
+            print(f"Compaction Error [repo {repo_id}]: {e}")
+
+    def _find_resume_point(self, analyzer: GitAnalyzer, history_manager: HistoryManager, repo_id: int,
+                           last_record: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        저장된 히스토리에서 현재 HEAD의 조상인 마지막 레코드(증분 분석을 이어갈 지점)를 찾습니다.
+        공통 조상이 전혀 없으면 None을 반환합니다.
+        - 빠른 경로: 마지막 커밋이 HEAD의 조상이면 그대로 사용
+        - 이전 커밋 객체가 남아 있으면 merge-base 이전의 마지막 분석 대상 커밋을 사용
+        - 객체가 없으면(gc 등) 시리즈 끝에서 1, 2, 4, ...번째 레코드를 확인한 뒤 이분 탐색하여
+          git 호출 수를 되감을 커밋 수의 로그에 비례하게 유지
+        """
+        last_hash = last_record['commit_hash']
+        if analyzer.is_ancestor(last_hash):
+            return last_record
+
+        base = analyzer.get_merge_base(last_hash)
+        if base:
+            tracked = analyzer.get_last_tracked_commit(base)
+            record = history_manager.get_history_record(repo_id, commit_hash=tracked) if tracked else None
+            if record:
+                return record
+
+        def record_at(offset: int) -> Optional[Dict[str, Any]]:
+            return history_manager.get_history_record(repo_id, offset=offset)
+
+        # low: 조상이 아닌 offset, high: 조상이거나 시리즈 범위를 벗어난 offset
+        low, high = 0, 1
+        found = record_at(high)
+        while found is not None and not analyzer.is_ancestor(found['commit_hash']):
+            low, high = high, high * 2
+            found = record_at(high)
+
+        while high - low > 1:
+            middle = (low + high) // 2
+            record = record_at(middle)
+            if record is None:
+                high = middle
+            elif analyzer.is_ancestor(record['commit_hash']):
+                found, high = record, middle
+            else:
+                low = middle
+        return found
+
+    def _run_sync_process(self, repo_id: int, repo_path: str, include_path: Optional[str] = None,
+                          task_id: Optional[str] = None, cancel_event: Optional[threading.Event] = None):
+        task_id = task_id or f"sync-{repo_id}"
+        # 같은 저장소 경로의 다른 등록에 대한 동기화가 대기 중이면 넘겨받아 fetch/pull과 numstat을 한 번만 수행
+        siblings = self._claim_group("sync", repo_id, repo_path, include_path)
+        if siblings:
+            members = [(task_id, repo_id, include_path)]
+            members += [(job.args[3] or f"sync-{job.args[0]}", job.args[0], job.args[2]) for job in siblings]
+            try:
+                self._run_sync_group(members, repo_path, cancel_event)
+            finally:
+                for job in siblings:
+                    self._scheduler.release(job.key)
+            return
+
+        self._begin_job(task_id, cancel_event)
+        self._update_task(task_id, status=TaskState.RUNNING)
+        commits: Iterator[CommitRecord] = iter(())
+
+        try:
+            db = DatabaseConnection(self.db_path)
+            repo_manager = RepositoryManager(db)
+            history_manager = HistoryManager(db)
+            analyzer = GitAnalyzer(repo_path, include_path, track_languages=True, cache=self._get_numstat_cache(db))
+            timeout = self._get_job_timeout(db, "sync")
+            last_record = history_manager.get_last_history_record(repo_id)
+
+            # 1. 변경 확인 (동일 경로에 대해 한 번에 하나만 실행되도록 락 적용)
+            #    git fetch 후 upstream(없으면 HEAD)의 마지막 분석 대상 커밋이 저장된 마지막 커밋과 같으면
+            #    pull/log 없이 종료하여, 짧은 주기로 스캔해도 변경 없는 저장소는 git 명령 몇 번으로 끝남
             path_lock = self._get_path_lock(repo_path)
             with path_lock:
-                if not analyzer.pull():
-                    print(f"Sync Failed: git pull failed for repo {repo_id}")
-                    repo_manager.update_status(repo_id, "error")
+                previous_upstream = upstream = analyzer.get_upstream_commit_hash()
+                if upstream is not None:
+                    if not analyzer.fetch(timeout=timeout):
+                        print(f"Sync Failed: git fetch failed for repo {repo_id}")
+                        repo_manager.update_status(repo_id, "error")
+                        self._update_task(task_id, status=TaskState.FAILED, error="git fetch failed")
+                        return
+                    upstream = analyzer.get_upstream_commit_hash()
+
+                target = upstream or "HEAD"
+                if last_record and last_record['commit_hash'] == analyzer.get_last_tracked_commit(target):
+                    print(f"Sync: No new commits for repo {repo_id}")
+                    repo_manager.update_last_scanned(repo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                    self._complete_sync_task(task_id, 0)
                     return
 
-            # 2. 마지막 레코드 가져오기 (증분 분석용)
-            last_record = history_manager.get_last_history_record(repo_id)
-            
+                # 동기화 시작 상태로 변경
+                repo_manager.update_status(repo_id, "syncing")
+
+                # 2. Git Pull (upstream이 없는 로컬 저장소는 HEAD 기준으로 분석)
+                #    이전 upstream이 새 upstream의 조상이 아니면 force-push된 것이므로 병합(pull) 대신 새 upstream으로 이동
+                if upstream is not None and upstream != analyzer.get_latest_commit_hash():
+                    if previous_upstream and not analyzer.is_ancestor(previous_upstream, upstream):
+                        print(f"Sync: upstream was rewritten for repo {repo_id}, resetting to {upstream[:8]}")
+                        updated = analyzer.reset_to(upstream, timeout=timeout)
+                    else:
+                        updated = analyzer.pull(timeout=timeout)
+                    if not updated:
+                        print(f"Sync Failed: git update failed for repo {repo_id}")
+                        repo_manager.update_status(repo_id, "error")
+                        self._update_task(task_id, status=TaskState.FAILED, error="git update failed")
+                        return
+
+                # 3. 저장된 마지막 커밋이 HEAD의 조상이 아니면(force-push/rebase) 공통 조상까지 되감기
+                if last_record:
+                    resume_record = self._find_resume_point(analyzer, history_manager, repo_id, last_record)
+                    if resume_record is None or resume_record['id'] != last_record['id']:
+                        deleted = history_manager.rewind_history(repo_id, resume_record['id'] if resume_record else 0)
+                        print(f"Sync: history rewritten for repo {repo_id}, rewound {deleted} rows")
+                        last_record = resume_record
+
             if not last_record:
                 # 히스토리가 아예 없는 경우: 전체 백필 프로세스로 전환
                 print(f"Sync: No history found, starting full backfill for repo {repo_id}")
-                # task_id가 필요없으므로 내부 루틴 직접 호출 (status는 backfilling으로 변경됨)
-                self._run_backfill_process(f"sync-auto-backfill-{repo_id}", repo_id, repo_path, include_path)
+                # 같은 작업으로 내부 루틴 직접 호출 (status는 backfilling으로 변경되고, 중단/완료 상태도 백필이 기록)
+                self._run_backfill_process(task_id, repo_id, repo_path, include_path, cancel_event=cancel_event)
                 return
 
             last_hash = last_record['commit_hash']
             current_loc = last_record['total_loc']
+            language_totals = history_manager.get_last_language_totals(repo_id)
 
-            # 3. 마지막 해시 이후의 커밋만 분석 (Incremental Parser)
+            # 4. 마지막 해시 이후의 커밋만 분석 (Incremental Parser)
             batch_records = []
+            language_records = []
             processed_commits = 0
             
-            for commit in analyzer.get_commits_generator(since_hash=last_hash):
+            commits = analyzer.get_commits_generator(since_hash=last_hash)
+            for commit in commits:
+                self._check_interrupted(task_id, cancel_event, repo_id)
                 current_loc += commit['insertions']
                 current_loc -= commit['deletions']
                 current_loc = max(0, current_loc)
@@ -194,33 +1191,210 @@ class BackfillWorker:
                 batch_records.append({
                     "timestamp": commit['date'],
                     "commit_hash": commit['hash'],
-                    "total_loc": current_loc
+                    "total_loc": current_loc,
+                    "insertions": commit['insertions'],
+                    "deletions": commit['deletions']
                 })
+                language_records.extend(build_language_records(commit, language_totals))
                 processed_commits += 1
 
+            # 중단 시 분석한 커밋은 버림: 다음 동기화(또는 재개)가 마지막 기록 커밋부터 다시 분석
             if batch_records:
-                history_manager.add_history_batch(repo_id, batch_records)
+                HistoryWriter.wait([get_history_writer(self.db_path, repo_id).submit(repo_id, batch_records, language_records)])
                 print(f"Sync Completed: {processed_commits} new commits for repo {repo_id}")
+                self._run_drift_correction(db, repo_id, repo_path, include_path, after_id=last_record['id'])
             else:
                 print(f"Sync: No new commits since {last_hash} for repo {repo_id}")
 
             # 완료 상태 업데이트
             repo_manager.update_status(repo_id, "idle")
             repo_manager.update_last_scanned(repo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+            self._complete_sync_task(task_id, processed_commits)
+
+        except TaskInterrupted as e:
+            self._close_commits(commits)
+            self._finish_interrupted(task_id, repo_id, e.state)
 
         except Exception as e:
             print(f"Sync Worker Error [repo {repo_id}]: {e}")
+            self._update_task(task_id, status=TaskState.FAILED, error=str(e))
             try:
                 db = DatabaseConnection(self.db_path)
                 RepositoryManager(db).update_status(repo_id, "error")
             except Exception:
                 pass
 
+        finally:
+            self._close_commits(commits)
+            self._end_job(task_id)
+
+    def _run_sync_group(self, members: List[Tuple[str, int, Optional[str]]], repo_path: str,
+                        cancel_event: Optional[threading.Event] = None):
+        """
+        같은 저장소의 여러 등록 [(task_id, repo_id, include_path), ...]을 한 번에 동기화합니다.
+        fetch/pull은 한 번만 수행하고, 새 커밋이 있는 등록들의 증분은 numstat 한 번으로 라우팅 분석합니다.
+        히스토리가 없는(또는 공통 조상까지 되감겨 비게 된) 등록은 마지막에 함께 백필합니다.
+        """
+        task_ids = [member[0] for member in members]
+        for task_id in task_ids:
+            self._begin_job(task_id, cancel_event)
+            self._update_task(task_id, status=TaskState.RUNNING)
+        commits: Iterator[CommitRecord] = iter(())
+        finished: set = set()
+
+        def fail(indices: List[int], error: str):
+            for index in indices:
+                task_id, repo_id, _ = members[index]
+                repo_manager.update_status(repo_id, "error")
+                self._update_task(task_id, status=TaskState.FAILED, error=error)
+                finished.add(task_id)
+
+        try:
+            db = DatabaseConnection(self.db_path)
+            repo_manager = RepositoryManager(db)
+            history_manager = HistoryManager(db)
+            timeout = self._get_job_timeout(db, "sync")
+            analyzers = [GitAnalyzer(repo_path, include_path, track_languages=True) for _, _, include_path in members]
+            analyzer = analyzers[0]
+            last_records = [history_manager.get_last_history_record(repo_id) for _, repo_id, _ in members]
+            pending: List[int] = []
+
+            # 1. 변경 확인/갱신은 단일 동기화와 같고, 저장소 경로 기준이므로 한 번만 수행
+            with self._get_path_lock(repo_path):
+                previous_upstream = upstream = analyzer.get_upstream_commit_hash()
+                if upstream is not None:
+                    if not analyzer.fetch(timeout=timeout):
+                        print(f"Sync Failed: git fetch failed for {repo_path}")
+                        fail(list(range(len(members))), "git fetch failed")
+                        return
+                    upstream = analyzer.get_upstream_commit_hash()
+
+                target = upstream or "HEAD"
+                for index, (task_id, repo_id, _) in enumerate(members):
+                    last_record = last_records[index]
+                    if last_record and last_record['commit_hash'] == analyzers[index].get_last_tracked_commit(target):
+                        print(f"Sync: No new commits for repo {repo_id}")
+                        repo_manager.update_last_scanned(repo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                        self._complete_sync_task(task_id, 0)
+                        finished.add(task_id)
+                    else:
+                        pending.append(index)
+                if not pending:
+                    return
+
+                for index in pending:
+                    repo_manager.update_status(members[index][1], "syncing")
+
+                if upstream is not None and upstream != analyzer.get_latest_commit_hash():
+                    if previous_upstream and not analyzer.is_ancestor(previous_upstream, upstream):
+                        print(f"Sync: upstream was rewritten for {repo_path}, resetting to {upstream[:8]}")
+                        updated = analyzer.reset_to(upstream, timeout=timeout)
+                    else:
+                        updated = analyzer.pull(timeout=timeout)
+                    if not updated:
+                        print(f"Sync Failed: git update failed for {repo_path}")
+                        fail(pending, "git update failed")
+                        return
+
+                for index in pending:
+                    last_record = last_records[index]
+                    if not last_record:
+                        continue
+                    repo_id = members[index][1]
+                    resume_record = self._find_resume_point(analyzers[index], history_manager, repo_id, last_record)
+                    if resume_record is None or resume_record['id'] != last_record['id']:
+                        deleted = history_manager.rewind_history(repo_id, resume_record['id'] if resume_record else 0)
+                        print(f"Sync: history rewritten for repo {repo_id}, rewound {deleted} rows")
+                        last_records[index] = resume_record
+
+            # 2. 등록마다 마지막 기록 이후의 커밋 집합을 구하고, 합친 순서로 한 번에 분석
+            series: List[SeriesState] = []
+            resume_ids: Dict[str, int] = {}
+            for index in pending:
+                last_record = last_records[index]
+                if not last_record:
+                    continue
+                task_id, repo_id, include_path = members[index]
+                state = SeriesState(task_id, repo_id, include_path, get_history_writer(self.db_path, repo_id))
+                state.current_loc = last_record['total_loc']
+                state.language_totals = history_manager.get_last_language_totals(repo_id)
+                state.hashes = analyzers[index].get_commit_hashes(since_hash=last_record['commit_hash'])
+                resume_ids[task_id] = last_record['id']
+                series.append(state)
+
+            if series:
+                order = merge_commit_orders([state.hashes for state in series])
+                cache = self._get_numstat_cache(db)
+                commits = GitAnalyzer(repo_path, track_languages=True, cache=cache).get_routed_commits_for_hashes(
+                    order, [normalize_include_path(state.include_path) for state in series]
+                )
+                self._route_commits(series, commits, cancel_event, repo_path)
+
+                # 중단 시 분석한 커밋은 버림: 다음 동기화가 마지막 기록 커밋부터 다시 분석
+                for state in series:
+                    state.submit()
+                HistoryWriter.wait([future for state in series for future, *_ in state.pending_writes])
+
+                for state in series:
+                    if state.processed_commits:
+                        print(f"Sync Completed: {state.processed_commits} new commits for repo {state.repo_id}")
+                        self._run_drift_correction(db, state.repo_id, repo_path, state.include_path,
+                                                   after_id=resume_ids[state.task_id])
+                    repo_manager.update_status(state.repo_id, "idle")
+                    repo_manager.update_last_scanned(state.repo_id, datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                    self._complete_sync_task(state.task_id, state.processed_commits)
+                    finished.add(state.task_id)
+
+            # 3. 히스토리가 없는 등록은 같은 작업으로 백필 (중단/완료 상태도 백필이 기록)
+            backfills = [(members[index][0], members[index][1], members[index][2], False)
+                         for index in pending if not last_records[index]]
+            finished.update(task_id for task_id, *_ in backfills)
+            if len(backfills) == 1:
+                task_id, repo_id, include_path, _ = backfills[0]
+                print(f"Sync: No history found, starting full backfill for repo {repo_id}")
+                self._run_backfill_process(task_id, repo_id, repo_path, include_path, cancel_event=cancel_event)
+            elif backfills:
+                print(f"Sync: No history found, starting full backfill for {len(backfills)} registrations")
+                self._run_backfill_group(backfills, repo_path, cancel_event)
+
+        except TaskInterrupted as e:
+            self._close_commits(commits)
+            for task_id, repo_id, _ in members:
+                if task_id not in finished:
+                    self._finish_interrupted(task_id, repo_id, e.state)
+
+        except Exception as e:
+            print(f"Sync Worker Error [{repo_path}]: {e}")
+            for task_id, repo_id, _ in members:
+                if task_id in finished:
+                    continue
+                self._update_task(task_id, status=TaskState.FAILED, error=str(e))
+                try:
+                    RepositoryManager(DatabaseConnection(self.db_path)).update_status(repo_id, "error")
+                except Exception:
+                    pass
+
+        finally:
+            self._close_commits(commits)
+            for task_id in task_ids:
+                self._end_job(task_id)
+
+    def _complete_sync_task(self, task_id: str, processed_commits: int):
+        self._update_task(task_id, status=TaskState.COMPLETED, completed_at=datetime.now().isoformat(),
+                          progress_commits=processed_commits, total_commits=processed_commits,
+                          progress_percentage=100.0)
+
+
 class MidnightScheduler:
-    """매일 밤 12시에 모든 저장소를 동기화하는 스케줄러"""
+    """
+    매일 밤 12시에 모든 저장소를 동기화하는 스케줄러.
+    scan_interval_minutes가 설정된 저장소는 그 간격마다 추가로 스캔합니다 (변경이 없으면 fetch만 하고 종료).
+    """
     def __init__(self, db_path: str):
         self.db_path = db_path
         self._stop_event = threading.Event()
+        # 저장소별 마지막 주기 스캔 요청 시각 (실패한 저장소를 30초마다 재시도하지 않도록)
+        self._last_attempts: Dict[int, datetime] = {}
 
     def start(self):
         thread = threading.Thread(target=self._run_loop, daemon=True)
@@ -237,6 +1411,7 @@ class MidnightScheduler:
                 # 61초 대기하여 같은 분에 중복 실행 방지
                 time.sleep(61)
             else:
+                self._execute_due_scans(now)
                 # 30초마다 체크
                 time.sleep(30)
 
@@ -248,11 +1423,38 @@ class MidnightScheduler:
             
             repos = repo_manager.get_all_repositories()
             for repo in repos:
+                if repo['status'] == "paused":
+                    # 사용자가 일시정지한 백필은 재개할 때까지 건드리지 않음
+                    continue
                 print(f"Syncing {repo['name']} (Path: {repo['path']})...")
-                worker.start_sync(repo['id'], repo['path'], repo['include_path'])
+                # 동시 실행 수는 스케줄러가 제한하며, 사용자 요청 작업이 야간 일괄 작업보다 먼저 실행됨
+                worker.start_sync(repo['id'], repo['path'], repo['include_path'], priority=PRIORITY_NIGHTLY)
+                # 보존 정책 압축은 더 낮은 우선순위로 등록되어 대기 중인 동기화가 끝난 뒤 실행됨
+                worker.start_compaction(repo['id'])
         except Exception as e:
             print(f"Scheduler Execution Error: {e}")
 
+    def _execute_due_scans(self, now: datetime):
+        """스캔 간격이 지난 저장소(마지막 스캔 또는 요청 시각 기준)를 동기화 작업으로 등록"""
+        try:
+            db = DatabaseConnection(self.db_path)
+            worker = get_worker(self.db_path)
+
+            for repo in RepositoryManager(db).get_all_repositories():
+                interval = repo.get('scan_interval_minutes')
+                if not interval or interval <= 0 or repo['status'] in ("backfilling", "syncing", "paused"):
+                    continue
+                try:
+                    scanned = datetime.strptime(str(repo['last_scanned_at'])[:19], "%Y-%m-%d %H:%M:%S")
+                except ValueError:
+                    scanned = None
+                latest = max(filter(None, [scanned, self._last_attempts.get(repo['id'])]), default=None)
+                if latest is None or now - latest >= timedelta(minutes=interval):
+                    self._last_attempts[repo['id']] = now
+                    worker.start_sync(repo['id'], repo['path'], repo['include_path'], priority=PRIORITY_NIGHTLY)
+        except Exception as e:
+            print(f"Periodic Scan Error: {e}")
+
 # 전역 워커와 스케줄러 인스턴스
 _worker_instance = None
 _scheduler_instance = None
@@ -0,0 +1,51 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Iterable, Optional, Tuple
+
+class ResultCache:
+    """
+    조회 결과 인메모리 캐시 (LRU). 각 항목은 결과를 만든 저장소 ID 집합을 함께 기록하며,
+    히스토리 변경 알림(invalidate)이 오면 해당 저장소가 포함된 항목만 제거합니다.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, Tuple[frozenset, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # 무효화 세대: 계산 도중 무효화가 일어나면 오래된 결과를 저장하지 않기 위해 사용
+        self._generation = 0
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, repo_ids: Iterable[int], value: Any, generation: Optional[int] = None):
+        """generation이 주어지면 그 이후 무효화가 없었던 경우에만 저장합니다."""
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (frozenset(repo_ids), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, repo_id: int):
+        with self._lock:
+            self._generation += 1
+            stale = [key for key, (repo_ids, _) in self._entries.items() if repo_id in repo_ids]
+            for key in stale:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
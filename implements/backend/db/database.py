@@ -1,44 +1,438 @@
+import calendar
+import os
 import sqlite3
+import threading
 from contextlib import contextmanager
-from typing import Generator
+from datetime import datetime, timezone
+from typing import Dict, Generator, List, Optional, Tuple, Union
+
+# 커넥션 생성 시 한 번만 적용하는 튜닝 설정
+# - synchronous=NORMAL: WAL 모드에서는 커밋마다 fsync하지 않아도 DB 손상 위험이 없음 (체크포인트 시 fsync)
+# - cache_size: 음수는 KiB 단위 (64 MiB), mmap_size: 256 MiB
+CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA cache_size=-65536;",
+    "PRAGMA mmap_size=268435456;",
+    "PRAGMA temp_store=MEMORY;",
+)
+BUSY_TIMEOUT_SECONDS = 30
+# 풀에 보관하는 유휴 커넥션 최대 개수 (초과분은 반환 시 닫음)
+POOL_MAX_IDLE = 16
+
+# history.ts(UTC epoch 초)를 조회 결과의 timestamp 문자열(UTC)로 바꾸는 SQL 식
+TIMESTAMP_SQL = "strftime('%Y-%m-%d %H:%M:%S', ts, 'unixepoch')"
+# history.commit_hash(20바이트 BLOB, 16진수가 아닌 값은 TEXT 그대로)를 16진수 문자열로 읽는 SQL 식
+HASH_SQL = "CASE WHEN typeof(commit_hash) = 'blob' THEN lower(hex(commit_hash)) ELSE commit_hash END"
+
+# 롤업 해상도별 버킷 키 (history.ts 기준, UTC 날짜)
+ROLLUP_BUCKETS = {
+    "day": "strftime('%Y-%m-%d', ts, 'unixepoch')",
+    "week": "strftime('%Y-W%W', ts, 'unixepoch')",
+    "month": "strftime('%Y-%m', ts, 'unixepoch')",
+}
+
+# history: (repo_id, ts, seq) 클러스터 키의 WITHOUT ROWID 테이블
+# - ts: 커밋 시각(UTC epoch 초), seq: 기록 순서 (저장소별로 증가, 분석한 커밋 순서)
+# - commit_hash: 16진수 해시는 BLOB, 그 외 식별자는 TEXT
+HISTORY_TABLE_SQL = '''
+    CREATE TABLE IF NOT EXISTS history (
+        repo_id INTEGER NOT NULL,
+        ts INTEGER NOT NULL,
+        seq INTEGER NOT NULL,
+        commit_hash BLOB,
+        total_loc INTEGER NOT NULL,
+        insertions INTEGER,
+        deletions INTEGER,
+        PRIMARY KEY(repo_id, ts, seq),
+        FOREIGN KEY(repo_id) REFERENCES repositories(id)
+    ) WITHOUT ROWID
+'''
+
+def to_epoch(value: Union[str, int, float, datetime]) -> int:
+    """
+    커밋 시각을 UTC epoch 초로 변환합니다. git %ai 형식('YYYY-MM-DD HH:MM:SS +0900')은 오프셋을 적용하고,
+    오프셋이 없는 문자열/naive datetime은 UTC로 간주합니다. 백필 시 커밋마다 호출되므로 strptime 없이 직접 파싱합니다.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return int(value.timestamp())
+    epoch = calendar.timegm((
+        int(value[0:4]), int(value[5:7]), int(value[8:10]),
+        int(value[11:13] or 0), int(value[14:16] or 0), int(value[17:19] or 0)
+    ))
+    zone = value[19:].strip()
+    if zone and zone[0] in "+-":
+        zone = zone.replace(":", "")
+        offset = int(zone[1:3]) * 3600 + int(zone[3:5] or 0) * 60
+        epoch -= offset if zone[0] == "+" else -offset
+    return epoch
+
+def format_epoch(ts: int) -> str:
+    """to_epoch의 역변환 (TIMESTAMP_SQL과 같은 UTC 'YYYY-MM-DD HH:MM:SS' 형식)"""
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+def hash_to_db(commit_hash: Optional[str]) -> Union[bytes, str, None]:
+    """16진수 커밋 해시는 BLOB(SHA-1 20바이트)으로 저장하고, 그 외 식별자는 문자열 그대로 저장합니다."""
+    if commit_hash is None:
+        return None
+    try:
+        return bytes.fromhex(commit_hash)
+    except ValueError:
+        return commit_hash
+
+def refresh_rollups(cursor: sqlite3.Cursor, repo_id: Optional[int] = None, after_id: int = 0):
+    """
+    history_rollup을 갱신합니다. after_id보다 큰 seq의 history 행만 읽어 버킷별 마지막 행으로
+    upsert하므로, 배치 삽입 직후 호출하면 새로 들어온 행 수에 비례하는 비용만 듭니다.
+    repo_id가 None이면 모든 저장소를 대상으로 합니다 (마이그레이션용).
+    """
+    repo_filter = "repo_id = ? AND" if repo_id is not None else ""
+    params = (repo_id, after_id) if repo_id is not None else (after_id,)
+    for resolution, bucket in ROLLUP_BUCKETS.items():
+        # MAX(seq)와 함께 선택한 ts/total_loc은 SQLite에서 그 최대 행의 값 (버킷의 마지막 커밋)
+        cursor.execute(
+            f"""
+            INSERT INTO history_rollup (repo_id, resolution, bucket, history_id, ts, total_loc)
+            SELECT repo_id, '{resolution}', {bucket}, MAX(seq), ts, total_loc
+            FROM history
+            WHERE {repo_filter} seq > ?
+            GROUP BY repo_id, {bucket}
+            ON CONFLICT(repo_id, resolution, bucket) DO UPDATE SET
+                history_id = excluded.history_id,
+                ts = excluded.ts,
+                total_loc = excluded.total_loc
+            WHERE excluded.history_id > history_rollup.history_id
+            """,
+            params
+        )
+
+def rebuild_rollups_after(cursor: sqlite3.Cursor, repo_id: int, after_id: int):
+    """
+    저장소의 after_id 이후 history 행을 지운 직후 호출하여, 지워진 행을 가리키던 롤업 버킷만
+    남은 행으로 다시 계산합니다. 버킷은 MAX(seq) 행을 가리키므로 지워진 행이 속했던 버킷은
+    모두 history_id > after_id이며, 비용은 되감은 구간의 버킷 수에만 비례합니다.
+    """
+    for resolution, bucket in ROLLUP_BUCKETS.items():
+        cursor.execute(
+            """
+            SELECT bucket FROM history_rollup
+            WHERE repo_id = ? AND resolution = ? AND history_id > ?
+            """,
+            (repo_id, resolution, after_id)
+        )
+        buckets = [row[0] for row in cursor.fetchall()]
+        if not buckets:
+            continue
+        cursor.execute(
+            "DELETE FROM history_rollup WHERE repo_id = ? AND resolution = ? AND history_id > ?",
+            (repo_id, resolution, after_id)
+        )
+        placeholders = ",".join("?" for _ in buckets)
+        cursor.execute(
+            f"""
+            INSERT INTO history_rollup (repo_id, resolution, bucket, history_id, ts, total_loc)
+            SELECT repo_id, '{resolution}', {bucket}, MAX(seq), ts, total_loc
+            FROM history
+            WHERE repo_id = ? AND {bucket} IN ({placeholders})
+            GROUP BY {bucket}
+            """,
+            (repo_id, *buckets)
+        )
+
+def rebuild_rollup_range(cursor: sqlite3.Cursor, repo_id: int, resolution: str, start_ts: int, end_ts: int):
+    """
+    [start_ts, end_ts) 구간의 해상도 버킷을 history에서 다시 계산합니다 (보존 정책으로 행을 지운 뒤 호출).
+    구간 경계는 해당 해상도의 버킷 경계와 맞아야 합니다.
+    """
+    bucket = ROLLUP_BUCKETS[resolution]
+    cursor.execute(
+        "DELETE FROM history_rollup WHERE repo_id = ? AND resolution = ? AND ts >= ? AND ts < ?",
+        (repo_id, resolution, start_ts, end_ts)
+    )
+    cursor.execute(
+        f"""
+        INSERT INTO history_rollup (repo_id, resolution, bucket, history_id, ts, total_loc)
+        SELECT repo_id, '{resolution}', {bucket}, MAX(seq), ts, total_loc
+        FROM history
+        WHERE repo_id = ? AND ts >= ? AND ts < ?
+        GROUP BY {bucket}
+        """,
+        (repo_id, start_ts, end_ts)
+    )
+
+def _migrate_history_schema(conn: sqlite3.Connection):
+    """
+    구버전 history(문자열 timestamp/commit_hash, 대리키 id, 보조 인덱스 2개)를 압축 스키마로 옮깁니다.
+    id는 seq로 그대로 보존되므로 체크포인트/롤업의 history_id와 증분 조회 커서는 계속 유효합니다.
+    """
+    cursor = conn.cursor()
+    cursor.execute("PRAGMA table_info(history)")
+    columns = [info[1] for info in cursor.fetchall()]
+    if not columns or 'id' not in columns:
+        return False
+
+    conn.create_function("to_epoch", 1, to_epoch, deterministic=True)
+    conn.create_function("hash_to_db", 1, hash_to_db, deterministic=True)
+    delta_columns = "insertions, deletions" if 'insertions' in columns else "NULL, NULL"
+    cursor.execute("ALTER TABLE history RENAME TO history_legacy")
+    cursor.execute(HISTORY_TABLE_SQL)
+    # 클러스터 키 순서로 넣어 B-tree를 순차적으로 채움
+    cursor.execute(
+        f"""
+        INSERT OR IGNORE INTO history (repo_id, ts, seq, commit_hash, total_loc, insertions, deletions)
+        SELECT repo_id, ts, id, hash_to_db(commit_hash), total_loc, {delta_columns}
+        FROM (SELECT *, to_epoch(timestamp) AS ts FROM history_legacy WHERE repo_id IS NOT NULL)
+        ORDER BY repo_id, ts, id
+        """
+    )
+    print(f"Database Migration: Converted {cursor.rowcount} 'history' rows to the compact schema.")
+    cursor.execute("DROP TABLE history_legacy")
+    # 롤업은 파생 데이터이므로 새 버킷 기준(UTC)으로 다시 계산
+    cursor.execute("DROP TABLE IF EXISTS history_rollup")
+    return True
+
+def _create_history_tables(conn: sqlite3.Connection) -> bool:
+    """
+    히스토리 테이블과 인덱스를 만듭니다 (메인 DB와 저장소별 샤드 DB 공통).
+    구버전 history를 압축 스키마로 변환했으면 True를 반환합니다 (호출자가 VACUUM).
+    """
+    cursor = conn.cursor()
+    migrated = _migrate_history_schema(conn)
+    cursor.execute(HISTORY_TABLE_SQL)
+
+    # language_history 테이블: 언어별 누적 라인수 (해당 커밋에서 변경된 언어만 기록하는 희소 테이블)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS language_history (
+            repo_id INTEGER NOT NULL,
+            timestamp DATETIME NOT NULL,
+            commit_hash TEXT NOT NULL,
+            language TEXT NOT NULL,
+            total_loc INTEGER NOT NULL,
+            FOREIGN KEY(repo_id) REFERENCES repositories(id)
+        )
+    ''')
+
+    # loc_checkpoints 테이블: 샘플 커밋의 실측 라인수(cloc)와 numstat 누적 추정치
+    # offset(= measured_loc - estimated_loc)을 조회 시 구간별로 적용하여 누적 오차를 보정
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS loc_checkpoints (
+            repo_id INTEGER NOT NULL,
+            history_id INTEGER NOT NULL,
+            commit_hash TEXT NOT NULL,
+            estimated_loc INTEGER NOT NULL,
+            measured_loc INTEGER NOT NULL,
+            measured_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY(repo_id, commit_hash),
+            FOREIGN KEY(repo_id) REFERENCES repositories(id)
+        )
+    ''')
+
+    # history_rollup 테이블: 해상도(day/week/month)별 버킷의 마지막 히스토리 행
+    # add_history_batch에서 증분 갱신되며, get_stats가 원본 history 대신 조회
+    cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='history_rollup'")
+    rollup_exists = cursor.fetchone() is not None
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS history_rollup (
+            repo_id INTEGER NOT NULL,
+            resolution TEXT NOT NULL,
+            bucket TEXT NOT NULL,
+            history_id INTEGER NOT NULL,
+            ts INTEGER NOT NULL,
+            total_loc INTEGER NOT NULL,
+            PRIMARY KEY(repo_id, resolution, bucket)
+        ) WITHOUT ROWID
+    ''')
+
+    # history_compaction 테이블: 보존 정책 계층별로 압축을 마친 구간의 끝(UTC epoch 초, 배타적)
+    # 압축 구간과 같은 트랜잭션에서 갱신되므로 중단되어도 다음 실행이 이어서 진행
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS history_compaction (
+            repo_id INTEGER PRIMARY KEY,
+            daily_until INTEGER NOT NULL DEFAULT 0,
+            weekly_until INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # 커밋 순서(seq) 조회/증분 커서용, 중복 커밋 방지용 (시간 범위 조회는 클러스터 키가 담당)
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_history_repo_seq ON history(repo_id, seq);")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_history_repo_commit ON history(repo_id, commit_hash);")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_language_history_repo_commit ON language_history(repo_id, commit_hash, language);")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_language_history_repo_time ON language_history(repo_id, timestamp);")
+
+    # 롤업 테이블이 새로 생긴 기존 DB는 전체 히스토리로 한 번 채움
+    if not rollup_exists:
+        refresh_rollups(cursor)
+    return migrated
+
+class _ConnectionPool:
+    """
+    DB 파일별 커넥션 풀 (스레드 안전). 매 호출마다 connect/close 하는 대신 튜닝된 커넥션을 재사용합니다.
+    커넥션은 한 번에 한 스레드만 빌려 쓰므로 check_same_thread를 끄고 스레드 간에 공유합니다.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.pid = os.getpid()
+        self.initialized = False
+        self.init_lock = threading.Lock()
+        self._idle: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False)
+        # 딕셔너리 형태로 결과를 받기 위해 row_factory 설정
+        conn.row_factory = sqlite3.Row
+        for pragma in CONNECTION_PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self) -> sqlite3.Connection:
+        with self._lock:
+            if self._idle:
+                return self._idle.pop()
+        return self._connect()
+
+    def release(self, conn: sqlite3.Connection):
+        try:
+            # 커밋되지 않은 변경은 기존 close()와 동일하게 버림
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            conn.close()
+            return
+        with self._lock:
+            if len(self._idle) < POOL_MAX_IDLE:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+_pools: Dict[str, _ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def _get_pool(db_path: str) -> _ConnectionPool:
+    """DB 경로별 풀 (프로세스당 하나). fork된 자식 프로세스는 부모의 커넥션을 쓰지 않고 새 풀을 만듦"""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[key] = _ConnectionPool(db_path)
+        return pool
 
 class DatabaseConnection:
-    def __init__(self, db_path: str = "codemonitor.db"):
+    """
+    메인 DB(저장소/설정/작업 + 분할하지 않은 저장소의 히스토리) 또는 저장소별 히스토리 샤드 파일에 대한 연결.
+    history_only이면 히스토리 테이블(history, language_history, loc_checkpoints, history_rollup)만 만듭니다.
+    """
+
+    def __init__(self, db_path: str = "codemonitor.db", history_only: bool = False):
         self.db_path = db_path
-        self._initialize_db()
+        self.history_only = history_only
+        # 스키마 초기화/마이그레이션 검사는 프로세스당 한 번만 수행 (워커 스레드마다 생성해도 비용 없음)
+        pool = _get_pool(db_path)
+        with pool.init_lock:
+            if not pool.initialized:
+                self._initialize_db()
+                pool.initialized = True
+
+    @property
+    def shard_dir(self) -> str:
+        """저장소별 히스토리 샤드 파일을 두는 디렉터리 (예: codemonitor.db -> codemonitor_shards/)"""
+        return os.path.splitext(os.path.abspath(self.db_path))[0] + "_shards"
+
+    @property
+    def numstat_cache_path(self) -> str:
+        """커밋별 numstat 캐시 파일 경로 (예: codemonitor.db -> codemonitor_numstat.db)"""
+        return os.path.splitext(os.path.abspath(self.db_path))[0] + "_numstat.db"
+
+    def history_stores(self, repo_ids: List[int]) -> List[Tuple["DatabaseConnection", List[int]]]:
+        """
+        저장소들의 히스토리가 들어 있는 DB별로 repo_ids를 묶어 [(DB, [repo_id, ...]), ...]로 반환합니다.
+        샤드가 없는 저장소는 메인 DB로 묶이며, 등록되지 않은(삭제된) 저장소는 제외됩니다.
+        샤드 파일은 처음 사용할 때 열고(없으면 생성) 이후에는 커넥션 풀을 재사용합니다.
+        """
+        if not repo_ids:
+            return []
+        placeholders = ",".join("?" for _ in repo_ids)
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, history_shard FROM repositories WHERE id IN ({placeholders})", list(repo_ids)
+            ).fetchall()
+        shards = {row[0]: row[1] for row in rows}
+
+        stores: Dict[Optional[str], List[int]] = {}
+        for repo_id in dict.fromkeys(repo_ids):
+            if repo_id in shards:
+                stores.setdefault(shards[repo_id], []).append(repo_id)
+        return [
+            (self if shard is None else self.shard(shard), ids)
+            for shard, ids in stores.items()
+        ]
+
+    def history_store(self, repo_id: int) -> Optional["DatabaseConnection"]:
+        """저장소 하나의 히스토리 DB (등록되지 않은 저장소는 None)"""
+        stores = self.history_stores([repo_id])
+        return stores[0][0] if stores else None
+
+    def shard(self, name: str) -> "DatabaseConnection":
+        return DatabaseConnection(os.path.join(self.shard_dir, name), history_only=True)
+
+    def delete_shard(self, name: str):
+        """샤드의 커넥션 풀을 닫고 DB/WAL 파일을 지웁니다 (저장소 삭제 시 행 단위 DELETE 대신 사용)."""
+        path = os.path.join(self.shard_dir, name)
+        DatabaseConnection.close_path(path)
+        for suffix in ("", "-wal", "-shm"):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
 
     def _initialize_db(self):
         """데이터베이스 스키마 초기화 및 WAL 모드 설정"""
+        if self.history_only:
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             # 성능 향상을 위한 WAL 모드
             cursor.execute("PRAGMA journal_mode=WAL;")
+
+            if self.history_only:
+                _create_history_tables(conn)
+                # 결과를 읽지 않은 PRAGMA 문이 남아 있으면 커밋할 수 없으므로 커서를 먼저 닫음
+                cursor.close()
+                conn.commit()
+                return
             
             # repositories 테이블
+            # history_shard: 히스토리를 별도 파일(shard_dir 안)에 두는 저장소의 샤드 파일 이름 (NULL이면 메인 DB)
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS repositories (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT UNIQUE NOT NULL,
                     path TEXT NOT NULL,
                     include_path TEXT,
+                    loc_offset INTEGER DEFAULT 0,
+                    history_version INTEGER DEFAULT 0,
+                    rewind_count INTEGER DEFAULT 0,
+                    scan_interval_minutes INTEGER,
+                    history_shard TEXT,
                     status TEXT DEFAULT 'idle',
                     last_scanned_at DATETIME,
                     created_at DATETIME DEFAULT CURRENT_TIMESTAMP
                 )
             ''')
-            
-            # history 테이블
-            cursor.execute('''
-                CREATE TABLE IF NOT EXISTS history (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    repo_id INTEGER,
-                    timestamp DATETIME NOT NULL,
-                    commit_hash TEXT,
-                    total_loc INTEGER NOT NULL,
-                    FOREIGN KEY(repo_id) REFERENCES repositories(id)
-                )
-            ''')
+
+            # 히스토리 테이블 (구버전 history 스키마는 압축 스키마로 변환)
+            migrated = _create_history_tables(conn)
 
             # settings 테이블
             cursor.execute('''
@@ -49,9 +443,25 @@ class DatabaseConnection:
                 )
             ''')
 
-            # 인덱스 생성
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_history_repo_time ON history(repo_id, timestamp);")
-            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_history_repo_commit ON history(repo_id, commit_hash);")
+            # tasks 테이블: 백필 작업 상태와 체크포인트 (서버 재시작 후 이어서 실행)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS tasks (
+                    task_id TEXT PRIMARY KEY,
+                    repo_id INTEGER NOT NULL,
+                    task_type TEXT NOT NULL,
+                    include_path TEXT,
+                    status TEXT NOT NULL,
+                    progress_commits INTEGER DEFAULT 0,
+                    total_commits INTEGER DEFAULT 0,
+                    checkpoint_commit TEXT,
+                    checkpoint_loc INTEGER,
+                    error TEXT,
+                    started_at DATETIME,
+                    completed_at DATETIME,
+                    updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks(status);")
             
             # 스키마 마이그레이션 로직 추가: 구버전 DB에 include_path 컬럼이 없는 경우 추가
             cursor.execute("PRAGMA table_info(repositories)")
@@ -59,16 +469,46 @@ class DatabaseConnection:
             if 'include_path' not in columns:
                 cursor.execute("ALTER TABLE repositories ADD COLUMN include_path TEXT;")
                 print("Database Migration: Added 'include_path' column to 'repositories' table.")
+            if 'loc_offset' not in columns:
+                cursor.execute("ALTER TABLE repositories ADD COLUMN loc_offset INTEGER DEFAULT 0;")
+                print("Database Migration: Added 'loc_offset' column to 'repositories' table.")
+            if 'history_version' not in columns:
+                cursor.execute("ALTER TABLE repositories ADD COLUMN history_version INTEGER DEFAULT 0;")
+                print("Database Migration: Added 'history_version' column to 'repositories' table.")
+            if 'rewind_count' not in columns:
+                cursor.execute("ALTER TABLE repositories ADD COLUMN rewind_count INTEGER DEFAULT 0;")
+                print("Database Migration: Added 'rewind_count' column to 'repositories' table.")
+            if 'scan_interval_minutes' not in columns:
+                cursor.execute("ALTER TABLE repositories ADD COLUMN scan_interval_minutes INTEGER;")
+                print("Database Migration: Added 'scan_interval_minutes' column to 'repositories' table.")
+            if 'history_shard' not in columns:
+                cursor.execute("ALTER TABLE repositories ADD COLUMN history_shard TEXT;")
+                print("Database Migration: Added 'history_shard' column to 'repositories' table.")
 
             conn.commit()
 
+        if migrated:
+            # 변환으로 비워진 페이지를 반환하여 파일 크기를 줄임 (트랜잭션 밖에서 실행)
+            with self.get_connection() as conn:
+                conn.execute("VACUUM")
+
     @contextmanager
     def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
-        """컨텍스트 매니저를 통한 안전한 커넥션 제공"""
-        conn = sqlite3.connect(self.db_path)
-        # 딕셔너리 형태로 결과를 받기 위해 row_factory 설정
-        conn.row_factory = sqlite3.Row
+        """컨텍스트 매니저를 통한 안전한 커넥션 제공 (풀에서 빌려 쓰고 반환)"""
+        pool = _get_pool(self.db_path)
+        conn = pool.acquire()
         try:
             yield conn
         finally:
-            conn.close()
+            pool.release(conn)
+
+    def close(self):
+        """이 DB 파일의 유휴 커넥션을 닫고 풀을 제거합니다 (파일 삭제/재생성 전 호출, 예: 테스트)"""
+        DatabaseConnection.close_path(self.db_path)
+
+    @staticmethod
+    def close_path(db_path: str):
+        with _pools_lock:
+            pool = _pools.pop(os.path.abspath(db_path), None)
+        if pool:
+            pool.close()
@@ -1,7 +1,122 @@
-from typing import List, Dict, Any, Optional
-from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple, Callable
+from datetime import datetime, timedelta
+from bisect import bisect_right
 import sqlite3
-from .database import DatabaseConnection
+import numpy as np
+from .database import (DatabaseConnection, refresh_rollups, rebuild_rollups_after, rebuild_rollup_range, to_epoch,
+                       format_epoch, hash_to_db, ROLLUP_BUCKETS, TIMESTAMP_SQL, HASH_SQL)
+
+# history 저장 모드 (settings 'history_storage_mode')
+# - absolute: 커밋별 누적 total_loc을 그대로 조회
+# - delta: 커밋별 (insertions, deletions)에서 벡터화된 누적합으로 total을 계산
+#          (total_loc은 증분 동기화 재개와 조회 기간 직전의 누적 시작값으로만 사용)
+STORAGE_ABSOLUTE = "absolute"
+STORAGE_DELTA = "delta"
+
+# history 저장 배치 (settings 'history_storage_layout', 새로 추가하는 저장소에만 적용)
+# - single: 모든 저장소의 히스토리를 메인 DB에 저장
+# - per_repo: 저장소마다 별도의 히스토리 DB 파일(샤드)에 저장. 삭제가 파일 삭제로 끝나고
+#             저장소별 쓰기 잠금이 분리되어 동시 백필이 서로 기다리지 않음
+LAYOUT_SINGLE = "single"
+LAYOUT_PER_REPO = "per_repo"
+
+# get_stats 자동 해상도 선택: 조회 기간(일)이 기준 이하인 가장 촘촘한 해상도를 사용하고,
+# 더 긴 기간은 가장 성긴 해상도(month)로 조회하여 응답 크기와 조회 비용을 일정하게 유지
+ROLLUP_MAX_DAYS = [("day", 366), ("week", 366 * 5)]
+ROLLUP_COARSEST = "month"
+
+# 히스토리 보존 정책 (settings, 일 단위, 0이면 해당 계층 비활성)
+# - 'history_retention_commit_days': 이 기간이 지난 커밋 단위 행은 저장소/일별 마지막 행만 남김
+# - 'history_retention_daily_days': 이 기간이 지난 행은 저장소/주별 마지막 행만 남김
+#   (주가 월 경계에 걸치면 월의 마지막 행도 남겨 주/월 롤업이 가리키는 행을 보존)
+# 압축은 COMPACTION_CHUNK_DAYS(주 단위 정렬 유지를 위해 7의 배수) 구간씩 트랜잭션을 나눠 진행
+COMPACTION_CHUNK_DAYS = 28
+DAY_SECONDS = 86400
+COMPACTION_TIERS = {
+    "daily": ROLLUP_BUCKETS["day"],
+    "weekly": f"{ROLLUP_BUCKETS['week']} || {ROLLUP_BUCKETS['month']}",
+}
+
+def _align_compaction(ts: int, tier: str) -> int:
+    """ts 이하의 계층 경계(UTC 자정, weekly는 월요일 자정). epoch 0(1970-01-01)은 목요일"""
+    days = ts // DAY_SECONDS
+    if tier == "weekly":
+        days -= (days + 3) % 7
+    return days * DAY_SECONDS
+
+def select_resolution(start_date: str, end_date: str) -> str:
+    """조회 기간에 맞는 가장 성긴 롤업 해상도를 선택합니다."""
+    try:
+        span = (datetime.strptime(end_date[:10], "%Y-%m-%d") - datetime.strptime(start_date[:10], "%Y-%m-%d")).days
+    except ValueError:
+        return "day"
+    for resolution, max_days in ROLLUP_MAX_DAYS:
+        if span <= max_days:
+            return resolution
+    return ROLLUP_COARSEST
+
+# 히스토리 데이터 변경 리스너 (예: API 결과 캐시 무효화). 변경된 repo_id를 인자로 호출됨
+_history_listeners: List[Callable[[int], None]] = []
+
+def add_history_listener(listener: Callable[[int], None]):
+    _history_listeners.append(listener)
+
+def _notify_history_changed(repo_id: int):
+    for listener in list(_history_listeners):
+        try:
+            listener(repo_id)
+        except Exception as e:
+            print(f"History listener error [repo {repo_id}]: {e}")
+
+# 저장소 메타데이터(상태, 마지막 스캔 시각 등) 변경 리스너. (repo_id, 변경된 필드 dict)로 호출됨
+_repository_listeners: List[Callable[[int, Dict[str, Any]], None]] = []
+
+def add_repository_listener(listener: Callable[[int, Dict[str, Any]], None]):
+    _repository_listeners.append(listener)
+
+def _notify_repository_changed(repo_id: int, changes: Dict[str, Any]):
+    for listener in list(_repository_listeners):
+        try:
+            listener(repo_id, changes)
+        except Exception as e:
+            print(f"Repository listener error [repo {repo_id}]: {e}")
+
+def bucket_start(timestamp: str, resolution: str) -> str:
+    """timestamp가 속한 버킷의 시작일 (YYYY-MM-DD). week(%W)는 월요일 시작"""
+    day = timestamp[:10]
+    if resolution == "month":
+        return f"{day[:7]}-01"
+    if resolution == "week":
+        date = datetime.strptime(day, "%Y-%m-%d")
+        return (date - timedelta(days=date.weekday())).strftime("%Y-%m-%d")
+    return day
+
+def _bump_history_version(cursor: sqlite3.Cursor, repo_id: int):
+    """
+    히스토리 데이터를 쓴 뒤 저장소의 history_version을 올립니다 (ETag/캐시 키).
+    메인 DB에 히스토리가 있는 저장소는 쓰기와 같은 트랜잭션에서, 샤드 저장소는 샤드 커밋 직후 호출합니다.
+    """
+    cursor.execute(
+        "UPDATE repositories SET history_version = history_version + 1 WHERE id = ?",
+        (repo_id,)
+    )
+
+def _bump_history_versions(db: DatabaseConnection, repo_ids: List[int], rewound: bool = False):
+    """샤드에 기록한 저장소들의 history_version(되감기면 rewind_count도)을 메인 DB에서 한 번에 올립니다."""
+    if not repo_ids:
+        return
+    with db.get_connection() as conn:
+        cursor = conn.cursor()
+        for repo_id in repo_ids:
+            if rewound:
+                cursor.execute("UPDATE repositories SET rewind_count = rewind_count + 1 WHERE id = ?", (repo_id,))
+            _bump_history_version(cursor, repo_id)
+        conn.commit()
+
+def _max_seq(cursor: sqlite3.Cursor, repo_id: int) -> int:
+    """저장소 history의 최대 seq ((repo_id, seq) 인덱스의 끝만 읽음, 기록이 없으면 0)"""
+    cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM history WHERE repo_id = ?", (repo_id,))
+    return cursor.fetchone()[0]
 
 class RepositoryManager:
     def __init__(self, db: DatabaseConnection):
@@ -15,12 +130,21 @@ class RepositoryManager:
                     "INSERT INTO repositories (name, path, include_path) VALUES (?, ?, ?)", 
                     (name, path, include_path)
                 )
+                repo_id = cursor.lastrowid
+                cursor.execute("SELECT value FROM settings WHERE key = 'history_storage_layout'")
+                row = cursor.fetchone()
+                if row and row['value'] == LAYOUT_PER_REPO:
+                    cursor.execute(
+                        "UPDATE repositories SET history_shard = ? WHERE id = ?",
+                        (f"repo_{repo_id}.db", repo_id)
+                    )
                 conn.commit()
-                return cursor.lastrowid
             except sqlite3.IntegrityError:
                 # 이미 존재하는 경우 ID 반환
                 cursor.execute("SELECT id FROM repositories WHERE name = ?", (name,))
                 return cursor.fetchone()['id']
+        _notify_repository_changed(repo_id, {"added": True})
+        return repo_id
 
     def get_all_repositories(self) -> List[Dict[str, Any]]:
         with self.db.get_connection() as conn:
@@ -36,6 +160,7 @@ class RepositoryManager:
                 (status, repo_id)
             )
             conn.commit()
+        _notify_repository_changed(repo_id, {"status": status})
 
     def update_last_scanned(self, repo_id: int, scan_time: datetime):
         with self.db.get_connection() as conn:
@@ -45,84 +170,748 @@ class RepositoryManager:
                 (scan_time, repo_id)
             )
             conn.commit()
+        _notify_repository_changed(repo_id, {"last_scanned_at": str(scan_time)})
+
+    def set_scan_interval(self, repo_id: int, minutes: Optional[int]):
+        """저장소별 주기 스캔 간격(분) 설정. None이면 자정 일괄 동기화만 수행"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE repositories SET scan_interval_minutes = ? WHERE id = ?",
+                (minutes, repo_id)
+            )
+            conn.commit()
+        _notify_repository_changed(repo_id, {"scan_interval_minutes": minutes})
+
+    def set_loc_offset(self, repo_id: int, loc_offset: int):
+        """저장소 기준선(baseline) 보정값 설정. 히스토리 행을 다시 쓰지 않는 O(1) 재기준화."""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE repositories SET loc_offset = ? WHERE id = ?",
+                (loc_offset, repo_id)
+            )
+            _bump_history_version(cursor, repo_id)
+            conn.commit()
+        _notify_history_changed(repo_id)
 
     def delete_repository(self, repo_id: int):
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            # history 테이블에서 관련 데이터 삭제
-            cursor.execute("DELETE FROM history WHERE repo_id = ?", (repo_id,))
+            cursor.execute("SELECT history_shard FROM repositories WHERE id = ?", (repo_id,))
+            row = cursor.fetchone()
+            shard = row['history_shard'] if row else None
+            if not shard:
+                # history 테이블에서 관련 데이터 삭제
+                cursor.execute("DELETE FROM history WHERE repo_id = ?", (repo_id,))
+                cursor.execute("DELETE FROM language_history WHERE repo_id = ?", (repo_id,))
+                cursor.execute("DELETE FROM loc_checkpoints WHERE repo_id = ?", (repo_id,))
+                cursor.execute("DELETE FROM history_rollup WHERE repo_id = ?", (repo_id,))
+                cursor.execute("DELETE FROM history_compaction WHERE repo_id = ?", (repo_id,))
+            cursor.execute("DELETE FROM tasks WHERE repo_id = ?", (repo_id,))
             # repositories 테이블에서 삭제
             cursor.execute("DELETE FROM repositories WHERE id = ?", (repo_id,))
             conn.commit()
+        # 샤드 저장소는 행 단위 삭제 대신 파일을 지움 (행 수와 무관)
+        if shard:
+            self.db.delete_shard(shard)
+        _notify_history_changed(repo_id)
+        _notify_repository_changed(repo_id, {"deleted": True})
 
 class HistoryManager:
     def __init__(self, db: DatabaseConnection):
         self.db = db
 
+    def _store(self, repo_id: int) -> DatabaseConnection:
+        """저장소의 히스토리 DB (등록되지 않은 저장소는 메인 DB: 조회 결과가 비어 있음)"""
+        return self.db.history_store(repo_id) or self.db
+
     def add_history_batch(self, repo_id: int, records: List[Dict[str, Any]]):
         """
-        records: [{'timestamp': datetime/str, 'commit_hash': str, 'total_loc': int}, ...]
-        벌크 인서트를 수행하며, 중복 커밋은 무시합니다.
+        records: [{'timestamp': datetime/str/epoch, 'commit_hash': str, 'total_loc': int,
+                   'insertions': int, 'deletions': int}, ...]  (insertions/deletions는 선택)
+        벌크 인서트를 수행하며, 중복 커밋은 무시합니다. timestamp는 UTC epoch으로 변환하여 저장합니다.
+        """
+        self.add_history_batches([(repo_id, records, [])])
+
+    def add_history_batches(self, batches: List[Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]]):
         """
-        if not records:
+        여러 저장소의 (repo_id, history 레코드, 언어별 레코드) 묶음을 히스토리 DB(메인 또는 샤드)별로
+        하나의 트랜잭션으로 기록합니다. 롤업 갱신도 같은 트랜잭션에서 처리하며, 중복 커밋은 무시합니다.
+        history 행에는 저장소별로 증가하는 seq를 레코드 순서(커밋 순서)대로 부여합니다.
+        (HistoryWriter가 여러 워커의 쓰기를 모아 한 번에 커밋할 때 사용)
+        """
+        batches = [(repo_id, records, lang) for repo_id, records, lang in batches if records or lang]
+        if not batches:
             return
 
-        with self.db.get_connection() as conn:
+        changed = []
+        # 큐에 들어간 뒤 삭제된 저장소의 배치는 버림 (history_stores가 등록된 저장소만 반환, 고아 행 방지)
+        for store, repo_ids in self.db.history_stores([repo_id for repo_id, _, _ in batches]):
+            store_changed = self._write_batches(store, [b for b in batches if b[0] in repo_ids])
+            if store is not self.db:
+                _bump_history_versions(self.db, store_changed)
+            changed.extend(store_changed)
+
+        # 중복 커밋만 있어 실제로 추가된 행이 없으면 캐시를 유지
+        for repo_id in changed:
+            _notify_history_changed(repo_id)
+
+    def _write_batches(self, store: DatabaseConnection,
+                       batches: List[Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]]) -> List[int]:
+        """한 히스토리 DB에 배치들을 기록하고, 행이 추가된 저장소 목록을 반환합니다."""
+        changed: List[int] = []
+        with store.get_connection() as conn:
             cursor = conn.cursor()
-            # bulk insert
-            batch_data = [
-                (repo_id, rec['timestamp'], rec.get('commit_hash'), rec['total_loc'])
-                for rec in records
-            ]
-            
-            cursor.executemany(
-                """
-                INSERT OR IGNORE INTO history (repo_id, timestamp, commit_hash, total_loc)
-                VALUES (?, ?, ?, ?)
-                """,
-                batch_data
-            )
+            # 저장소별 기존 최대 seq (롤업 갱신 기준)와 다음에 부여할 seq
+            last_seqs: Dict[int, int] = {}
+            next_seqs: Dict[int, int] = {}
+
+            for repo_id, records, language_records in batches:
+                inserted = 0
+                if records:
+                    if repo_id not in last_seqs:
+                        last_seqs[repo_id] = next_seqs[repo_id] = _max_seq(cursor, repo_id)
+                    next_seq = next_seqs[repo_id]
+                    next_seqs[repo_id] += len(records)
+                    # bulk insert
+                    cursor.executemany(
+                        """
+                        INSERT OR IGNORE INTO history (repo_id, ts, seq, commit_hash, total_loc, insertions, deletions)
+                        VALUES (?, ?, ?, ?, ?, ?, ?)
+                        """,
+                        [
+                            (repo_id, to_epoch(rec['timestamp']), seq, hash_to_db(rec.get('commit_hash')),
+                             rec['total_loc'], rec.get('insertions'), rec.get('deletions'))
+                            for seq, rec in enumerate(records, next_seq + 1)
+                        ]
+                    )
+                    inserted += cursor.rowcount
+                if language_records:
+                    cursor.executemany(
+                        """
+                        INSERT OR IGNORE INTO language_history (repo_id, timestamp, commit_hash, language, total_loc)
+                        VALUES (?, ?, ?, ?, ?)
+                        """,
+                        [
+                            (repo_id, rec['timestamp'], rec['commit_hash'], rec['language'], rec['total_loc'])
+                            for rec in language_records
+                        ]
+                    )
+                    inserted += cursor.rowcount
+                if inserted > 0 and repo_id not in changed:
+                    if store is self.db:
+                        _bump_history_version(cursor, repo_id)
+                    changed.append(repo_id)
+
+            # 같은 트랜잭션에서 새로 들어온 행만으로 롤업 갱신 (저장소별 (repo_id, seq) 인덱스 범위 조회)
+            for repo_id, last_seq in last_seqs.items():
+                refresh_rollups(cursor, repo_id, after_id=last_seq)
             conn.commit()
+        return changed
 
-    def get_stats(self, repo_ids: List[int], start_date: str, end_date: str) -> List[Dict[str, Any]]:
+    def get_stats(self, repo_ids: List[int], start_date: str, end_date: str,
+                  resolution: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        저장소별 시계열 통계. resolution('day'|'week'|'month')을 생략하면 기간에 맞춰 자동 선택하며,
+        각 버킷의 마지막 커밋 시점 라인수를 반환합니다.
+        """
         if not repo_ids:
             return []
+        resolution = resolution or select_resolution(start_date, end_date)
 
-        placeholders = ",".join("?" for _ in repo_ids)
-        query = f"""
-            SELECT repo_id, timestamp, total_loc 
-            FROM history 
-            WHERE id IN (
-                SELECT MAX(id)
-                FROM history 
-                WHERE repo_id IN ({placeholders})
-                  AND timestamp >= ? AND timestamp <= ?
-                GROUP BY repo_id, SUBSTR(timestamp, 1, 10)
-            )
-            ORDER BY repo_id, timestamp ASC
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT value FROM settings WHERE key = 'history_storage_mode'")
+            row = cursor.fetchone()
+            mode = row['value'] if row else STORAGE_ABSOLUTE
+            baselines = self._get_baseline_offsets(cursor, repo_ids)
+
+        # 저장소별 히스토리 DB(메인/샤드)를 차례로 조회해 합침
+        rows: List[Dict[str, Any]] = []
+        offsets: Dict[int, Tuple[List[int], List[int]]] = {}
+        for store, store_repo_ids in self.db.history_stores(repo_ids):
+            with store.get_connection() as conn:
+                cursor = conn.cursor()
+                if mode == STORAGE_DELTA:
+                    rows.extend(self._get_rows_from_deltas(cursor, store_repo_ids, start_date, end_date, resolution))
+                else:
+                    rows.extend(self._get_rollup_rows(cursor, store_repo_ids, start_date, end_date, resolution))
+                offsets.update(self._get_checkpoint_offsets(cursor, store_repo_ids))
+        rows.sort(key=lambda row: row['repo_id'])
+
+        return self._apply_offsets(rows, offsets, baselines)
+
+    def get_history_cursor(self, repo_ids: List[int]) -> Tuple[Dict[int, int], List[Tuple[Any, ...]]]:
         """
-        params = repo_ids + [start_date, end_date]
+        증분 조회용 커서 정보: ({repo_id: history 최대 seq}, 저장소별 보정 상태).
+        seq는 저장소마다 증가하므로 이후 기록되는 행은 모두 해당 저장소의 값보다 큰 seq를 받습니다.
+        기준선(loc_offset)이나 체크포인트가 바뀌거나 히스토리가 되감기면(rewind_count) 과거 시점 값도
+        바뀌므로, 보정 상태가 커서 발급 시점과 다르면 증분 조회 대신 전체를 다시 조회해야 합니다.
+        """
+        last_ids: Dict[int, int] = {repo_id: 0 for repo_id in repo_ids}
+        if not repo_ids:
+            return last_ids, []
+
+        # 체크포인트는 INSERT OR REPLACE로 기록되므로 교체 시에도 MAX(rowid)가 증가
+        checkpoints: Dict[int, Tuple[int, Optional[int]]] = {}
+        for store, store_repo_ids in self.db.history_stores(repo_ids):
+            with store.get_connection() as conn:
+                cursor = conn.cursor()
+                for repo_id in store_repo_ids:
+                    last_ids[repo_id] = _max_seq(cursor, repo_id)
+                    cursor.execute("SELECT COUNT(rowid), MAX(rowid) FROM loc_checkpoints WHERE repo_id = ?", (repo_id,))
+                    checkpoints[repo_id] = tuple(cursor.fetchone())
 
         with self.db.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(query, params)
-            return [dict(row) for row in cursor.fetchall()]
+            placeholders = ",".join("?" for _ in repo_ids)
+            cursor.execute(
+                f"SELECT id, loc_offset, rewind_count FROM repositories WHERE id IN ({placeholders}) ORDER BY id",
+                repo_ids
+            )
+            state = [tuple(row) + checkpoints.get(row['id'], (0, None)) for row in cursor.fetchall()]
+        return last_ids, state
+
+    def get_changed_since(self, repo_ids: List[int], since: Dict[int, int]) -> Optional[str]:
+        """저장소별 since seq 이후 추가된 history 행 중 가장 이른 timestamp (없으면 None). seq 범위 스캔이라 새 행 수에 비례"""
+        earliest = None
+        for store, store_repo_ids in self.db.history_stores(repo_ids):
+            with store.get_connection() as conn:
+                cursor = conn.cursor()
+                for repo_id in store_repo_ids:
+                    cursor.execute(
+                        "SELECT MIN(ts) FROM history WHERE repo_id = ? AND seq > ?",
+                        (repo_id, since.get(repo_id, 0))
+                    )
+                    ts = cursor.fetchone()[0]
+                    if ts is not None and (earliest is None or ts < earliest):
+                        earliest = ts
+        return format_epoch(earliest) if earliest is not None else None
+
+    def _apply_offsets(self, rows: List[Dict[str, Any]], offsets: Dict[int, Tuple[List[int], List[int]]],
+                       baselines: Dict[int, int]) -> List[Dict[str, Any]]:
+        """
+        드리프트 보정: 각 행에 직전 체크포인트의 offset을 적용 (첫 체크포인트 이전은 첫 offset)
+        offset은 cloc 물리적 줄 수(code + comment + blank) - numstat 누적값이므로, cloc이 인식하지 않는 파일의
+        줄 수만큼은 시계열이 cloc 기준으로 낮아집니다 (DriftReconciler 참고).
+        저장소 기준선(loc_offset)은 모든 행에 동일하게 더함
+        """
+        stats = []
+        for row in rows:
+            total_loc = row['total_loc'] + baselines.get(row['repo_id'], 0)
+            repo_offsets = offsets.get(row['repo_id'])
+            if repo_offsets:
+                history_ids, values = repo_offsets
+                idx = max(0, bisect_right(history_ids, row['id']) - 1)
+                total_loc += values[idx]
+            stats.append({"repo_id": row['repo_id'], "timestamp": row['timestamp'], "total_loc": max(0, total_loc)})
+        return stats
+
+    def get_totals_at(self, repo_ids: List[int], cutoff_days: List[str]) -> Dict[int, List[Optional[int]]]:
+        """
+        각 기준일(YYYY-MM-DD) 종료 시점의 저장소별 총 라인수 (보정 포함).
+        일 단위 롤업에서 기준일 이하 마지막 버킷을 인덱스로 바로 찾으므로 히스토리 크기와 무관합니다.
+        반환값: {repo_id: [기준일별 total 또는 None(그 이전 기록 없음)]}
+        """
+        if not repo_ids:
+            return {}
+
+        totals: Dict[int, List[Optional[int]]] = {rid: [None] * len(cutoff_days) for rid in repo_ids}
+        with self.db.get_connection() as conn:
+            baselines = self._get_baseline_offsets(conn.cursor(), repo_ids)
+        for store, store_repo_ids in self.db.history_stores(repo_ids):
+            with store.get_connection() as conn:
+                cursor = conn.cursor()
+                offsets = self._get_checkpoint_offsets(cursor, store_repo_ids)
+                for repo_id in store_repo_ids:
+                    for idx, cutoff in enumerate(cutoff_days):
+                        cursor.execute(
+                            f"""
+                            SELECT history_id AS id, repo_id, {TIMESTAMP_SQL} AS timestamp, total_loc
+                            FROM history_rollup
+                            WHERE repo_id = ? AND resolution = 'day' AND bucket <= ?
+                            ORDER BY bucket DESC
+                            LIMIT 1
+                            """,
+                            (repo_id, cutoff)
+                        )
+                        row = cursor.fetchone()
+                        if row:
+                            totals[repo_id][idx] = self._apply_offsets([dict(row)], offsets, baselines)[0]['total_loc']
+        return totals
+
+    def _get_rollup_rows(self, cursor: sqlite3.Cursor, repo_ids: List[int],
+                         start_date: str, end_date: str, resolution: str) -> List[Dict[str, Any]]:
+        """absolute 모드: 미리 집계된 history_rollup에서 해상도별 버킷의 마지막 행을 조회"""
+        placeholders = ",".join("?" for _ in repo_ids)
+        query = f"""
+            SELECT history_id AS id, repo_id, {TIMESTAMP_SQL} AS timestamp, total_loc
+            FROM history_rollup
+            WHERE repo_id IN ({placeholders})
+              AND resolution = ?
+              AND ts >= ? AND ts <= ?
+            ORDER BY repo_id, ts ASC
+        """
+        cursor.execute(query, repo_ids + [resolution, to_epoch(start_date), to_epoch(end_date)])
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _get_rows_from_deltas(self, cursor: sqlite3.Cursor, repo_ids: List[int],
+                              start_date: str, end_date: str, resolution: str) -> List[Dict[str, Any]]:
+        """
+        delta 모드: 기간 내 행이 걸친 seq 구간의 커밋 증감만 커밋 순서(seq)대로 읽어 NumPy 누적합으로 total을 계산한 뒤,
+        기간 내 저장소/버킷(해상도)별 마지막 행을 반환합니다.
+        누적합의 시작값은 구간 직전(seq 순) 행에 저장된 total_loc입니다. 워커가 같은 0 하한 누적(max(0, prev + delta))으로
+        기록한 커밋별 누적 체크포인트이므로, 그 이전 히스토리를 다시 더하지 않아 비용이 기간 내 행 수에 비례합니다.
+        0 하한 보정은 total = S - min(0, 누적 최소 S) (S: 시작값부터의 보정 없는 누적합) 공식으로 재현합니다.
+        증감 컬럼이 비어 있는 구버전 행은 저장된 total_loc의 차분으로 대체합니다.
+        """
+        start_ts, end_ts = to_epoch(start_date), to_epoch(end_date)
+        rows = []
+        for repo_id in repo_ids:
+            # 기간 내 행의 seq 범위 ((repo_id, ts, seq) 키 범위 스캔)
+            cursor.execute(
+                "SELECT MIN(seq), MAX(seq) FROM history WHERE repo_id = ? AND ts >= ? AND ts <= ?",
+                (repo_id, start_ts, end_ts)
+            )
+            first_seq, last_seq = cursor.fetchone()
+            if first_seq is None:
+                continue
+            cursor.execute(
+                "SELECT total_loc FROM history WHERE repo_id = ? AND seq < ? ORDER BY seq DESC LIMIT 1",
+                (repo_id, first_seq)
+            )
+            previous = cursor.fetchone()
+            initial = previous[0] if previous else 0
+
+            # 커밋 날짜가 seq 순서와 어긋난 기간 밖 행도 구간 안에 있으면 누적에 포함 (선택은 아래에서 기간으로 거름)
+            cursor.execute(
+                f"""
+                SELECT seq, ts, total_loc, insertions, deletions, {ROLLUP_BUCKETS[resolution]}
+                FROM history WHERE repo_id = ? AND seq >= ? AND seq <= ? ORDER BY seq
+                """,
+                (repo_id, first_seq, last_seq)
+            )
+            fetched = cursor.fetchall()
+
+            seqs, timestamps, stored, insertions, deletions, buckets = zip(*fetched)
+            stored = np.asarray(stored, dtype=np.int64)
+            ins = np.asarray([v if v is not None else -1 for v in insertions], dtype=np.int64)
+            dels = np.asarray([v if v is not None else 0 for v in deletions], dtype=np.int64)
+            deltas = np.where(ins >= 0, ins - dels, np.diff(stored, prepend=initial))
+
+            running = initial + np.cumsum(deltas)
+            totals = running - np.minimum(np.minimum.accumulate(running), 0)
+
+            timestamps = np.asarray(timestamps, dtype=np.int64)
+            in_range = np.nonzero((timestamps >= start_ts) & (timestamps <= end_ts))[0]
+
+            # 버킷별 마지막(가장 큰 seq) 행: 역순에서 처음 등장하는 위치
+            buckets = np.asarray(buckets, dtype=object)[in_range]
+            _, last_in_reversed = np.unique(buckets[::-1], return_index=True)
+            picked = in_range[in_range.size - 1 - last_in_reversed]
+            picked = picked[np.argsort(timestamps[picked], kind="stable")]
+
+            rows.extend(
+                {"id": seqs[i], "repo_id": repo_id, "timestamp": format_epoch(int(timestamps[i])),
+                 "total_loc": int(totals[i])}
+                for i in picked
+            )
+        return rows
+
+    def _get_baseline_offsets(self, cursor: sqlite3.Cursor, repo_ids: List[int]) -> Dict[int, int]:
+        placeholders = ",".join("?" for _ in repo_ids)
+        cursor.execute(
+            f"SELECT id, loc_offset FROM repositories WHERE id IN ({placeholders})",
+            repo_ids
+        )
+        return {row['id']: row['loc_offset'] or 0 for row in cursor.fetchall()}
+
+    def _get_checkpoint_offsets(self, cursor: sqlite3.Cursor, repo_ids: List[int]) -> Dict[int, Tuple[List[int], List[int]]]:
+        """저장소별 (체크포인트 history_id 목록, offset 목록)을 history_id 순으로 반환"""
+        placeholders = ",".join("?" for _ in repo_ids)
+        cursor.execute(
+            f"""
+            SELECT repo_id, history_id, measured_loc - estimated_loc AS offset
+            FROM loc_checkpoints
+            WHERE repo_id IN ({placeholders})
+            ORDER BY repo_id, history_id
+            """,
+            repo_ids
+        )
+        offsets: Dict[int, Tuple[List[int], List[int]]] = {}
+        for row in cursor.fetchall():
+            history_ids, values = offsets.setdefault(row['repo_id'], ([], []))
+            history_ids.append(row['history_id'])
+            values.append(row['offset'])
+        return offsets
 
     def get_last_history_record(self, repo_id: int) -> Optional[Dict[str, Any]]:
         """해당 저장소의 가장 최근(마지막) 히스토리 레코드를 반환합니다."""
-        query = """
-            SELECT commit_hash, total_loc, timestamp 
+        # 클러스터 키 (repo_id, ts, seq)의 끝을 바로 읽음
+        query = f"""
+            SELECT seq AS id, {HASH_SQL} AS commit_hash, total_loc, {TIMESTAMP_SQL} AS timestamp
             FROM history 
             WHERE repo_id = ? 
-            ORDER BY timestamp DESC, id DESC 
+            ORDER BY ts DESC, seq DESC 
             LIMIT 1
         """
-        with self.db.get_connection() as conn:
+        with self._store(repo_id).get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, (repo_id,))
             row = cursor.fetchone()
             return dict(row) if row else None
 
+    def get_history_record(self, repo_id: int, commit_hash: Optional[str] = None,
+                           offset: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        저장된 히스토리 순서(seq)상의 레코드 하나를 반환합니다.
+        commit_hash가 있으면 해당 커밋의 레코드를, 없으면 끝에서 offset번째(0이면 마지막) 레코드를 찾습니다.
+        """
+        with self._store(repo_id).get_connection() as conn:
+            cursor = conn.cursor()
+            columns = f"seq AS id, {HASH_SQL} AS commit_hash, total_loc, {TIMESTAMP_SQL} AS timestamp"
+            if commit_hash is not None:
+                cursor.execute(
+                    f"SELECT {columns} FROM history WHERE repo_id = ? AND commit_hash = ?",
+                    (repo_id, hash_to_db(commit_hash))
+                )
+            else:
+                cursor.execute(
+                    f"""
+                    SELECT {columns} FROM history
+                    WHERE repo_id = ? ORDER BY seq DESC LIMIT 1 OFFSET ?
+                    """,
+                    (repo_id, offset)
+                )
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def rewind_history(self, repo_id: int, after_id: int) -> int:
+        """
+        force-push/rebase로 사라진 커밋의 기록을 지웁니다: after_id 이후의 history 행과 그 커밋의
+        언어별 기록, 체크포인트를 한 트랜잭션에서 삭제하고 해당 구간의 롤업 버킷만 다시 계산합니다.
+        rewind_count를 올려 기존 증분 조회 커서가 전체 재조회로 전환되도록 합니다. 삭제한 행 수를 반환합니다.
+        """
+        store = self._store(repo_id)
+        with store.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"""
+                DELETE FROM language_history
+                WHERE repo_id = ? AND commit_hash IN (
+                    SELECT {HASH_SQL} FROM history WHERE repo_id = ? AND seq > ?
+                )
+                """,
+                (repo_id, repo_id, after_id)
+            )
+            cursor.execute("DELETE FROM loc_checkpoints WHERE repo_id = ? AND history_id > ?", (repo_id, after_id))
+            cursor.execute("DELETE FROM history WHERE repo_id = ? AND seq > ?", (repo_id, after_id))
+            deleted = cursor.rowcount
+            if deleted > 0:
+                rebuild_rollups_after(cursor, repo_id, after_id)
+                if store is self.db:
+                    cursor.execute(
+                        "UPDATE repositories SET rewind_count = rewind_count + 1 WHERE id = ?",
+                        (repo_id,)
+                    )
+                    _bump_history_version(cursor, repo_id)
+            conn.commit()
+
+        if deleted > 0:
+            if store is not self.db:
+                _bump_history_versions(self.db, [repo_id], rewound=True)
+            _notify_history_changed(repo_id)
+        return deleted
+
+    def get_checkpoint_candidates(self, repo_id: int, every_n: int, after_id: int = 0,
+                                  commit_hashes: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """
+        드리프트 보정용 샘플 커밋 후보를 반환합니다.
+        - every_n > 0: 저장소 히스토리에서 N번째마다의 커밋
+        - commit_hashes: 지정된 커밋(예: 릴리스 태그)
+        - 항상 마지막 커밋 포함
+        after_id 이후의 행만 대상으로 하며, 이미 체크포인트가 있는 커밋은 제외합니다.
+        """
+        columns = f"seq AS id, {HASH_SQL} AS commit_hash, total_loc"
+        queries = [(
+            f"SELECT {columns} FROM history WHERE repo_id = ? ORDER BY seq DESC LIMIT 1",
+            (repo_id,)
+        )]
+        if every_n > 0:
+            queries.append((
+                f"""
+                SELECT id, commit_hash, total_loc FROM (
+                    SELECT {columns}, ROW_NUMBER() OVER (ORDER BY seq) AS rn
+                    FROM history WHERE repo_id = ?
+                ) WHERE rn % ? = 0 AND id > ?
+                """,
+                (repo_id, every_n, after_id)
+            ))
+        if commit_hashes:
+            placeholders = ",".join("?" for _ in commit_hashes)
+            queries.append((
+                f"SELECT {columns} FROM history WHERE repo_id = ? AND seq > ? AND commit_hash IN ({placeholders})",
+                (repo_id, after_id, *(hash_to_db(h) for h in commit_hashes))
+            ))
+
+        candidates: Dict[str, Dict[str, Any]] = {}
+        with self._store(repo_id).get_connection() as conn:
+            cursor = conn.cursor()
+            for query, params in queries:
+                cursor.execute(query, params)
+                for row in cursor.fetchall():
+                    candidates[row['commit_hash']] = dict(row)
+
+            cursor.execute("SELECT commit_hash FROM loc_checkpoints WHERE repo_id = ?", (repo_id,))
+            for row in cursor.fetchall():
+                candidates.pop(row['commit_hash'], None)
+
+        return sorted(candidates.values(), key=lambda r: r['id'])
+
+    def add_checkpoints(self, repo_id: int, checkpoints: List[Dict[str, Any]]):
+        """
+        checkpoints: [{'history_id': int, 'commit_hash': str, 'estimated_loc': int, 'measured_loc': int}, ...]
+        행을 다시 쓰지 않고 offset만 저장하므로 보정 비용은 체크포인트 수에만 비례합니다.
+        """
+        if not checkpoints:
+            return
+
+        store = self._store(repo_id)
+        with store.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany(
+                """
+                INSERT OR REPLACE INTO loc_checkpoints (repo_id, history_id, commit_hash, estimated_loc, measured_loc)
+                VALUES (?, ?, ?, ?, ?)
+                """,
+                [
+                    (repo_id, cp['history_id'], cp['commit_hash'], cp['estimated_loc'], cp['measured_loc'])
+                    for cp in checkpoints
+                ]
+            )
+            if store is self.db:
+                _bump_history_version(cursor, repo_id)
+            conn.commit()
+        if store is not self.db:
+            _bump_history_versions(self.db, [repo_id])
+        _notify_history_changed(repo_id)
+
+    def add_language_history_batch(self, repo_id: int, records: List[Dict[str, Any]]):
+        """
+        records: [{'timestamp': str, 'commit_hash': str, 'language': str, 'total_loc': int}, ...]
+        커밋에서 변경된 언어의 누적 라인수만 벌크 인서트합니다. 중복은 무시합니다.
+        """
+        self.add_history_batches([(repo_id, [], records)])
+
+    def get_language_stats(self, repo_ids: List[int], start_date: str, end_date: str) -> List[Dict[str, Any]]:
+        """저장소/언어별로 하루의 마지막 누적 라인수를 반환합니다."""
+        if not repo_ids:
+            return []
+
+        rows: List[Dict[str, Any]] = []
+        for store, store_repo_ids in self.db.history_stores(repo_ids):
+            placeholders = ",".join("?" for _ in store_repo_ids)
+            query = f"""
+                SELECT repo_id, language, timestamp, total_loc
+                FROM language_history
+                WHERE rowid IN (
+                    SELECT MAX(rowid)
+                    FROM language_history
+                    WHERE repo_id IN ({placeholders})
+                      AND timestamp >= ? AND timestamp <= ?
+                    GROUP BY repo_id, language, SUBSTR(timestamp, 1, 10)
+                )
+                ORDER BY repo_id, language, timestamp ASC
+            """
+            with store.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(query, store_repo_ids + [start_date, end_date])
+                rows.extend(dict(row) for row in cursor.fetchall())
+        rows.sort(key=lambda row: row['repo_id'])
+        return rows
+
+    def get_last_language_totals(self, repo_id: int) -> Dict[str, int]:
+        """증분 동기화용: 해당 저장소의 언어별 마지막 누적 라인수"""
+        query = """
+            SELECT language, total_loc
+            FROM language_history
+            WHERE rowid IN (
+                SELECT MAX(rowid) FROM language_history WHERE repo_id = ? GROUP BY language
+            )
+        """
+        with self._store(repo_id).get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (repo_id,))
+            return {row['language']: row['total_loc'] for row in cursor.fetchall()}
+
+    def compact_history_step(self, repo_id: int, commit_days: int, daily_days: int,
+                             now: Optional[int] = None) -> Tuple[int, bool]:
+        """
+        보존 정책에 따라 오래된 history 행을 COMPACTION_CHUNK_DAYS 구간 하나만큼 압축합니다.
+        - commit_days 이전: 일별(UTC) 마지막 행(가장 큰 seq)만 남김
+        - daily_days 이전: 주별 마지막 행(월 경계에 걸친 주는 월의 마지막 행 포함)만 남김 (0이면 비활성)
+        행 삭제와 롤업 재계산, 진행 위치(history_compaction) 갱신을 한 트랜잭션으로 처리하므로 중단 후에도 이어서
+        실행할 수 있습니다. get_last_history_record가 반환하는 마지막 레코드는 지우지 않습니다.
+        반환값: (삭제한 history 행 수, 더 압축할 구간이 없으면 True)
+        """
+        store = self.db.history_store(repo_id)
+        if store is None or commit_days <= 0:
+            return 0, True
+        now = now if now is not None else int(datetime.now().timestamp())
+        tiers = [("daily", now - commit_days * DAY_SECONDS)]
+        if daily_days > 0:
+            tiers.append(("weekly", now - max(daily_days, commit_days) * DAY_SECONDS))
+
+        with store.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT daily_until, weekly_until FROM history_compaction WHERE repo_id = ?", (repo_id,))
+            row = cursor.fetchone()
+            for tier, cutoff in tiers:
+                cutoff = _align_compaction(cutoff, tier)
+                start = row[f"{tier}_until"] if row else 0
+                if start >= cutoff:
+                    continue
+                if start == 0:
+                    cursor.execute("SELECT MIN(ts) FROM history WHERE repo_id = ?", (repo_id,))
+                    first = cursor.fetchone()[0]
+                    if first is None:
+                        return 0, True
+                    start = min(_align_compaction(first, tier), cutoff)
+                end = min(start + COMPACTION_CHUNK_DAYS * DAY_SECONDS, cutoff)
+
+                deleted = self._compact_range(cursor, repo_id, tier, start, end) if start < end else 0
+                cursor.execute(
+                    f"""
+                    INSERT INTO history_compaction (repo_id, {tier}_until) VALUES (?, ?)
+                    ON CONFLICT(repo_id) DO UPDATE SET {tier}_until = excluded.{tier}_until
+                    """,
+                    (repo_id, end)
+                )
+                if deleted and store is self.db:
+                    _bump_history_version(cursor, repo_id)
+                conn.commit()
+                break
+            else:
+                return 0, True
+
+        if deleted:
+            if store is not self.db:
+                _bump_history_versions(self.db, [repo_id])
+            _notify_history_changed(repo_id)
+        return deleted, False
+
+    def _compact_range(self, cursor: sqlite3.Cursor, repo_id: int, tier: str, start_ts: int, end_ts: int) -> int:
+        """[start_ts, end_ts) 구간에서 계층 버킷별 마지막 행만 남기고 지운 history 행 수를 반환합니다."""
+        # 언어별 기록도 같은 구간의 (언어, 버킷)별 마지막 행만 남김. 언어별 조회와 같은 기준(문자열 timestamp의
+        # 날짜)으로 묶으며, 구간 경계가 자정이므로 같은 날짜의 행은 항상 한 구간에 들어감
+        day = "SUBSTR(timestamp, 1, 10)"
+        language_group = day if tier == "daily" else f"strftime('%Y-W%W', {day}) || strftime('%Y-%m', {day})"
+        language_range = (repo_id, format_epoch(start_ts), format_epoch(end_ts))
+        cursor.execute(
+            f"""
+            DELETE FROM language_history
+            WHERE repo_id = ? AND timestamp >= ? AND timestamp < ? AND rowid NOT IN (
+                SELECT MAX(rowid) FROM language_history
+                WHERE repo_id = ? AND timestamp >= ? AND timestamp < ?
+                GROUP BY language, {language_group}
+            )
+            """,
+            language_range * 2
+        )
+
+        group = COMPACTION_TIERS[tier]
+        cursor.execute(
+            f"SELECT seq, {group} FROM history WHERE repo_id = ? AND ts >= ? AND ts < ?",
+            (repo_id, start_ts, end_ts)
+        )
+        rows = cursor.fetchall()
+        keep: Dict[str, int] = {}
+        for seq, key in rows:
+            keep[key] = max(seq, keep.get(key, seq))
+        # 버킷의 마지막 행은 남으므로 MAX(seq) 행은 지워지지 않지만, 시각이 가장 늦은 마지막 레코드
+        # (get_last_history_record, 증분 동기화 기준)는 seq가 더 작을 수 있으므로 따로 보호
+        cursor.execute("SELECT seq FROM history WHERE repo_id = ? ORDER BY ts DESC, seq DESC LIMIT 1", (repo_id,))
+        last = cursor.fetchone()
+        protected = last[0] if last else None
+        removed = [seq for seq, key in rows if seq != keep[key] and seq != protected]
+        if not removed:
+            return 0
+
+        cursor.executemany("DELETE FROM history WHERE repo_id = ? AND seq = ?", [(repo_id, seq) for seq in removed])
+        # delta 모드: 지운 행 다음(seq 순)으로 남은 행은 증감 대신 저장된 total_loc의 차분을 쓰도록 증감을 비움
+        cursor.executemany(
+            """
+            UPDATE history SET insertions = NULL, deletions = NULL
+            WHERE repo_id = ? AND seq = (SELECT MIN(seq) FROM history WHERE repo_id = ? AND seq > ?)
+            """,
+            [(repo_id, repo_id, seq) for seq in removed]
+        )
+        # daily 계층은 일/주/월 버킷의 마지막 행이 모두 남으므로 롤업이 그대로이고,
+        # weekly 계층은 지워진 날의 일 단위 버킷만 다시 계산
+        if tier == "weekly":
+            rebuild_rollup_range(cursor, repo_id, "day", start_ts, end_ts)
+        return len(removed)
+
+# tasks 테이블에서 갱신 가능한 컬럼
+TASK_COLUMNS = (
+    "repo_id", "task_type", "include_path", "status", "progress_commits", "total_commits",
+    "checkpoint_commit", "checkpoint_loc", "error", "started_at", "completed_at",
+)
+
+class TaskManager:
+    """백필 작업 상태를 tasks 테이블에 저장하여 서버 재시작 후에도 진행 상태와 체크포인트를 유지합니다."""
+
+    def __init__(self, db: DatabaseConnection):
+        self.db = db
+
+    def save_task(self, task: Dict[str, Any]):
+        """작업을 새로 기록하거나 전체 내용을 교체합니다 (task_id 기준)."""
+        columns = ["task_id"] + [c for c in TASK_COLUMNS if c in task]
+        placeholders = ",".join("?" for _ in columns)
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"INSERT OR REPLACE INTO tasks ({', '.join(columns)}) VALUES ({placeholders})",
+                [task[c] for c in columns]
+            )
+            conn.commit()
+
+    def update_task(self, task_id: str, **fields: Any):
+        """지정한 컬럼만 갱신합니다 (TASK_COLUMNS에 없는 키는 무시)."""
+        fields = {k: v for k, v in fields.items() if k in TASK_COLUMNS}
+        if not fields:
+            return
+        assignments = ", ".join(f"{k} = ?" for k in fields)
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"UPDATE tasks SET {assignments}, updated_at = CURRENT_TIMESTAMP WHERE task_id = ?",
+                [*fields.values(), task_id]
+            )
+            conn.commit()
+
+    def get_task(self, task_id: str) -> Optional[Dict[str, Any]]:
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM tasks WHERE task_id = ?", (task_id,))
+            row = cursor.fetchone()
+            return dict(row) if row else None
+
+    def get_unfinished_tasks(self, task_type: str) -> List[Dict[str, Any]]:
+        """종료되지 않은(PENDING/RUNNING) 작업 목록 (재시작 시 이어서 실행할 대상)"""
+        with self.db.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """
+                SELECT * FROM tasks
+                WHERE task_type = ? AND status IN ('PENDING', 'RUNNING')
+                ORDER BY started_at
+                """,
+                (task_type,)
+            )
+            return [dict(row) for row in cursor.fetchall()]
+
 class SettingsManager:
     def __init__(self, db: DatabaseConnection):
         self.db = db
@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Generator, List, Tuple
+
+from .database import _get_pool
+
+# IN (...) 조회 한 번에 묻는 커밋 수 (SQLite 바인딩 변수 한도 이하)
+LOOKUP_CHUNK = 500
+
+# numstat_cache: 커밋 해시(20바이트 BLOB)를 키로 하는 WITHOUT ROWID 테이블
+# - author_date: git %ai 문자열 그대로
+# - entries: --no-renames numstat 항목('added\tdeleted\tpath', 바이너리는 '-')을 NUL로 이어 zlib 압축한 값
+NUMSTAT_CACHE_SQL = '''
+    CREATE TABLE IF NOT EXISTS numstat_cache (
+        commit_hash BLOB PRIMARY KEY,
+        author_date TEXT NOT NULL,
+        entries BLOB NOT NULL
+    ) WITHOUT ROWID
+'''
+
+class NumstatCache:
+    """
+    커밋별 numstat(저장소 전체 경로 기준 파일별 증감)을 커밋 해시로 보관하는 로컬 캐시 파일.
+    커밋 내용이 같으면 numstat도 같으므로 저장소 재등록/재백필, include_path만 다른 등록, 같은 히스토리를 공유하는
+    포크/브랜치가 한 번 분석한 커밋을 git 없이 재사용합니다. 캐시는 최적화일 뿐이므로 읽기/쓰기 오류는
+    로그만 남기고 git 분석으로 진행합니다.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        pool = _get_pool(path)
+        with pool.init_lock:
+            if not pool.initialized:
+                os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+                with self.get_connection() as conn:
+                    conn.execute("PRAGMA journal_mode=WAL;")
+                    conn.execute(NUMSTAT_CACHE_SQL)
+                    conn.commit()
+                pool.initialized = True
+
+    @contextmanager
+    def get_connection(self) -> Generator[sqlite3.Connection, None, None]:
+        pool = _get_pool(self.path)
+        conn = pool.acquire()
+        try:
+            yield conn
+        finally:
+            pool.release(conn)
+
+    def get_many(self, hashes: List[str]) -> Dict[str, Tuple[str, bytes]]:
+        """캐시에 있는 커밋들의 {해시: (author_date, 압축 해제한 항목 바이트)}"""
+        found: Dict[str, Tuple[str, bytes]] = {}
+        try:
+            with self.get_connection() as conn:
+                for start in range(0, len(hashes), LOOKUP_CHUNK):
+                    keys = [bytes.fromhex(commit_hash) for commit_hash in hashes[start:start + LOOKUP_CHUNK]]
+                    rows = conn.execute(
+                        "SELECT commit_hash, author_date, entries FROM numstat_cache "
+                        f"WHERE commit_hash IN ({','.join('?' for _ in keys)})",
+                        keys
+                    ).fetchall()
+                    for commit_hash, author_date, entries in rows:
+                        found[commit_hash.hex()] = (author_date, zlib.decompress(entries))
+        except (sqlite3.Error, zlib.error, ValueError) as e:
+            print(f"Numstat cache read error ({self.path}): {e}")
+        return found
+
+    def put_many(self, commits: Dict[str, Tuple[str, bytes]]):
+        """git으로 분석한 커밋들({해시: (author_date, 항목 바이트)})을 한 트랜잭션으로 기록합니다."""
+        if not commits:
+            return
+        try:
+            with self.get_connection() as conn:
+                conn.executemany(
+                    "INSERT OR IGNORE INTO numstat_cache (commit_hash, author_date, entries) VALUES (?, ?, ?)",
+                    [
+                        (bytes.fromhex(commit_hash), author_date, zlib.compress(entries))
+                        for commit_hash, (author_date, entries) in commits.items()
+                    ]
+                )
+                conn.commit()
+        except (sqlite3.Error, ValueError) as e:
+            print(f"Numstat cache write error ({self.path}): {e}")
@@ -0,0 +1,122 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional, Tuple
+
+from .database import DatabaseConnection
+from .managers import HistoryManager
+
+# 단일 writer 설정
+# - 큐가 가득 차면 생산자(백필/동기화 스레드)의 submit이 블록되어 자연스럽게 속도가 조절됨 (backpressure)
+# - 모인 행 수가 FLUSH_ROWS 이상이거나 첫 항목 이후 FLUSH_INTERVAL_SECONDS가 지나면 한 트랜잭션으로 커밋
+WRITER_QUEUE_SIZE = 64
+FLUSH_ROWS = 20000
+FLUSH_INTERVAL_SECONDS = 0.2
+
+_Item = Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]], Future]
+
+class HistoryWriter:
+    """
+    히스토리 DB 파일 하나에 대한 워커들의 쓰기를 하나의 스레드로 모아 기록하는 단일 writer.
+    워커마다 따로 트랜잭션을 열어 WAL 쓰기 락을 두고 경쟁하는 대신, 큐에 쌓인 배치를 크기/시간 기준으로
+    묶어 큰 트랜잭션 하나로 커밋합니다. 저장소별 기록 순서는 큐 순서(FIFO)대로 유지됩니다.
+    """
+
+    def __init__(self, db: DatabaseConnection, queue_size: int = WRITER_QUEUE_SIZE,
+                 flush_rows: int = FLUSH_ROWS, flush_interval: float = FLUSH_INTERVAL_SECONDS):
+        self.history_manager = HistoryManager(db)
+        self.flush_rows = flush_rows
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Optional[_Item]]" = queue.Queue(maxsize=queue_size)
+        self.pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, repo_id: int, records: List[Dict[str, Any]],
+               language_records: Optional[List[Dict[str, Any]]] = None) -> Future:
+        """
+        history/언어별 레코드 기록을 요청합니다. 큐가 가득 차면 자리가 날 때까지 블록됩니다.
+        반환된 Future는 해당 레코드가 커밋되면 완료되며, 실패 시 예외를 담습니다.
+        """
+        future: Future = Future()
+        self._queue.put((repo_id, records, language_records or [], future))
+        return future
+
+    @staticmethod
+    def wait(futures: List[Future]):
+        """submit으로 받은 Future들이 모두 커밋될 때까지 대기 (실패가 있으면 예외 발생)"""
+        for future in futures:
+            future.result()
+
+    def close(self):
+        """남은 항목을 모두 기록한 뒤 writer 스레드를 종료합니다."""
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch, stop = self._collect(item)
+            self._flush(batch)
+            if stop:
+                return
+
+    def _collect(self, first: _Item) -> Tuple[List[_Item], bool]:
+        """첫 항목 이후 행 수 또는 시간 기준에 도달할 때까지 큐의 항목을 모읍니다."""
+        batch = [first]
+        rows = len(first[1]) + len(first[2])
+        deadline = time.monotonic() + self.flush_interval
+        while rows < self.flush_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+            rows += len(item[1]) + len(item[2])
+        return batch, False
+
+    def _flush(self, batch: List[_Item]):
+        try:
+            self.history_manager.add_history_batches([(repo_id, records, lang) for repo_id, records, lang, _ in batch])
+        except Exception as e:
+            print(f"History writer batch error ({len(batch)} items): {e}, retrying individually")
+            # 한 생산자의 잘못된 데이터가 다른 생산자의 기록까지 실패시키지 않도록 항목별로 재시도
+            for repo_id, records, lang, future in batch:
+                try:
+                    self.history_manager.add_history_batches([(repo_id, records, lang)])
+                    future.set_result(None)
+                except Exception as item_error:
+                    future.set_exception(item_error)
+            return
+
+        for *_, future in batch:
+            future.set_result(None)
+
+_writers: Dict[str, HistoryWriter] = {}
+_writers_lock = threading.Lock()
+
+def get_history_writer(db_path: str, repo_id: Optional[int] = None) -> HistoryWriter:
+    """
+    히스토리 DB 파일별 단일 writer (프로세스당 하나, 최초 호출 시 스레드 시작).
+    repo_id를 주면 그 저장소의 히스토리가 있는 파일(메인 DB 또는 샤드)의 writer를 반환하므로,
+    샤드에 기록하는 저장소들은 각자의 writer로 병렬 커밋합니다.
+    """
+    db = DatabaseConnection(db_path)
+    store = db.history_store(repo_id) if repo_id is not None else None
+    key = os.path.abspath((store or db).db_path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        # fork된 자식 프로세스에는 부모의 writer 스레드가 없으므로 새로 만듦
+        if writer is None or writer.pid != os.getpid():
+            # 존재 확인과 history_version 갱신은 메인 DB에서 하므로 writer는 항상 메인 DB 기준으로 생성
+            writer = _writers[key] = HistoryWriter(db)
+        return writer
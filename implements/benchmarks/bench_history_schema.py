@@ -0,0 +1,139 @@
+"""
+history 스키마 크기/조회 지연 벤치마크.
+
+구버전 스키마(문자열 timestamp/commit_hash, 대리키 id, 보조 인덱스 2개)로 합성 히스토리 DB를 만든 뒤,
+복사본을 DatabaseConnection으로 열어 압축 스키마로 변환하고 파일 크기와 대표 조회의 지연을 비교합니다.
+
+사용법:
+    python implements/benchmarks/bench_history_schema.py [--repos 8] [--commits 100000]
+"""
+import argparse
+import hashlib
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from db.database import DatabaseConnection, TIMESTAMP_SQL, HASH_SQL, hash_to_db, to_epoch
+
+LEGACY_SCHEMA = """
+    CREATE TABLE repositories (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                               path TEXT NOT NULL, status TEXT DEFAULT 'idle');
+    CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, repo_id INTEGER, timestamp DATETIME NOT NULL,
+                          commit_hash TEXT, total_loc INTEGER NOT NULL, insertions INTEGER, deletions INTEGER);
+    CREATE INDEX idx_history_repo_time ON history(repo_id, timestamp);
+    CREATE UNIQUE INDEX idx_history_repo_commit ON history(repo_id, commit_hash);
+"""
+# 작성자별 UTC 오프셋 (문자열 비교가 틀어지는 혼합 오프셋 재현)
+OFFSETS = ["+0000", "+0900", "-0700", "+0530"]
+
+def generate_legacy_db(path, repos, commits):
+    """repos x commits 규모의 구버전 스키마 DB 생성 (커밋은 저장소마다 약 10분 간격, 저장소가 번갈아 기록)"""
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany("INSERT INTO repositories (name, path) VALUES (?, ?)",
+                     [(f"repo-{r}", f"/path/{r}") for r in range(repos)])
+    start = datetime(2015, 1, 1)
+    batch = []
+    for c in range(commits):
+        for r in range(repos):
+            offset = OFFSETS[(c + r) % len(OFFSETS)]
+            sign = 1 if offset[0] == "+" else -1
+            local = start + timedelta(minutes=10 * c) + sign * timedelta(hours=int(offset[1:3]), minutes=int(offset[3:]))
+            commit_hash = hashlib.sha1(f"{r}-{c}".encode()).hexdigest()
+            batch.append((r + 1, f"{local:%Y-%m-%d %H:%M:%S} {offset}", commit_hash, 1000 + c, 3, 1))
+        if len(batch) >= 50000:
+            conn.executemany("INSERT INTO history (repo_id, timestamp, commit_hash, total_loc, insertions, deletions) "
+                             "VALUES (?, ?, ?, ?, ?, ?)", batch)
+            batch = []
+    conn.executemany("INSERT INTO history (repo_id, timestamp, commit_hash, total_loc, insertions, deletions) "
+                     "VALUES (?, ?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+def legacy_queries(repo_id, start, end, commit_hash):
+    return {
+        "last record": ("SELECT id, commit_hash, total_loc, timestamp FROM history WHERE repo_id = ? "
+                        "ORDER BY timestamp DESC, id DESC LIMIT 1", (repo_id,)),
+        "range scan (1y)": ("SELECT id, timestamp, total_loc FROM history WHERE repo_id = ? "
+                            "AND timestamp >= ? AND timestamp <= ?", (repo_id, start, end)),
+        "hash lookup": ("SELECT id, total_loc FROM history WHERE repo_id = ? AND commit_hash = ?",
+                        (repo_id, commit_hash)),
+        "full scan by commit": ("SELECT id, timestamp, total_loc, insertions, deletions FROM history "
+                                "WHERE repo_id = ? ORDER BY id", (repo_id,)),
+    }
+
+def compact_queries(repo_id, start, end, commit_hash):
+    return {
+        "last record": (f"SELECT seq, {HASH_SQL}, total_loc, {TIMESTAMP_SQL} FROM history WHERE repo_id = ? "
+                        "ORDER BY ts DESC, seq DESC LIMIT 1", (repo_id,)),
+        "range scan (1y)": ("SELECT seq, ts, total_loc FROM history WHERE repo_id = ? AND ts >= ? AND ts <= ?",
+                            (repo_id, to_epoch(start), to_epoch(end))),
+        "hash lookup": ("SELECT seq, total_loc FROM history WHERE repo_id = ? AND commit_hash = ?",
+                        (repo_id, hash_to_db(commit_hash))),
+        "full scan by commit": ("SELECT seq, ts, total_loc, insertions, deletions FROM history "
+                                "WHERE repo_id = ? ORDER BY seq", (repo_id,)),
+    }
+
+def time_queries(path, queries, repeat):
+    """쿼리별 중앙값 지연(ms)과 반환 행 수"""
+    conn = sqlite3.connect(path)
+    results = {}
+    for name, (sql, params) in queries.items():
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            rows = conn.execute(sql, params).fetchall()
+            samples.append((time.perf_counter() - started) * 1000)
+        results[name] = (sorted(samples)[len(samples) // 2], len(rows))
+    conn.close()
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="history schema size/latency benchmark")
+    parser.add_argument("--repos", type=int, default=8)
+    parser.add_argument("--commits", type=int, default=100000, help="commits per repository")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    tmp_dir = tempfile.mkdtemp(prefix="cm_bench_")
+    try:
+        legacy_path = os.path.join(tmp_dir, "legacy.db")
+        compact_path = os.path.join(tmp_dir, "compact.db")
+        print(f"Generating legacy database: {args.repos} repos x {args.commits} commits ...")
+        generate_legacy_db(legacy_path, args.repos, args.commits)
+        shutil.copy(legacy_path, compact_path)
+
+        started = time.perf_counter()
+        DatabaseConnection(compact_path).close()
+        print(f"Migration (incl. rollups and VACUUM): {time.perf_counter() - started:.1f}s")
+
+        legacy_size, compact_size = os.path.getsize(legacy_path), os.path.getsize(compact_path)
+        print(f"{'size (MB)':<22} {legacy_size / 2**20:>10.1f} {compact_size / 2**20:>10.1f} "
+              f"{legacy_size / compact_size:>8.2f}x")
+
+        # 중간 저장소의 가운데 1년 구간
+        repo_id = args.repos // 2 + 1
+        middle = datetime(2015, 1, 1) + timedelta(minutes=10 * args.commits // 2)
+        start, end = f"{middle:%Y-%m-%d} 00:00:00", f"{middle + timedelta(days=365):%Y-%m-%d} 23:59:59"
+        commit_hash = hashlib.sha1(f"{repo_id - 1}-{args.commits // 3}".encode()).hexdigest()
+
+        legacy = time_queries(legacy_path, legacy_queries(repo_id, start, end, commit_hash), args.repeat)
+        compact = time_queries(compact_path, compact_queries(repo_id, start, end, commit_hash), args.repeat)
+        print(f"{'query (median ms)':<22} {'legacy':>10} {'compact':>10} {'speedup':>8}   rows")
+        for name, (legacy_ms, legacy_rows) in legacy.items():
+            compact_ms, compact_rows = compact[name]
+            print(f"{name:<22} {legacy_ms:>10.2f} {compact_ms:>10.2f} {legacy_ms / max(compact_ms, 1e-6):>7.1f}x"
+                  f"   {legacy_rows}/{compact_rows}")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
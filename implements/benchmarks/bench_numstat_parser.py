@@ -0,0 +1,146 @@
+"""
+numstat 파서 처리량 벤치마크.
+
+git fast-import로 대량 커밋 저장소를 생성한 뒤, 기존 텍스트 라인 파서(정규식 기반)와
+bytes 모드(-z) 파서를 각각 별도 프로세스에서 실행하여 commits/sec과 최대 RSS를 비교합니다.
+
+사용법:
+    python implements/benchmarks/bench_numstat_parser.py [--commits 20000] [--files 20] [--repo PATH]
+"""
+import argparse
+import json
+import os
+import re
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from core.git_analyzer import GitAnalyzer
+
+def legacy_commits_generator(repo_path):
+    """비교 기준: 기존 텍스트 라인 버퍼 + 정규식 파서 (변경 전 GitAnalyzer.get_commits_generator)"""
+    cmd = ["git", "log", "--reverse", "--numstat", "--pretty=format:commit:%H author_date:%ai"]
+    process = subprocess.Popen(
+        cmd, cwd=repo_path, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, bufsize=1
+    )
+    current_commit = None
+    try:
+        for line in process.stdout:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("commit:"):
+                if current_commit:
+                    yield current_commit
+                parts = line.split(" author_date:")
+                current_commit = {
+                    "hash": parts[0].replace("commit:", "").strip(),
+                    "date": parts[1].strip(),
+                    "insertions": 0,
+                    "deletions": 0
+                }
+            elif current_commit and re.match(r'^(\d+|-)\s+(\d+|-)\s+.*', line):
+                parts = line.split()
+                if len(parts) >= 2:
+                    current_commit["insertions"] += 0 if parts[0] == "-" else int(parts[0])
+                    current_commit["deletions"] += 0 if parts[1] == "-" else int(parts[1])
+        if current_commit:
+            yield current_commit
+    finally:
+        process.stdout.close()
+        process.wait()
+
+PARSERS = {
+    "legacy": legacy_commits_generator,
+    "bytes": lambda repo_path: GitAnalyzer(repo_path).get_commits_generator(),
+}
+
+def generate_repo(repo_path, commits, files_per_commit):
+    """git fast-import 스트림으로 commits x files_per_commit 규모의 저장소 생성"""
+    subprocess.run(["git", "init", "-q", "-b", "main", repo_path], check=True)
+    process = subprocess.Popen(["git", "fast-import", "--quiet"], cwd=repo_path, stdin=subprocess.PIPE)
+    out = process.stdin
+    base_ts = 1_500_000_000
+    for c in range(commits):
+        message = f"commit {c}".encode()
+        out.write(b"commit refs/heads/main\n")
+        out.write(f"committer Bench <bench@example.com> {base_ts + c * 60} +0000\n".encode())
+        out.write(f"data {len(message)}\n".encode() + message + b"\n")
+        for f in range(files_per_commit):
+            # 파일마다 일부 라인만 바뀌도록 내용 생성
+            lines = "".join(f"line {n} rev {(c + n) // 3 if n % 4 == 0 else 0}\n" for n in range(f % 13 + 3))
+            body = lines.encode()
+            out.write(f"M 100644 inline dir{f % 5}/file{(c + f) % (files_per_commit * 2)}.py\n".encode())
+            out.write(f"data {len(body)}\n".encode() + body + b"\n")
+        out.write(b"\n")
+    out.close()
+    process.wait()
+    subprocess.run(["git", "checkout", "-q", "main"], cwd=repo_path, check=True)
+
+def run_single(parser_name, repo_path):
+    """자식 프로세스에서 파서 하나만 실행하고 결과를 JSON으로 출력"""
+    started = time.perf_counter()
+    commits = 0
+    net = 0
+    for commit in PARSERS[parser_name](repo_path):
+        commits += 1
+        net += commit["insertions"] - commit["deletions"]
+    elapsed = time.perf_counter() - started
+    # Linux: KB 단위, macOS: byte 단위
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        max_rss //= 1024
+    print(json.dumps({"parser": parser_name, "commits": commits, "net": net,
+                      "seconds": elapsed, "max_rss_kb": max_rss}))
+
+def main():
+    parser = argparse.ArgumentParser(description="numstat parser throughput benchmark")
+    parser.add_argument("--commits", type=int, default=20000)
+    parser.add_argument("--files", type=int, default=20, help="files changed per commit")
+    parser.add_argument("--repo", help="existing repository to benchmark (skips generation)")
+    parser.add_argument("--run", choices=sorted(PARSERS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        run_single(args.run, args.repo)
+        return
+
+    tmp_dir = None
+    repo_path = args.repo
+    if not repo_path:
+        tmp_dir = tempfile.mkdtemp(prefix="cm_bench_")
+        repo_path = os.path.join(tmp_dir, "repo")
+        print(f"Generating repository: {args.commits} commits x {args.files} files ...")
+        generate_repo(repo_path, args.commits, args.files)
+
+    try:
+        results = []
+        for name in ("legacy", "bytes"):
+            out = subprocess.run(
+                [sys.executable, __file__, "--run", name, "--repo", repo_path],
+                capture_output=True, text=True, check=True
+            )
+            results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+        print(f"{'parser':<8} {'commits':>9} {'seconds':>9} {'commits/s':>11} {'peak RSS (MB)':>14}")
+        for r in results:
+            rate = r["commits"] / r["seconds"] if r["seconds"] else 0
+            print(f"{r['parser']:<8} {r['commits']:>9} {r['seconds']:>9.2f} {rate:>11.0f} {r['max_rss_kb'] / 1024:>14.1f}")
+
+        legacy, fast = results
+        if (legacy["commits"], legacy["net"]) != (fast["commits"], fast["net"]):
+            print("WARNING: parser outputs differ!")
+        elif fast["seconds"]:
+            print(f"speedup: {legacy['seconds'] / fast['seconds']:.2f}x")
+    finally:
+        if tmp_dir:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main()
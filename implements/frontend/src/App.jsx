@@ -4,6 +4,7 @@ import { FiPlus } from 'react-icons/fi';
 import Sidebar from './components/Sidebar';
 import Dashboard from './components/Dashboard';
 import AddRepoModal from './components/AddRepoModal';
+import { subscribeServerEvents } from './serverEvents';
 
 // 현재 페이지의 호스트네임을 기반으로 API 주소 동적 생성
 // 프록시 설정을 위해 기본값을 '/api'로 변경하여 같은 Origin으로 요청을 보내도록 함
@@ -45,20 +46,23 @@ function App() {
     }
   };
 
-  // 주기적인 상태 체크 (폴링)
+  // 서버 푸시(SSE)로 저장소 상태 반영 (작업 중 폴링 대체)
   useEffect(() => {
-    // 동기화나 분석 중인 저장소가 있는지 확인
-    const isWorking = repositories.some(r => r.status === 'syncing' || r.status === 'backfilling');
-
-    if (!isWorking) return;
-
-    // 작업 중인 저장소가 있으면 5초마다 상태 체크
-    const interval = setInterval(() => {
-      fetchRepositories();
-    }, 5000);
-
-    return () => clearInterval(interval);
-  }, [repositories]);
+    return subscribeServerEvents(API_BASE, {
+      // 재연결 직후나 이벤트 유실 시에는 놓친 변경이 있을 수 있으므로 전체 목록 재조회
+      hello: fetchRepositories,
+      resync: fetchRepositories,
+      repo: ({ repo_id, added, deleted, ...changes }) => {
+        if (added || deleted) {
+          fetchRepositories();
+          return;
+        }
+        setRepositories(prev => prev.map(repo =>
+          repo.id === repo_id ? { ...repo, ...changes } : repo
+        ));
+      },
+    });
+  }, []);
 
   useEffect(() => {
     fetchRepositories();
@@ -2,6 +2,10 @@ import React, { useState, useEffect, useMemo, useRef } from 'react';
 import axios from 'axios';
 import { subDays } from 'date-fns';
 import ChartContainer from './ChartContainer';
+import { subscribeServerEvents } from '../serverEvents';
+
+// 백필 중에는 history 이벤트가 연달아 오므로 마지막 이벤트 후 잠시 모아서 한 번만 증분 조회
+const HISTORY_EVENT_DEBOUNCE_MS = 1000;
 
 const CustomSelect = ({ value, onChange, options }) => {
     const [isOpen, setIsOpen] = useState(false);
@@ -46,8 +50,10 @@ const CustomSelect = ({ value, onChange, options }) => {
 };
 
 const Dashboard = ({ viewMode, selectedRepoIds, apiBase, repositories }) => {
-    const [stats, setStats] = useState([]);          // 차트 표시용 (all→합산, selected→개별)
-    const [rawDatasets, setRawDatasets] = useState([]); // 통계값 계산용 (항상 개별 저장소 데이터 유지)
+    const [stats, setStats] = useState([]);          // 차트 표시용 (all→서버 합산, selected→개별)
+    const [rawDatasets, setRawDatasets] = useState([]); // 통계값 계산용
+    // 증분 조회용: 서버 원본 시계열(x 문자열)과 커서, 조회 조건 키
+    const seriesRef = useRef({ key: null, cursor: null, datasets: [] });
     const [days, setDays] = useState(() => {
         return Number(localStorage.getItem('cm_days')) || 7;
     });
@@ -126,13 +132,14 @@ const Dashboard = ({ viewMode, selectedRepoIds, apiBase, repositories }) => {
             : 'No Repository Selected';
 
     useEffect(() => {
-        const fetchStats = async () => {
+        const fetchStats = async (incremental) => {
             let repoIdsParam;
 
             if (viewMode === 'all') {
                 repoIdsParam = 'all';
             } else {
                 if (selectedRepoIds.length === 0) {
+                    seriesRef.current = { key: null, cursor: null, datasets: [] };
                     setStats([]);
                     setRawDatasets([]);
                     return;
@@ -160,15 +167,43 @@ const Dashboard = ({ viewMode, selectedRepoIds, apiBase, repositories }) => {
                 return `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
             };
 
+            const params = {
+                repo_ids: repoIdsParam,
+                start_date: formatDate(fetchStart),
+                end_date: formatDate(fetchEnd),
+                aggregate: viewMode === 'all',
+                // 차트 가로 픽셀 수 이상의 점은 그릴 수 없으므로 서버에서 다운샘플링
+                max_points: Math.max(200, Math.round(window.innerWidth || 1000))
+            };
+            const key = JSON.stringify(params);
+            const series = seriesRef.current;
+            // 주기 조회는 같은 조건의 커서가 있으면 그 이후 바뀐 점만 요청
+            if (incremental && series.key === key && series.cursor) {
+                params.since = series.cursor;
+            }
+
             try {
-                const res = await axios.get(`${apiBase}/stats`, {
-                    params: {
-                        repo_ids: repoIdsParam,
-                        start_date: formatDate(fetchStart),
-                        end_date: formatDate(fetchEnd)
+                const res = await axios.get(`${apiBase}/stats`, { params });
+
+                let datasets = res.data.datasets || [];
+                if (res.data.incremental) {
+                    if (datasets.length === 0) {
+                        seriesRef.current = { ...series, cursor: res.data.cursor };
+                        return;
                     }
-                });
-                const processedDatasets = (res.data.datasets || []).map(ds => ({
+                    // from 이후(날짜 기준) 구간을 새 점으로 교체하고, 새로 나타난 Dataset은 추가
+                    const from = res.data.from;
+                    const updates = new Map(datasets.map(ds => [ds.label, ds]));
+                    datasets = series.datasets.map(ds => {
+                        const update = updates.get(ds.label);
+                        if (!update) return ds;
+                        updates.delete(ds.label);
+                        return { ...ds, data: ds.data.filter(p => p.x.slice(0, 10) < from).concat(update.data) };
+                    }).concat([...updates.values()]);
+                }
+                seriesRef.current = { key, cursor: res.data.cursor, datasets };
+
+                const processedDatasets = datasets.map(ds => ({
                     ...ds,
                     data: ds.data
                         .map(p => ({
@@ -178,53 +213,36 @@ const Dashboard = ({ viewMode, selectedRepoIds, apiBase, repositories }) => {
                         .sort((a, b) => a.x - b.x)
                 }));
 
+                // 'all' 모드는 서버가 공통 날짜 축으로 합산한 단일 시계열(aggregate)을 반환
                 setRawDatasets(processedDatasets);
-
-                if (viewMode === 'all' && processedDatasets.length > 0) {
-                    const repoDateMaps = processedDatasets.map(ds => {
-                        const map = new Map();
-                        ds.data.forEach(point => {
-                            const d = new Date(point.x);
-                            const dayKey = `${d.getFullYear()}-${String(d.getMonth() + 1).padStart(2, '0')}-${String(d.getDate()).padStart(2, '0')}`;
-                            map.set(dayKey, point.y);
-                        });
-                        return map;
-                    });
-
-                    const allDates = new Set();
-                    repoDateMaps.forEach(map => {
-                        map.forEach((_, key) => allDates.add(key));
-                    });
-                    const sortedDates = Array.from(allDates).sort();
-
-                    const lastKnown = new Array(processedDatasets.length).fill(0);
-                    const combinedData = sortedDates.map(dayKey => {
-                        let sum = 0;
-                        repoDateMaps.forEach((map, idx) => {
-                            if (map.has(dayKey)) {
-                                lastKnown[idx] = map.get(dayKey);
-                            }
-                            sum += lastKnown[idx];
-                        });
-                        return { x: new Date(dayKey).getTime(), y: sum };
-                    });
-
-                    setStats([{
-                        label: 'All Repositories (Total)',
-                        data: combinedData
-                    }]);
-                } else {
-                    setStats(processedDatasets);
-                }
+                setStats(processedDatasets);
             } catch (err) {
                 console.error('Failed to fetch stats', err);
             }
         };
 
-        fetchStats();
+        fetchStats(false);
+        // 새 커밋 반영: 주기 조회 대신 서버의 history 이벤트를 받았을 때만 증분 조회
+        let timer = null;
+        const scheduleFetch = () => {
+            clearTimeout(timer);
+            timer = setTimeout(() => fetchStats(true), HISTORY_EVENT_DEBOUNCE_MS);
+        };
+        const unsubscribe = subscribeServerEvents(apiBase, {
+            // 재연결 직후/이벤트 유실 시 놓친 변경 반영
+            hello: scheduleFetch,
+            resync: scheduleFetch,
+            history: ({ repo_id }) => {
+                if (viewMode === 'all' || selectedRepoIds.includes(repo_id)) scheduleFetch();
+            },
+        });
+        return () => {
+            clearTimeout(timer);
+            unsubscribe();
+        };
     }, [viewMode, selectedRepoIds, days, compStart, compEnd, refinementDate, apiBase]);
 
-    // Polling for cross-browser sync
+    // Cross-browser sync
     useEffect(() => {
         const fetchSettings = async () => {
             try {
@@ -253,8 +271,11 @@ const Dashboard = ({ viewMode, selectedRepoIds, apiBase, repositories }) => {
             }
         };
 
-        const interval = setInterval(fetchSettings, 10000);
-        return () => clearInterval(interval);
+        // 다른 브라우저에서 바꾼 설정은 settings 이벤트로 받아 반영 (폴링 대체)
+        return subscribeServerEvents(apiBase, {
+            settings: fetchSettings,
+            resync: fetchSettings,
+        });
     }, [apiBase, compStart, compEnd, refinementDate, showHighlight]);
 
     // Comparison & Refinement Calculation Logic
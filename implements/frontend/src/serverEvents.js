@@ -0,0 +1,46 @@
+// 서버 푸시 이벤트(SSE) 구독
+// 페이지당 EventSource 연결 하나를 공유하며, 연결이 끊기면 브라우저가 자동으로 재연결한다.
+// 이벤트 종류: hello(연결/재연결 직후), repo, task, history, settings, resync(서버 큐 초과로 이벤트 유실)
+const EVENT_TYPES = ['hello', 'repo', 'task', 'history', 'settings', 'resync'];
+
+const listeners = new Map(); // type -> Set(handler)
+let source = null;
+
+const dispatch = (type, event) => {
+  let data = {};
+  try {
+    data = JSON.parse(event.data || '{}');
+  } catch (e) {
+    console.error('Invalid server event', type, event.data);
+    return;
+  }
+  (listeners.get(type) || []).forEach(handler => handler(data));
+};
+
+const ensureConnection = (apiBase) => {
+  if (source) return;
+  source = new EventSource(`${apiBase}/events`);
+  EVENT_TYPES.forEach(type => {
+    source.addEventListener(type, event => dispatch(type, event));
+  });
+};
+
+// handlers: { repo: (data) => ..., history: (data) => ... }. 반환된 함수를 호출하면 구독 해제
+export function subscribeServerEvents(apiBase, handlers) {
+  ensureConnection(apiBase);
+  const entries = Object.entries(handlers);
+  entries.forEach(([type, handler]) => {
+    if (!listeners.has(type)) listeners.set(type, new Set());
+    listeners.get(type).add(handler);
+  });
+
+  return () => {
+    entries.forEach(([type, handler]) => listeners.get(type)?.delete(handler));
+    // 구독자가 모두 사라지면 연결 종료
+    const remaining = [...listeners.values()].some(set => set.size > 0);
+    if (!remaining && source) {
+      source.close();
+      source = null;
+    }
+  };
+}
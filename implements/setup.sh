@@ -122,7 +122,7 @@ if [ -f "requirements.txt" ]; then
     ./venv/bin/pip install -r requirements.txt
 else
     # Fallback if requirements.txt is missing
-    ./venv/bin/pip install fastapi uvicorn requests pytest GitPython pydantic sqlalchemy
+    ./venv/bin/pip install fastapi uvicorn requests pytest GitPython pydantic sqlalchemy numpy
 fi
 echo "Backend environment setup complete."
 
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+cloc이 설치되지 않은 환경에서 쓰는 테스트용 cloc 대체 스크립트.
+'cloc --version'과 'cloc <dir> --json --quiet'만 지원하며, 디렉터리 아래 텍스트 파일의 줄을
+빈 줄(blank), '#'으로 시작하는 줄(comment), 나머지(code)로 셉니다. NUL 바이트가 있는 파일은 바이너리로 보고 제외합니다.
+"""
+import json
+import os
+import sys
+
+def count(root: str) -> dict:
+    totals = {"nFiles": 0, "blank": 0, "comment": 0, "code": 0}
+    for dirpath, _, names in os.walk(root):
+        for name in names:
+            with open(os.path.join(dirpath, name), "rb") as f:
+                data = f.read()
+            if b"\0" in data:
+                continue
+            totals["nFiles"] += 1
+            for line in data.decode(errors="replace").splitlines():
+                stripped = line.strip()
+                if not stripped:
+                    totals["blank"] += 1
+                elif stripped.startswith("#"):
+                    totals["comment"] += 1
+                else:
+                    totals["code"] += 1
+    return totals
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    if "--version" in args:
+        print("0.0-fake")
+    else:
+        target = next((arg for arg in args if not arg.startswith("--")), ".")
+        totals = count(target)
+        print(json.dumps({"header": {"n_files": totals["nFiles"]}, "SUM": totals} if totals["nFiles"] else {}))
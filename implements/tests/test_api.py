@@ -1,5 +1,6 @@
 import os
 import sys
+import shutil
 import time
 import requests
 import threading
@@ -9,18 +10,42 @@ from multiprocessing import Process
 
 # 모듈 경로
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+# api.main은 import 시점에 CODEMONITOR_DB를 읽으므로, 실제 codemonitor.db 대신 테스트 DB를 쓰도록 먼저 지정
+TEST_DB = "test_api_codemonitor.db"
+os.environ["CODEMONITOR_DB"] = TEST_DB
 from api.main import app
 
+# SSE 이벤트를 기다리는 최대 시간 (스트림 읽기 timeout도 같은 값)
+EVENT_TIMEOUT_SECONDS = 5
+
 def run_server():
     uvicorn.run(app, host="127.0.0.1", port=8000, log_level="error")
 
+def _read_until_event(lines, event: str):
+    """SSE 스트림에서 'event: <event>' 줄까지 읽어 받은 줄 목록을 반환 (EVENT_TIMEOUT_SECONDS 안에 없으면 실패)"""
+    deadline = time.monotonic() + EVENT_TIMEOUT_SECONDS
+    received = []
+    for line in lines:
+        received.append(line)
+        if line == f"event: {event}":
+            return received
+        if time.monotonic() > deadline:
+            break
+    raise AssertionError(f"no '{event}' event within {EVENT_TIMEOUT_SECONDS}s, received: {received}")
+
+def _remove_test_db():
+    """테스트 DB와 WAL/캐시 부속 파일 삭제"""
+    base = os.path.splitext(TEST_DB)[0]
+    for path in (TEST_DB, f"{base}_numstat.db"):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+    shutil.rmtree(f"{base}_shards", ignore_errors=True)
+
 def test_api():
-    test_db = "test_api_codemonitor.db"
-    os.environ["CODEMONITOR_DB"] = test_db
-    
     # 기존 파일 삭제
-    if os.path.exists(test_db):
-        os.remove(test_db)
+    _remove_test_db()
         
     print("1. Starting API server in background...")
     server_process = Process(target=run_server)
@@ -33,41 +58,63 @@ def test_api():
     repo_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../"))
     
     try:
-        print("2. Testing GET /api/repos...")
-        res = requests.get(f"{base_url}/api/repos")
-        print(f"   Status: {res.status_code}, Response: {res.json()}")
+        try:
+            print("2. Testing GET /api/repos...")
+            res = requests.get(f"{base_url}/api/repos")
+            print(f"   Status: {res.status_code}, Response: {res.json()}")
         
-        print(f"\n3. Testing POST /api/repos (Adding current repo: {repo_path})...")
-        res = requests.post(f"{base_url}/api/repos", json={"name": "CodeMonitor Test", "path": repo_path})
-        print(f"   Status: {res.status_code}, Response: {res.json()}")
+            print(f"\n3. Testing POST /api/repos (Adding current repo: {repo_path})...")
+            res = requests.post(f"{base_url}/api/repos", json={"name": "CodeMonitor Test", "path": repo_path})
+            print(f"   Status: {res.status_code}, Response: {res.json()}")
         
-        task_id = res.json().get("task_id")
+            task_id = res.json().get("task_id")
         
-        print("\n4. Polling Task Status...")
-        for _ in range(5):
-            res = requests.get(f"{base_url}/api/tasks/{task_id}")
-            status_data = res.json()
-            print(f"   Task Status: {status_data['status']}, Progress: {status_data.get('progress_commits', 0)}")
-            if status_data['status'] == 'COMPLETED':
-                print(f"   Task finished successfully. Total Commits: {status_data.get('total_commits')}")
-                break
-            time.sleep(1)
+            print("\n4. Polling Task Status...")
+            for _ in range(5):
+                res = requests.get(f"{base_url}/api/tasks/{task_id}")
+                status_data = res.json()
+                print(f"   Task Status: {status_data['status']}, Progress: {status_data.get('progress_commits', 0)}")
+                if status_data['status'] == 'COMPLETED':
+                    print(f"   Task finished successfully. Total Commits: {status_data.get('total_commits')}")
+                    break
+                time.sleep(1)
             
-        print("\n5. Testing GET /api/stats...")
-        res = requests.get(f"{base_url}/api/stats?days=7")
-        stats_data = res.json()
-        print(f"   Returned datasets count: {len(stats_data.get('datasets', []))}")
-        if stats_data.get("datasets"):
-             print(f"   First dataset label: {stats_data['datasets'][0]['label']}, data points: {len(stats_data['datasets'][0]['data'])}")
-             
-    except Exception as e:
-        print(f"Test failed with error: {e}")
+            print("\n5. Testing GET /api/stats...")
+            res = requests.get(f"{base_url}/api/stats?days=7")
+            stats_data = res.json()
+            print(f"   Returned datasets count: {len(stats_data.get('datasets', []))}")
+            if stats_data.get("datasets"):
+                 print(f"   First dataset label: {stats_data['datasets'][0]['label']}, data points: {len(stats_data['datasets'][0]['data'])}")
+        except Exception as e:
+            print(f"Test failed with error: {e}")
+
+        # 아래 단계의 assert는 실패가 테스트 실패로 보고되도록 예외를 삼키지 않음
+        print("\n6. Testing ETag revalidation on GET /api/stats and /api/repos...")
+        for path in ("/api/stats?days=7", "/api/repos"):
+            etag = requests.get(f"{base_url}{path}").headers.get("ETag")
+            res = requests.get(f"{base_url}{path}", headers={"If-None-Match": etag})
+            print(f"   {path}: ETag {etag}, revalidation status: {res.status_code}")
+            assert res.status_code == 304
+
+        print("\n7. Testing incremental GET /api/stats?since=<cursor>...")
+        cursor = requests.get(f"{base_url}/api/stats?days=7").json()["cursor"]
+        res = requests.get(f"{base_url}/api/stats", params={"days": 7, "since": cursor}).json()
+        print(f"   Cursor: {cursor}, incremental: {res['incremental']}, new datasets: {len(res['datasets'])}")
+        assert res["incremental"] and res["datasets"] == []
+
+        print("\n8. Testing push events on GET /api/events...")
+        with requests.get(f"{base_url}/api/events", stream=True, timeout=EVENT_TIMEOUT_SECONDS) as stream:
+            lines = stream.iter_lines(decode_unicode=True)
+            _read_until_event(lines, "hello")
+            requests.patch(f"{base_url}/api/settings", json={"key": "theme", "value": "dark"})
+            received = _read_until_event(lines, "settings")
+            print(f"   Received: {received}")
+
     finally:
-        print("\n6. Shutting down server...")
+        print("\n9. Shutting down server...")
         server_process.terminate()
         server_process.join()
-        if os.path.exists(test_db):
-            os.remove(test_db)
+        _remove_test_db()
         print("Done.")
 
 if __name__ == "__main__":
@@ -1,12 +1,15 @@
 import sys
 import os
-from datetime import datetime
+import sqlite3
+import threading
+from datetime import datetime, timedelta
 
 # 모듈 경로 추가
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
 
-from db.database import DatabaseConnection
-from db.managers import RepositoryManager, HistoryManager, SettingsManager
+from db.database import DatabaseConnection, to_epoch
+from db.managers import RepositoryManager, HistoryManager, SettingsManager, bucket_start
+from db.writer import HistoryWriter
 
 def test_database():
     test_db_path = "test_codemonitor.db"
@@ -49,16 +52,323 @@ def test_database():
     for stat in stats:
         print(f"      - {stat['timestamp']}: {stat['total_loc']} LOC")
 
+    # 롤업: 기간이 길면 주/월 단위 버킷의 마지막 값만 반환
+    monthly = history_manager.get_stats([repo_id_1], "2018-01-01", "2023-12-31")
+    print(f"   Monthly rollup: {[(s['timestamp'], s['total_loc']) for s in monthly]}")
+    assert [s['total_loc'] for s in monthly] == [5050]
+    weekly = history_manager.get_stats([repo_id_1], "2023-01-01", "2023-01-04", resolution="week")
+    assert [s['total_loc'] for s in weekly] == [5000, 5050]
+
+    # 드리프트 보정: 두 번째 커밋 실측값이 추정치보다 100 크면 그 이후 구간에 +100 적용
+    candidates = history_manager.get_checkpoint_candidates(repo_id_1, every_n=2)
+    print(f"   Checkpoint candidates: {[c['commit_hash'] for c in candidates]}")
+    assert [c['commit_hash'] for c in candidates] == ["def5678", "ghi9012"]
+    history_manager.add_checkpoints(repo_id_1, [{
+        "history_id": candidates[0]['id'], "commit_hash": "def5678",
+        "estimated_loc": 5100, "measured_loc": 5200
+    }])
+    corrected = history_manager.get_stats([repo_id_1], "2023-01-01", "2023-01-04")
+    print(f"   Corrected: {[s['total_loc'] for s in corrected]}")
+    assert [s['total_loc'] for s in corrected] == [5100, 5200, 5150]
+
+    # delta 저장 모드: 커밋별 증감의 누적합(0 하한 보정 포함)이 저장된 total과 같아야 함
+    delta_records = [
+        {"timestamp": "2023-02-01 10:00:00", "commit_hash": "d1", "total_loc": 100, "insertions": 100, "deletions": 0},
+        {"timestamp": "2023-02-01 12:00:00", "commit_hash": "d2", "total_loc": 0, "insertions": 10, "deletions": 150},
+        {"timestamp": "2023-02-02 10:00:00", "commit_hash": "d3", "total_loc": 30, "insertions": 30, "deletions": 0},
+    ]
+    history_manager.add_history_batch(repo_id_2, delta_records)
+    absolute = history_manager.get_stats([repo_id_1, repo_id_2], "2023-01-01", "2023-02-04")
+    settings_manager.set_value("history_storage_mode", "delta")
+    delta = history_manager.get_stats([repo_id_1, repo_id_2], "2023-01-01", "2023-02-04")
+    settings_manager.set_value("history_storage_mode", "absolute")
+    print(f"   Delta mode totals: {[s['total_loc'] for s in delta]}")
+    assert absolute == delta
+
+    # 증분 조회: 커서 이후 추가된 행의 가장 이른 시각과, 보정 상태 변화 감지
+    last_ids, offset_state = history_manager.get_history_cursor([repo_id_2])
+    history_manager.add_history_batch(repo_id_2, [
+        {"timestamp": "2023-02-03 09:00:00", "commit_hash": "d4", "total_loc": 40, "insertions": 10, "deletions": 0},
+    ])
+    assert history_manager.get_changed_since([repo_id_2], last_ids) == "2023-02-03 09:00:00"
+    assert history_manager.get_changed_since([repo_id_1], {repo_id_1: history_manager.get_history_cursor([repo_id_1])[0][repo_id_1]}) is None
+    assert bucket_start("2023-02-03 09:00:00", "week") == "2023-01-30"
+
+    # 기준선 재설정은 행을 다시 쓰지 않고 저장소 offset만 갱신 (history_version은 증가)
+    version_of = lambda rid: next(r['history_version'] for r in repo_manager.get_all_repositories() if r['id'] == rid)
+    version = version_of(repo_id_2)
+    history_manager.add_history_batch(repo_id_2, delta_records)
+    assert version_of(repo_id_2) == version
+    repo_manager.set_loc_offset(repo_id_2, 1000)
+    assert version_of(repo_id_2) == version + 1
+    assert history_manager.get_history_cursor([repo_id_2])[1] != offset_state
+    rebased = history_manager.get_stats([repo_id_2], "2023-02-01", "2023-02-04")
+    assert [s['total_loc'] for s in rebased] == [1000, 1030, 1040]
+
+    lang_records = [
+        {"timestamp": "2023-01-01 10:00:00", "commit_hash": "abc1234", "language": "Python", "total_loc": 3000},
+        {"timestamp": "2023-01-01 10:00:00", "commit_hash": "abc1234", "language": "Java", "total_loc": 2000},
+        {"timestamp": "2023-01-02 10:00:00", "commit_hash": "def5678", "language": "Python", "total_loc": 3100},
+    ]
+    history_manager.add_language_history_batch(repo_id_1, lang_records)
+    lang_stats = history_manager.get_language_stats([repo_id_1], "2023-01-01", "2023-01-04")
+    print(f"   Fetched {len(lang_stats)} language records for Repo 1")
+    assert history_manager.get_last_language_totals(repo_id_1) == {"Python": 3100, "Java": 2000}
+
     print("4. Testing SettingsManager...")
     settings_manager.set_value("theme", "dark")
     settings_manager.set_value("theme", "light") # update (upsert)
     val = settings_manager.get_value("theme")
     print(f"   Setting 'theme' = {val}")
 
-    # 정리
+    # 정리 (풀에 남은 커넥션을 닫은 뒤 파일 삭제)
+    db.close()
     if os.path.exists(test_db_path):
         os.remove(test_db_path)
     print("\nTest finished successfully!")
 
+def test_history_writer():
+    test_db_path = "test_writer_codemonitor.db"
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    db = DatabaseConnection(test_db_path)
+    repo_manager = RepositoryManager(db)
+    history_manager = HistoryManager(db)
+    repo_ids = [repo_manager.add_repository(f"Repo {i}", f"/path/{i}") for i in range(4)]
+
+    # 여러 생산자 스레드의 배치가 하나의 writer에서 묶여 커밋되어야 함 (작은 큐로 backpressure 확인)
+    writer = HistoryWriter(db, queue_size=2, flush_rows=300)
+
+    def produce(repo_id):
+        futures = []
+        for b in range(5):
+            records = [
+                {"timestamp": f"2023-01-{b + 1:02d} 10:00:{k:02d}", "commit_hash": f"{repo_id}-{b}-{k}",
+                 "total_loc": b * 100 + k, "insertions": 1, "deletions": 0}
+                for k in range(50)
+            ]
+            futures.append(writer.submit(repo_id, records))
+        HistoryWriter.wait(futures)
+
+    threads = [threading.Thread(target=produce, args=(rid,)) for rid in repo_ids]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writer.close()
+
+    for repo_id in repo_ids:
+        last = history_manager.get_last_history_record(repo_id)
+        assert last['commit_hash'] == f"{repo_id}-4-49" and last['total_loc'] == 449
+    stats = history_manager.get_stats(repo_ids, "2023-01-01 00:00:00", "2023-01-05 23:59:59", "day")
+    print(f"   Writer committed {len(stats)} daily points across {len(repo_ids)} repos")
+    assert len(stats) == 4 * 5
+
+    db.close()
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+def test_legacy_history_migration():
+    test_db_path = "test_legacy_codemonitor.db"
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    # 구버전 스키마: 문자열 timestamp(작성자 오프셋 포함)/commit_hash와 대리키 id
+    conn = sqlite3.connect(test_db_path)
+    conn.executescript("""
+        CREATE TABLE repositories (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL,
+                                   path TEXT NOT NULL, status TEXT DEFAULT 'idle');
+        CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, repo_id INTEGER, timestamp DATETIME NOT NULL,
+                              commit_hash TEXT, total_loc INTEGER NOT NULL);
+        CREATE UNIQUE INDEX idx_history_repo_commit ON history(repo_id, commit_hash);
+        INSERT INTO repositories (name, path) VALUES ('legacy', '/path/legacy');
+    """)
+    # 두 번째 커밋은 문자열로는 더 늦지만 UTC로는 첫 커밋보다 이른 시각 (2023-01-01 19:00 UTC)
+    conn.executemany(
+        "INSERT INTO history (repo_id, timestamp, commit_hash, total_loc) VALUES (1, ?, ?, ?)",
+        [("2023-01-01 20:00:00 +0000", "aa" * 20, 100),
+         ("2023-01-02 04:00:00 +0900", "bb" * 20, 150),
+         ("2023-01-03 10:00:00 +0000", "cc" * 20, 120)]
+    )
+    conn.commit()
+    conn.close()
+
+    db = DatabaseConnection(test_db_path)
+    history_manager = HistoryManager(db)
+    with db.get_connection() as conn:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(history)")]
+        hashes = [row[0] for row in conn.execute("SELECT commit_hash FROM history ORDER BY ts")]
+    assert 'id' not in columns and 'ts' in columns
+    assert all(isinstance(h, bytes) and len(h) == 20 for h in hashes)
+
+    # id는 seq로 보존, 해시는 16진수 문자열로 조회
+    record = history_manager.get_history_record(1, commit_hash="bb" * 20)
+    assert record['id'] == 2 and record['timestamp'] == "2023-01-01 19:00:00"
+    last = history_manager.get_last_history_record(1)
+    assert last['commit_hash'] == "cc" * 20 and last['total_loc'] == 120
+
+    stats = history_manager.get_stats([1], "2023-01-01 00:00:00", "2023-01-03 23:59:59", "day")
+    print(f"   Migrated daily stats: {[(s['timestamp'], s['total_loc']) for s in stats]}")
+    assert [(s['timestamp'][:10], s['total_loc']) for s in stats] == [("2023-01-01", 150), ("2023-01-03", 120)]
+
+    # 새 행은 보존된 id 다음 seq를 받음
+    history_manager.add_history_batch(1, [{"timestamp": "2023-01-04 10:00:00 +0000", "commit_hash": "dd" * 20,
+                                          "total_loc": 130}])
+    assert history_manager.get_history_record(1)['id'] == 4
+
+    db.close()
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+def test_history_shards():
+    print("\nTesting per-repository history shards...")
+    test_db_path = "test_codemonitor_shards.db"
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    db = DatabaseConnection(test_db_path)
+    repo_manager = RepositoryManager(db)
+    history_manager = HistoryManager(db)
+    settings_manager = SettingsManager(db)
+
+    # 기존 저장소는 메인 DB에 남고, 설정 이후 추가한 저장소만 샤드 파일을 사용 (혼합 배치)
+    main_repo = repo_manager.add_repository("main", "/path/to/main")
+    settings_manager.set_value("history_storage_layout", "per_repo")
+    shard_repo = repo_manager.add_repository("sharded", "/path/to/sharded")
+    shard_path = os.path.join(db.shard_dir, f"repo_{shard_repo}.db")
+
+    records = [
+        {"timestamp": "2023-01-01 10:00:00", "commit_hash": "a1", "total_loc": 100},
+        {"timestamp": "2023-01-02 10:00:00", "commit_hash": "a2", "total_loc": 150},
+    ]
+    history_manager.add_history_batches([(main_repo, records, []), (shard_repo, records, [])])
+    assert os.path.exists(shard_path)
+    with db.get_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM history WHERE repo_id = ?", (shard_repo,)).fetchone()[0] == 0
+
+    # 저장소 간 조회는 메인 DB와 샤드를 함께 읽고, seq와 커서는 저장소별로 증가
+    stats = history_manager.get_stats([main_repo, shard_repo], "2023-01-01", "2023-01-03")
+    print(f"   Stats across files: {[(s['repo_id'], s['total_loc']) for s in stats]}")
+    assert [(s['repo_id'], s['total_loc']) for s in stats] == [(main_repo, 100), (main_repo, 150),
+                                                               (shard_repo, 100), (shard_repo, 150)]
+    last_ids, _ = history_manager.get_history_cursor([main_repo, shard_repo])
+    assert last_ids == {main_repo: 2, shard_repo: 2}
+    history_manager.add_history_batch(shard_repo, [{"timestamp": "2023-01-03 10:00:00", "commit_hash": "a3",
+                                                    "total_loc": 160}])
+    assert history_manager.get_changed_since([main_repo, shard_repo], last_ids) == "2023-01-03 10:00:00"
+    assert history_manager.get_last_history_record(shard_repo)['total_loc'] == 160
+
+    # 되감기도 샤드에서 처리되고 메인 DB의 rewind_count가 증가
+    assert history_manager.rewind_history(shard_repo, 2) == 1
+    rewind_count = next(r['rewind_count'] for r in repo_manager.get_all_repositories() if r['id'] == shard_repo)
+    assert rewind_count == 1
+
+    # 샤드 저장소 삭제는 파일 삭제, 메인 DB 저장소의 기록은 그대로
+    repo_manager.delete_repository(shard_repo)
+    assert not os.path.exists(shard_path)
+    assert len(history_manager.get_stats([main_repo, shard_repo], "2023-01-01", "2023-01-03")) == 2
+
+    db.close()
+    for path in (test_db_path, test_db_path + "-wal", test_db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+    os.rmdir(db.shard_dir)
+
+def test_history_compaction():
+    print("\nTesting tiered history compaction...")
+    test_db_path = "test_codemonitor_compaction.db"
+    if os.path.exists(test_db_path):
+        os.remove(test_db_path)
+
+    db = DatabaseConnection(test_db_path)
+    repo_manager = RepositoryManager(db)
+    history_manager = HistoryManager(db)
+    settings_manager = SettingsManager(db)
+    repo_id = repo_manager.add_repository("compact", "/path/to/compact")
+
+    # 2023-01-01부터 90일 동안 6시간마다 커밋 (증감만으로도 total이 재현되도록 insertions/deletions 포함)
+    start = datetime(2023, 1, 1)
+    records, total = [], 0
+    for i in range(90 * 4):
+        insertions, deletions = (i * 7) % 50, (i * 3) % 20
+        total = max(0, total + insertions - deletions)
+        records.append({"timestamp": start + timedelta(hours=6 * i), "commit_hash": f"{i:040x}",
+                        "total_loc": total, "insertions": insertions, "deletions": deletions})
+    history_manager.add_history_batch(repo_id, records)
+    history_manager.add_language_history_batch(repo_id, [
+        {"timestamp": f"{start + timedelta(hours=6 * i):%Y-%m-%d %H:%M:%S}", "commit_hash": f"{i:040x}",
+         "language": "Python", "total_loc": i} for i in range(90 * 4)
+    ])
+
+    period = ("2023-01-01 00:00:00", "2023-03-31 23:59:59")
+    before = {res: history_manager.get_stats([repo_id], *period, res) for res in ("day", "week", "month")}
+    last = history_manager.get_last_history_record(repo_id)
+
+    # 기준 시각: 마지막 커밋 다음 날. 최근 10일은 커밋 단위, 10~40일은 일 단위, 그 이전은 주 단위
+    now = to_epoch("2023-04-01 00:00:00")
+    steps, removed, done = 0, 0, False
+    while not done:
+        deleted, done = history_manager.compact_history_step(repo_id, 10, 40, now=now)
+        removed += deleted
+        steps += 1
+    print(f"   Removed {removed} rows in {steps} steps")
+    assert removed > 0 and steps > 2
+    assert history_manager.compact_history_step(repo_id, 10, 40, now=now) == (0, True)
+
+    with db.get_connection() as conn:
+        per_day = conn.execute(
+            "SELECT strftime('%Y-%m-%d', ts, 'unixepoch') AS d, COUNT(*) FROM history WHERE repo_id = ? GROUP BY d",
+            (repo_id,)
+        ).fetchall()
+    counts = {d: c for d, c in per_day}
+    assert counts["2023-03-25"] == 4           # 커밋 단위 구간은 그대로
+    assert counts["2023-03-01"] == 1           # 일 단위 구간은 하루 한 행
+    assert "2023-01-03" not in counts          # 주 단위 구간은 주(와 월 경계)의 마지막 행만
+
+    # 마지막 레코드와 주/월 롤업, 일 단위 구간의 일별 값은 압축 전과 같음
+    assert history_manager.get_last_history_record(repo_id) == last
+    after = {res: history_manager.get_stats([repo_id], *period, res) for res in ("day", "week", "month")}
+    assert after["week"] == before["week"] and after["month"] == before["month"]
+    recent = lambda stats: [s for s in stats if s['timestamp'] >= "2023-02-20"]
+    assert recent(after["day"]) == recent(before["day"])
+
+    # delta 모드도 지워진 행의 증감을 저장된 total_loc 차분으로 대신하여 같은 값을 계산
+    settings_manager.set_value("history_storage_mode", "delta")
+    delta = history_manager.get_stats([repo_id], *period, "day")
+    settings_manager.set_value("history_storage_mode", "absolute")
+    assert [s['total_loc'] for s in delta] == [s['total_loc'] for s in after["day"]]
+
+    # 언어별 기록도 (언어, 일)별 마지막 값만 남음
+    languages = history_manager.get_language_stats([repo_id], "2023-03-01 00:00:00", "2023-03-01 23:59:59")
+    assert [row['total_loc'] for row in languages] == [4 * 59 + 3]
+    assert history_manager.get_last_language_totals(repo_id) == {"Python": 90 * 4 - 1}
+
+    # delta 모드 조회는 기간 직전 행의 total_loc에서 시작하여 기간 내 증감만 더함:
+    # 기간 이전 행(증감이 남아 있는 커밋 단위 구간)의 증감을 망가뜨려도 기간 내 값은 그대로여야 함
+    window = ("2023-03-27 00:00:00", "2023-03-31 23:59:59")
+    expected = history_manager.get_stats([repo_id], *window, "day")
+    with db.get_connection() as conn:
+        corrupted = conn.execute(
+            "UPDATE history SET insertions = insertions + 100000 WHERE repo_id = ? AND ts < ? AND insertions IS NOT NULL",
+            (repo_id, to_epoch(window[0]))
+        ).rowcount
+        conn.commit()
+    assert corrupted > 0
+    settings_manager.set_value("history_storage_mode", "delta")
+    windowed = history_manager.get_stats([repo_id], *window, "day")
+    settings_manager.set_value("history_storage_mode", "absolute")
+    print(f"   Delta window totals: {[s['total_loc'] for s in windowed]}")
+    assert len(windowed) == 5 and windowed == expected
+
+    db.close()
+    for path in (test_db_path, test_db_path + "-wal", test_db_path + "-shm"):
+        if os.path.exists(path):
+            os.remove(path)
+
 if __name__ == "__main__":
     test_database()
+    test_history_writer()
+    test_legacy_history_migration()
+    test_history_shards()
+    test_history_compaction()
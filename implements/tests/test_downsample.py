@@ -0,0 +1,48 @@
+import os
+import sys
+
+import numpy as np
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from core.downsample import downsample_points, lttb_indices
+
+def _points(count):
+    return [
+        {"x": f"2023-01-{1 + i // 1440:02d} {i // 60 % 24:02d}:{i % 60:02d}:00 +0000", "y": i % 37}
+        for i in range(count)
+    ]
+
+def test_downsample_keeps_endpoints():
+    points = _points(24 * 60)
+    sampled = downsample_points(points, 100)
+    print(f"Downsampled {len(points)} -> {len(sampled)} points")
+    assert len(sampled) == 100
+    assert sampled[0] is points[0] and sampled[-1] is points[-1]
+    # 선택된 점은 원래 순서를 유지하고 중복되지 않음
+    positions = [points.index(point) for point in sampled]
+    assert positions == sorted(set(positions))
+
+def test_downsample_passthrough():
+    # max_points 이하이거나 제한이 없으면(또는 3 미만이면) 원본 그대로 반환
+    points = _points(50)
+    assert downsample_points(points, 50) is points
+    assert downsample_points(points, 1000) is points
+    assert downsample_points(points, None) is points
+    assert downsample_points(points, 2) is points
+    assert downsample_points([], 10) == []
+
+def test_lttb_keeps_spike():
+    # 평탄한 구간의 단일 피크는 삼각형 넓이가 가장 크므로 반드시 선택됨
+    x = np.arange(1000, dtype=np.float64)
+    y = np.zeros(1000)
+    y[637] = 500.0
+    indices = lttb_indices(x, y, 20)
+    assert len(indices) == 20 and indices[0] == 0 and indices[-1] == 999
+    assert 637 in indices
+
+if __name__ == "__main__":
+    test_downsample_keeps_endpoints()
+    test_downsample_passthrough()
+    test_lttb_keeps_spike()
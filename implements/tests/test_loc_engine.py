@@ -0,0 +1,116 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from core.loc_engine import LOCEngine
+
+# cloc이 없으면 같은 JSON 형식을 내는 테스트용 대체 스크립트로 측정 경로 전체(git archive | tar -> cloc)를 실행
+FAKE_CLOC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_cloc.py")
+
+def _cloc_path(repo_path):
+    return "cloc" if LOCEngine(repo_path).is_cloc_available() else FAKE_CLOC
+
+def _git(repo_path, *args):
+    result = subprocess.run(["git", *args], cwd=repo_path, check=True, capture_output=True, text=True)
+    return result.stdout.strip()
+
+def _write(repo_path, name, lines):
+    path = os.path.join(repo_path, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write("".join(f"x{n} = {n}\n" for n in range(lines)))
+
+def _make_repo(repo_path):
+    """
+    커밋별 코드 라인수를 알고 있는 테스트용 저장소 생성. 반환값: [(커밋, 전체 LOC, src LOC), ...]
+    - c1: src/a.py 10줄, docs/c.py 3줄, docs/notes.py (주석/빈 줄 제외 코드 1줄)
+    - c2: src/b.py 5줄, 바이너리 src/blob.bin 추가
+    - c3: src/a.py를 4줄로 줄임
+    """
+    _git(repo_path, "init", "-q", "-b", "main")
+    _git(repo_path, "config", "user.email", "test@example.com")
+    _git(repo_path, "config", "user.name", "tester")
+    commits = []
+
+    _write(repo_path, "src/a.py", 10)
+    _write(repo_path, "docs/c.py", 3)
+    with open(os.path.join(repo_path, "docs", "notes.py"), "w") as f:
+        f.write("# comment\n\nvalue = 1\n")
+    _git(repo_path, "add", "-A")
+    _git(repo_path, "commit", "-q", "-m", "c1")
+    commits.append((_git(repo_path, "rev-parse", "HEAD"), 14, 10))
+
+    _write(repo_path, "src/b.py", 5)
+    with open(os.path.join(repo_path, "src", "blob.bin"), "wb") as f:
+        f.write(b"\x00\x01\x02\n\x03")
+    _git(repo_path, "add", "-A")
+    _git(repo_path, "commit", "-q", "-m", "c2")
+    commits.append((_git(repo_path, "rev-parse", "HEAD"), 19, 15))
+
+    _write(repo_path, "src/a.py", 4)
+    _git(repo_path, "add", "-A")
+    _git(repo_path, "commit", "-q", "-m", "c3")
+    commits.append((_git(repo_path, "rev-parse", "HEAD"), 13, 9))
+    return commits
+
+def _exported_files(engine, commit_hash):
+    dest = tempfile.mkdtemp(prefix="cm_export_")
+    try:
+        assert engine._export_tree(commit_hash, dest)
+        return sorted(
+            os.path.relpath(os.path.join(root, name), dest)
+            for root, _, names in os.walk(dest) for name in names
+        )
+    finally:
+        shutil.rmtree(dest, ignore_errors=True)
+
+def test_export_tree_at_commit():
+    """작업 트리와 무관하게 지정 커밋의 트리(include_path 하위만)를 풀어야 함"""
+    repo_path = tempfile.mkdtemp(prefix="cm_loc_")
+    try:
+        commits = _make_repo(repo_path)
+        # 작업 트리의 미커밋 변경은 측정 대상이 아님
+        _write(repo_path, "src/untracked.py", 100)
+
+        engine = LOCEngine(repo_path)
+        assert _exported_files(engine, commits[0][0]) == ["docs/c.py", "docs/notes.py", "src/a.py"]
+        assert _exported_files(engine, commits[1][0]) == ["docs/c.py", "docs/notes.py", "src/a.py", "src/b.py", "src/blob.bin"]
+        assert _exported_files(LOCEngine(repo_path, include_path="src"), commits[1][0]) == \
+            ["src/a.py", "src/b.py", "src/blob.bin"]
+        with open(os.path.join(repo_path, "src", "a.py")) as f:
+            assert len(f.readlines()) == 4
+
+        # 존재하지 않는 커밋은 0으로 처리
+        assert engine.count_loc("0" * 40) == {"total_loc": 0}
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+def test_count_loc_matches_known_totals():
+    repo_path = tempfile.mkdtemp(prefix="cm_loc_")
+    try:
+        commits = _make_repo(repo_path)
+        cloc_path = _cloc_path(repo_path)
+        print(f"Using cloc: {cloc_path}")
+        engine = LOCEngine(repo_path, cloc_path=cloc_path)
+        src_engine = LOCEngine(repo_path, cloc_path=cloc_path, include_path="src")
+        for commit_hash, total, src_total in commits:
+            print(f"{commit_hash[:8]}: total={total}, src={src_total}")
+            assert engine.count_loc(commit_hash)["total_loc"] == total
+            assert src_engine.count_loc(commit_hash)["total_loc"] == src_total
+
+        hashes = [commit_hash for commit_hash, _, _ in commits]
+        many = engine.count_loc_many(hashes, max_workers=2)
+        assert list(many) == hashes
+        assert many == {commit_hash: engine.count_loc(commit_hash) for commit_hash in hashes}
+        assert src_engine.count_loc_many([]) == {}
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_export_tree_at_commit()
+    test_count_loc_matches_known_totals()
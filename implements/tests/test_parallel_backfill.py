@@ -0,0 +1,210 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from core.git_analyzer import GitAnalyzer, merge_commit_orders
+from core.worker import iter_commits_sharded
+from db.database import DatabaseConnection
+from db.numstat_cache import NumstatCache
+
+def _git(repo_path, *args):
+    subprocess.run(["git", *args], cwd=repo_path, check=True, capture_output=True)
+
+def _make_repo(repo_path):
+    """브랜치 병합, 바이너리, 이름 변경이 섞인 테스트용 저장소 생성"""
+    _git(repo_path, "init", "-q", "-b", "main")
+    _git(repo_path, "config", "user.email", "test@example.com")
+    _git(repo_path, "config", "user.name", "tester")
+    for i in range(40):
+        sub = "src" if i % 3 else "docs"
+        name = f"t{i}.txt" if 20 < i <= 25 else f"f{i % 7}.txt"  # topic 브랜치는 별도 파일만 수정
+        os.makedirs(os.path.join(repo_path, sub), exist_ok=True)
+        with open(os.path.join(repo_path, sub, name), "w") as f:
+            f.write("\n".join(str(n) for n in range(i * 3 % 17 + 1)))
+        _git(repo_path, "add", "-A")
+        _git(repo_path, "commit", "-q", "--allow-empty", "-m", f"c{i}")
+        if i == 20:
+            _git(repo_path, "checkout", "-q", "-b", "topic")
+        if i == 25:
+            _git(repo_path, "checkout", "-q", "main")
+        if i == 30:
+            _git(repo_path, "merge", "-q", "--no-edit", "topic")
+    with open(os.path.join(repo_path, "src", "blob.bin"), "wb") as f:
+        f.write(b"\x00\x01\x02")
+    _git(repo_path, "add", "-A")
+    _git(repo_path, "commit", "-q", "-m", "binary")
+    _git(repo_path, "mv", "src/f1.txt", "src/renamed.txt")
+    _git(repo_path, "commit", "-q", "-m", "rename")
+
+def test_sharded_matches_serial():
+    repo_path = tempfile.mkdtemp(prefix="cm_shard_")
+    try:
+        _make_repo(repo_path)
+        for include_path in (None, "src"):
+            serial = list(GitAnalyzer(repo_path, include_path, track_languages=True).get_commits_generator())
+            hashes = GitAnalyzer(repo_path, include_path).get_commit_hashes()
+            sharded = list(iter_commits_sharded(repo_path, include_path, hashes, workers=3, min_shard_size=4))
+            print(f"include_path={include_path}: serial={len(serial)}, sharded={len(sharded)}")
+            assert serial == sharded
+            # 언어별 순증감의 합은 커밋 전체 순증감과 같아야 함
+            for commit in serial:
+                assert sum(commit.languages.values()) == commit.insertions - commit.deletions
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+def test_routed_matches_single_paths():
+    """여러 include_path를 numstat 한 번으로 라우팅한 결과가 등록별 단독 분석의 순증감과 같아야 함"""
+    repo_path = tempfile.mkdtemp(prefix="cm_route_")
+    try:
+        _make_repo(repo_path)
+        include_paths = ["src", "docs", None]
+        orders = [GitAnalyzer(repo_path, path).get_commit_hashes() for path in include_paths]
+        order = merge_commit_orders(orders)
+        assert order == orders[-1]
+        # 서로 겹치지 않는 경로의 순서를 합쳐도 각 등록의 순서는 유지되어야 함
+        merged = merge_commit_orders(orders[:2])
+        assert sorted(merged) == sorted(set(orders[0]) | set(orders[1]))
+        for sub_order in orders[:2]:
+            assert [h for h in merged if h in set(sub_order)] == sub_order
+
+        analyzer = GitAnalyzer(repo_path, track_languages=True)
+        serial = list(analyzer.get_routed_commits_for_hashes(order, include_paths))
+        sharded = list(iter_commits_sharded(repo_path, None, order, workers=3, min_shard_size=4,
+                                            include_paths=include_paths))
+        assert [c.hash for c in serial] == [c.hash for c in sharded]
+        for a, b in zip(serial, sharded):
+            assert a.parts == b.parts
+
+        for index, path in enumerate(include_paths):
+            single = {c.hash: c for c in GitAnalyzer(repo_path, path, track_languages=True).get_commits_generator()}
+            routed = 0
+            for commit in serial:
+                part = commit.parts.get(index)
+                if part is None:
+                    continue
+                routed += 1
+                expected = single[commit.hash]
+                # --no-renames로 분석하므로 삽입/삭제 분할은 다를 수 있으나 순증감은 같음
+                assert part.insertions - part.deletions == expected.insertions - expected.deletions
+                assert sum(part.languages.values()) == part.insertions - part.deletions
+            print(f"include_path={path}: single={len(single)}, routed={routed}")
+            assert routed <= len(single)
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+def test_numstat_cache_reuse():
+    """캐시를 거친 분석이 git 분석과 같은 커밋/순증감을 내고, 두 번째부터는 git numstat 없이 끝나야 함"""
+    repo_path = tempfile.mkdtemp(prefix="cm_cache_")
+    cache_path = os.path.join(repo_path + "_cache", "numstat.db")
+    try:
+        _make_repo(repo_path)
+        cache = NumstatCache(cache_path)
+        for include_path in ("src", None, "./docs/"):
+            plain = list(GitAnalyzer(repo_path, include_path, track_languages=True).get_commits_generator())
+            cached = list(GitAnalyzer(repo_path, include_path, track_languages=True, cache=cache).get_commits_generator())
+            print(f"include_path={include_path}: plain={len(plain)}, cached={len(cached)}")
+            assert [c.hash for c in plain] == [c.hash for c in cached]
+            for a, b in zip(plain, cached):
+                assert a.date == b.date
+                assert a.insertions - a.deletions == b.insertions - b.deletions
+                assert {k: v for k, v in a.languages.items() if v} == {k: v for k, v in b.languages.items() if v}
+
+        # 모든 커밋이 캐시에 있으므로 git numstat을 실행하지 않음
+        def no_git(hashes):
+            raise AssertionError(f"unexpected git numstat for {len(hashes)} commits")
+
+        analyzer = GitAnalyzer(repo_path, "src", track_languages=True, cache=cache)
+        analyzer._fetch_numstat = no_git
+        warm = list(analyzer.get_commits_generator())
+        hashes = GitAnalyzer(repo_path, "src").get_commit_hashes()
+        sharded = list(iter_commits_sharded(repo_path, "src", hashes, workers=3, min_shard_size=4,
+                                            cache_path=cache_path))
+        assert warm == sharded == list(GitAnalyzer(repo_path, "src", track_languages=True,
+                                                   cache=cache).get_commits_for_hashes(hashes))
+
+        # 라우팅 분석도 캐시 결과와 git 결과가 같아야 함 (둘 다 --no-renames)
+        include_paths = ["src", "docs"]
+        order = merge_commit_orders([GitAnalyzer(repo_path, path).get_commit_hashes() for path in include_paths])
+        plain = list(GitAnalyzer(repo_path, track_languages=True).get_routed_commits_for_hashes(order, include_paths))
+        routed = GitAnalyzer(repo_path, track_languages=True, cache=cache)
+        routed._fetch_numstat = no_git
+        for a, b in zip(plain, routed.get_routed_commits_for_hashes(order, include_paths)):
+            assert a.hash == b.hash and a.parts == b.parts
+    finally:
+        DatabaseConnection.close_path(cache_path)
+        shutil.rmtree(repo_path, ignore_errors=True)
+        shutil.rmtree(repo_path + "_cache", ignore_errors=True)
+
+def test_numstat_cache_fill_failure():
+    """git이 커밋을 분석하지 못하면 해당 커밋을 빠뜨리지 않고 분석 전체가 실패해야 함"""
+    repo_path = tempfile.mkdtemp(prefix="cm_cache_fail_")
+    cache_path = os.path.join(repo_path + "_cache", "numstat.db")
+    try:
+        _make_repo(repo_path)
+        cache = NumstatCache(cache_path)
+        analyzer = GitAnalyzer(repo_path, "src", track_languages=True, cache=cache)
+        analyzer._fetch_numstat = lambda hashes: {}
+        try:
+            commits = list(analyzer.get_commits_generator())
+        except RuntimeError as e:
+            print(f"Empty fill rejected: {e}")
+        else:
+            raise AssertionError(f"analysis returned {len(commits)} commits without numstat data")
+        assert cache.get_many(GitAnalyzer(repo_path).get_commit_hashes()) == {}
+
+        # 존재하지 않는 커밋 객체: git 실패가 그대로 전달됨
+        hashes = GitAnalyzer(repo_path).get_commit_hashes() + ["0" * 40]
+        try:
+            list(GitAnalyzer(repo_path, cache=cache).get_commits_for_hashes(hashes))
+        except subprocess.CalledProcessError:
+            pass
+        else:
+            raise AssertionError("missing commit object was skipped silently")
+    finally:
+        DatabaseConnection.close_path(cache_path)
+        shutil.rmtree(repo_path, ignore_errors=True)
+        shutil.rmtree(repo_path + "_cache", ignore_errors=True)
+
+def test_merge_commit_at_end_of_output():
+    """numstat이 없는 병합 커밋이 출력의 마지막(HEAD 또는 샤드 끝)이어도 빠지지 않아야 함 (캐시 미사용 파서)"""
+    repo_path = tempfile.mkdtemp(prefix="cm_merge_")
+    try:
+        _make_repo(repo_path)
+        _git(repo_path, "checkout", "-q", "-b", "side")
+        with open(os.path.join(repo_path, "src", "side.txt"), "w") as f:
+            f.write("side\n")
+        _git(repo_path, "add", "-A")
+        _git(repo_path, "commit", "-q", "-m", "side")
+        _git(repo_path, "checkout", "-q", "main")
+        _git(repo_path, "merge", "-q", "--no-ff", "--no-edit", "side")
+
+        analyzer = GitAnalyzer(repo_path, track_languages=True)
+        hashes = analyzer.get_commit_hashes()
+        head = analyzer.get_latest_commit_hash()
+        commits = list(analyzer.get_commits_generator())
+        print(f"rev-list={len(hashes)}, parsed={len(commits)}")
+        assert [c.hash for c in commits] == hashes and commits[-1].hash == head
+
+        # 병합 커밋에서 끝나는 샤드
+        merges = subprocess.run(["git", "rev-list", "--merges", "HEAD"], cwd=repo_path,
+                                capture_output=True, text=True, check=True).stdout.split()
+        assert len(merges) == 2
+        for merge in merges:
+            shard = hashes[:hashes.index(merge) + 1]
+            assert [c.hash for c in analyzer.get_commits_for_hashes(shard)] == shard
+        sharded = list(iter_commits_sharded(repo_path, None, hashes, workers=2, min_shard_size=1))
+        assert sharded == commits
+    finally:
+        shutil.rmtree(repo_path, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_sharded_matches_serial()
+    test_merge_commit_at_end_of_output()
+    test_routed_matches_single_paths()
+    test_numstat_cache_reuse()
+    test_numstat_cache_fill_failure()
@@ -0,0 +1,102 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from db.database import DatabaseConnection
+from db.managers import RepositoryManager, HistoryManager
+from core.reconciler import DriftReconciler
+from core.worker import BackfillWorker
+
+FAKE_CLOC = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_cloc.py")
+
+def _git(repo_path, *args):
+    subprocess.run(["git", *args], cwd=repo_path, check=True, capture_output=True)
+
+def _make_repo(repo_path):
+    """주석/빈 줄이 섞인 파일로 커밋 4개 생성 (numstat 누적값은 마지막 커밋 기준 24줄)"""
+    _git(repo_path, "init", "-q", "-b", "main")
+    _git(repo_path, "config", "user.email", "test@example.com")
+    _git(repo_path, "config", "user.name", "tester")
+    for i in range(4):
+        with open(os.path.join(repo_path, f"m{i}.py"), "w") as f:
+            f.write("# header\n\n" + "".join(f"v{n} = {n}\n" for n in range(4)))
+        _git(repo_path, "add", "-A")
+        _git(repo_path, "commit", "-q", "-m", f"c{i}")
+
+class _StubEngine:
+    """모든 커밋을 numstat 누적값 + extra 줄로 측정하는 LOCEngine 대체"""
+
+    def __init__(self, history_manager, repo_id, extra):
+        self.totals = {}
+        self.extra = extra
+        offset = 0
+        while True:
+            record = history_manager.get_history_record(repo_id, offset=offset)
+            if record is None:
+                break
+            self.totals[record['commit_hash']] = record['total_loc']
+            offset += 1
+
+    def is_cloc_available(self):
+        return True
+
+    def count_loc_many(self, commit_hashes, max_workers=None):
+        return {
+            h: {"total_files": 1, "total_loc": self.totals[h] + self.extra - 2, "comment": 1, "blank": 1}
+            for h in commit_hashes
+        }
+
+def _checkpoints(db, repo_id):
+    with db.get_connection() as conn:
+        rows = conn.execute(
+            "SELECT history_id, estimated_loc, measured_loc FROM loc_checkpoints WHERE repo_id = ? ORDER BY history_id",
+            (repo_id,)
+        ).fetchall()
+    return [tuple(row) for row in rows]
+
+def test_reconcile_stores_checkpoints_and_offsets():
+    tmp_dir = tempfile.mkdtemp(prefix="cm_reconcile_")
+    repo_path = os.path.join(tmp_dir, "repo")
+    db_path = os.path.join(tmp_dir, "reconcile.db")
+    try:
+        os.makedirs(repo_path)
+        _make_repo(repo_path)
+        db = DatabaseConnection(db_path)
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        worker = BackfillWorker(db_path)
+
+        # 1. 물리적 줄 수로 실측하므로 numstat 누적값과 정확히 같으면 offset은 0 (주석/빈 줄이 드리프트가 아님)
+        repo_id = repo_manager.add_repository("exact", repo_path)
+        worker._run_backfill_process("t1", repo_id, repo_path)
+        added = DriftReconciler(db, repo_id, repo_path, cloc_path=FAKE_CLOC).reconcile(every_n=2)
+        checkpoints = _checkpoints(db, repo_id)
+        print(f"Checkpoints (fake cloc): {checkpoints}")
+        assert added == 2
+        assert [(estimated, measured) for _, estimated, measured in checkpoints] == [(12, 12), (24, 24)]
+        # 이미 측정한 커밋은 다시 측정하지 않음
+        assert DriftReconciler(db, repo_id, repo_path, cloc_path=FAKE_CLOC).reconcile(every_n=2) == 0
+
+        # 2. 실측이 누적값보다 7줄 많으면 그 offset이 저장되고 조회 값에 적용됨
+        drift_id = repo_manager.add_repository("drift", repo_path)
+        worker._run_backfill_process("t2", drift_id, repo_path)
+        reconciler = DriftReconciler(db, drift_id, repo_path)
+        reconciler.loc_engine = _StubEngine(history_manager, drift_id, extra=7)
+        assert reconciler.reconcile() == 1
+        (history_id, estimated, measured), = _checkpoints(db, drift_id)
+        assert (estimated, measured) == (24, 31)
+
+        stats = history_manager.get_stats([drift_id], "2000-01-01", "2100-01-01", resolution="day")
+        print(f"Corrected stats: {stats}")
+        assert stats[-1]['total_loc'] == 31
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_reconcile_stores_checkpoints_and_offsets()
@@ -0,0 +1,137 @@
+import os
+import sys
+import threading
+import time
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from core.scheduler import JobScheduler, PRIORITY_USER, PRIORITY_NIGHTLY
+
+def test_priority_dedup_and_concurrency():
+    scheduler = JobScheduler(max_workers=2)
+    gate = threading.Event()
+    order = []
+    lock = threading.Lock()
+    active = [0, 0]  # 현재 실행 수, 최대 동시 실행 수
+
+    def job(name, cancel_event=None):
+        with lock:
+            order.append(name)  # 시작 순서 기록
+            active[0] += 1
+            active[1] = max(active[1], active[0])
+        gate.wait()
+        time.sleep(0.01)
+        with lock:
+            active[0] -= 1
+
+    # 두 실행 스레드를 점유한 뒤 대기열에 작업 등록
+    scheduler.submit("blocker-1", job, "blocker-1")
+    scheduler.submit("blocker-2", job, "blocker-2")
+    time.sleep(0.1)
+    for i in range(3):
+        scheduler.submit(("sync", i), job, f"nightly-{i}", priority=PRIORITY_NIGHTLY)
+    assert not scheduler.submit(("sync", 0), job, "duplicate", priority=PRIORITY_NIGHTLY)
+    scheduler.submit(("sync", 99), job, "user", priority=PRIORITY_USER)
+    # 대기 중인 야간 작업을 사용자가 다시 요청하면 우선순위만 올라감
+    assert not scheduler.submit(("sync", 2), job, "duplicate", priority=PRIORITY_USER)
+    assert scheduler.stats()["queued"] == 4
+    # 대기 중인 작업 취소: 실행되지 않으며 두 번째 취소는 실패
+    assert scheduler.cancel(("sync", 1))
+    assert not scheduler.cancel(("sync", 1)) and not scheduler.is_pending(("sync", 1))
+
+    gate.set()
+    deadline = time.time() + 5
+    while len(order) < 5 and time.time() < deadline:
+        time.sleep(0.01)
+
+    print(f"Execution order: {order}, max concurrency: {active[1]}")
+    assert sorted(order[2:4]) == ["nightly-2", "user"]
+    assert order[4:] == ["nightly-0"]
+    assert "duplicate" not in order
+    assert active[1] == 2
+
+def test_timeout_sets_cancel_event():
+    scheduler = JobScheduler(max_workers=1)
+    result = {}
+    done = threading.Event()
+
+    def slow_job(cancel_event=None):
+        result["cancelled"] = cancel_event.wait(2)
+        done.set()
+
+    scheduler.submit("slow", slow_job, timeout=0.1)
+    assert done.wait(3)
+    assert result["cancelled"]
+
+def test_claim_and_release():
+    scheduler = JobScheduler(max_workers=1)
+    gate = threading.Event()
+    ran = []
+
+    scheduler.submit("blocker", lambda cancel_event=None: gate.wait(2))
+    time.sleep(0.1)
+    scheduler.submit("sibling", lambda cancel_event=None: ran.append("sibling"))
+
+    # 넘겨받은 작업은 실행되지 않고, release 전까지 실행 중으로 취급됨
+    job = scheduler.claim("sibling")
+    assert job is not None and scheduler.claim("sibling") is None
+    assert scheduler.is_pending("sibling")
+    scheduler.release("sibling")
+    assert not scheduler.is_pending("sibling")
+
+    gate.set()
+    time.sleep(0.2)
+    assert ran == []
+
+def test_same_key_never_runs_concurrently():
+    # 실행 스레드가 남아 있어도 같은 key의 두 번째 작업은 첫 작업이 끝난 뒤에 실행됨
+    scheduler = JobScheduler(max_workers=2)
+    gate = threading.Event()
+    lock = threading.Lock()
+    events = []
+
+    def job(name, cancel_event=None):
+        with lock:
+            events.append(f"start-{name}")
+        if name == "first":
+            gate.wait(2)
+        with lock:
+            events.append(f"end-{name}")
+
+    scheduler.submit(("sync", 1), job, "first")
+    time.sleep(0.1)
+    assert scheduler.submit(("sync", 1), job, "second")
+    # 다른 key의 작업은 미뤄진 작업에 막히지 않음
+    scheduler.submit(("sync", 2), job, "other")
+    time.sleep(0.2)
+    assert events == ["start-first", "start-other", "end-other"]
+    assert scheduler.stats() == {"max_workers": 2, "queued": 1, "running": 1}
+
+    gate.set()
+    deadline = time.time() + 5
+    while "end-second" not in events and time.time() < deadline:
+        time.sleep(0.01)
+
+    print(f"Events: {events}")
+    assert events[3:] == ["end-first", "start-second", "end-second"]
+    assert not scheduler.is_pending(("sync", 1))
+
+    # claim으로 넘겨받은 key도 release 전까지는 실행 중으로 보고 미룸
+    ran = []
+    scheduler.submit("held", lambda cancel_event=None: ran.append("held"))
+    assert scheduler.claim("held") is not None
+    scheduler.submit("held", lambda cancel_event=None: ran.append("resubmitted"))
+    time.sleep(0.2)
+    assert ran == []
+    scheduler.release("held")
+    deadline = time.time() + 5
+    while not ran and time.time() < deadline:
+        time.sleep(0.01)
+    assert ran == ["resubmitted"]
+
+if __name__ == "__main__":
+    test_priority_dedup_and_concurrency()
+    test_timeout_sets_cancel_event()
+    test_claim_and_release()
+    test_same_key_never_runs_concurrently()
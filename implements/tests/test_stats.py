@@ -0,0 +1,38 @@
+import os
+import sys
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from core.aggregate import sum_datasets
+from db.cache import ResultCache
+
+def test_sum_datasets_forward_fill():
+    datasets = [
+        {"label": "A", "data": [{"x": "2023-01-01 10:00:00 +0900", "y": 100}, {"x": "2023-01-03 10:00:00 +0900", "y": 120}]},
+        {"label": "B", "data": [{"x": "2023-01-02 09:00:00 +0000", "y": 50}]},
+    ]
+    total = sum_datasets(datasets)
+    print(f"Aggregated: {total['data']}")
+    assert total["data"] == [
+        {"x": "2023-01-01", "y": 100},
+        {"x": "2023-01-02", "y": 150},
+        {"x": "2023-01-03", "y": 170},
+    ]
+
+def test_result_cache_invalidation():
+    cache = ResultCache(max_entries=2)
+    cache.put("a", [1, 2], "A")
+    cache.put("b", [3], "B")
+    cache.invalidate(2)
+    assert cache.get("a") is None and cache.get("b") == "B"
+
+    # 계산 도중 무효화가 일어난 결과는 저장하지 않음
+    generation = cache.generation
+    cache.invalidate(3)
+    cache.put("c", [3], "C", generation)
+    assert cache.get("c") is None
+
+if __name__ == "__main__":
+    test_sum_datasets_forward_fill()
+    test_result_cache_invalidation()
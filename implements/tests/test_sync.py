@@ -0,0 +1,302 @@
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+
+# 모듈 경로 추가
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../backend")))
+
+from db.database import DatabaseConnection
+from db.managers import RepositoryManager, HistoryManager, TaskManager, SettingsManager
+from core.git_analyzer import GitAnalyzer
+from core.worker import BackfillWorker, TaskState, TaskType
+
+def _git(repo_path, *args):
+    subprocess.run(["git", *args], cwd=repo_path, check=True, capture_output=True)
+
+def _commit(repo_path, name, lines, message):
+    with open(os.path.join(repo_path, name), "w") as f:
+        f.write("".join(f"{n}\n" for n in range(lines)))
+    _git(repo_path, "add", "-A")
+    _git(repo_path, "commit", "-q", "-m", message)
+
+def _setup(tmp_dir):
+    """원격(origin)과 file:// 로 클론한 작업 저장소 생성"""
+    origin = os.path.join(tmp_dir, "origin")
+    os.makedirs(origin)
+    _git(origin, "init", "-q", "-b", "main")
+    _git(origin, "config", "user.email", "test@example.com")
+    _git(origin, "config", "user.name", "tester")
+    for i in range(3):
+        _commit(origin, f"f{i}.txt", 10, f"c{i}")
+    clone = os.path.join(tmp_dir, "clone")
+    subprocess.run(["git", "clone", "-q", f"file://{origin}", clone], check=True, capture_output=True)
+    return origin, clone
+
+def test_sync_skips_when_upstream_unchanged():
+    tmp_dir = tempfile.mkdtemp(prefix="cm_sync_")
+    db_path = os.path.join(tmp_dir, "sync.db")
+    try:
+        origin, clone = _setup(tmp_dir)
+        db = DatabaseConnection(db_path)
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        worker = BackfillWorker(db_path)
+        repo_id = repo_manager.add_repository("clone", clone)
+
+        # 작업은 스케줄러를 거치지 않고 직접 실행
+        assert GitAnalyzer(clone).count_commits() == 3
+        worker._run_backfill_process("t1", repo_id, clone)
+        assert history_manager.get_last_history_record(repo_id)['total_loc'] == 30
+
+        # 변경 없음: history_version이 그대로여야 함 (pull/log 생략)
+        version = repo_manager.get_all_repositories()[0]['history_version']
+        worker._run_sync_process(repo_id, clone)
+        repo = repo_manager.get_all_repositories()[0]
+        assert repo['history_version'] == version and repo['status'] == "idle"
+
+        # 원격에 새 커밋: fetch로 감지하여 증분 동기화
+        _commit(origin, "f3.txt", 5, "c3")
+        worker._run_sync_process(repo_id, clone)
+        last = history_manager.get_last_history_record(repo_id)
+        print(f"After sync: {last['commit_hash'][:8]} total={last['total_loc']}")
+        assert last['total_loc'] == 35
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_sync_skips_when_upstream_tip_is_merge():
+    """upstream 끝이 병합 커밋이어도 기록된 마지막 커밋과 일치해 두 번째 동기화는 생략되어야 함 (캐시 미사용)"""
+    tmp_dir = tempfile.mkdtemp(prefix="cm_sync_merge_")
+    db_path = os.path.join(tmp_dir, "sync.db")
+    try:
+        origin, clone = _setup(tmp_dir)
+        db = DatabaseConnection(db_path)
+        SettingsManager(db).set_value("numstat_cache", "false")
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        worker = BackfillWorker(db_path)
+        repo_id = repo_manager.add_repository("clone", clone)
+        worker._run_backfill_process("t1", repo_id, clone)
+
+        _git(origin, "checkout", "-q", "-b", "topic")
+        _commit(origin, "t.txt", 4, "topic")
+        _git(origin, "checkout", "-q", "main")
+        _git(origin, "merge", "-q", "--no-ff", "--no-edit", "topic")
+        merge = GitAnalyzer(origin).get_latest_commit_hash()
+
+        worker._run_sync_process(repo_id, clone)
+        last = history_manager.get_last_history_record(repo_id)
+        assert last['commit_hash'] == merge and last['total_loc'] == 34
+
+        # 변경 없음: pull/log 없이 fetch와 비교만으로 끝나야 함
+        def unexpected(*args, **kwargs):
+            raise AssertionError("sync did not short-circuit")
+
+        original = GitAnalyzer.pull, GitAnalyzer.get_commits_generator
+        GitAnalyzer.pull = GitAnalyzer.get_commits_generator = unexpected
+        try:
+            version = repo_manager.get_all_repositories()[0]['history_version']
+            worker._run_sync_process(repo_id, clone)
+        finally:
+            GitAnalyzer.pull, GitAnalyzer.get_commits_generator = original
+        repo = repo_manager.get_all_repositories()[0]
+        assert repo['history_version'] == version and repo['status'] == "idle"
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_sync_rewinds_rewritten_history():
+    tmp_dir = tempfile.mkdtemp(prefix="cm_sync_")
+    db_path = os.path.join(tmp_dir, "sync.db")
+    try:
+        origin, clone = _setup(tmp_dir)
+        db = DatabaseConnection(db_path)
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        worker = BackfillWorker(db_path)
+        repo_id = repo_manager.add_repository("clone", clone)
+        worker._run_backfill_process("t1", repo_id, clone)
+        kept = history_manager.get_history_record(repo_id, offset=1)
+
+        # force-push: 원격에서 마지막 커밋을 버리고 다른 커밋으로 교체
+        _git(origin, "reset", "-q", "--hard", "HEAD~1")
+        _commit(origin, "g.txt", 7, "rewritten")
+        worker._run_sync_process(repo_id, clone)
+        last = history_manager.get_last_history_record(repo_id)
+        print(f"After force-push sync: {last['commit_hash'][:8]} total={last['total_loc']}")
+        assert last['total_loc'] == 27
+        assert history_manager.get_history_record(repo_id, offset=1)['id'] == kept['id']
+        assert repo_manager.get_all_repositories()[0]['status'] == "idle"
+
+        # 이전 커밋 객체가 없는 경우(gc 등): 저장된 시리즈를 거슬러 올라가 HEAD의 조상을 찾음
+        history_manager.add_history_batch(repo_id, [
+            {"timestamp": "2030-01-01 00:00:00", "commit_hash": f"{n:040x}", "total_loc": 999}
+            for n in range(1, 6)
+        ])
+        _commit(origin, "h.txt", 3, "next")
+        worker._run_sync_process(repo_id, clone)
+        last = history_manager.get_last_history_record(repo_id)
+        assert last['total_loc'] == 30 and history_manager.get_history_record(repo_id, commit_hash=f"{1:040x}") is None
+        stats = history_manager.get_stats([repo_id], "2000-01-01 00:00:00", "2040-01-01 00:00:00", "month")
+        assert stats[-1]['total_loc'] == 30
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_backfill_resumes_from_checkpoint():
+    tmp_dir = tempfile.mkdtemp(prefix="cm_sync_")
+    db_path = os.path.join(tmp_dir, "sync.db")
+    try:
+        origin, clone = _setup(tmp_dir)
+        db = DatabaseConnection(db_path)
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        repo_id = repo_manager.add_repository("clone", clone)
+        BackfillWorker(db_path)._run_backfill_process("t1", repo_id, clone)
+
+        # 세 번째 커밋을 기록하기 전에 서버가 종료된 상황 재현: 두 커밋만 남기고 RUNNING 작업 기록
+        kept = history_manager.get_history_record(repo_id, offset=1)
+        history_manager.rewind_history(repo_id, kept['id'])
+        repo_manager.update_status(repo_id, "backfilling")
+        TaskManager(db).save_task({
+            "task_id": "interrupted", "repo_id": repo_id, "task_type": TaskType.BACKFILL,
+            "status": TaskState.RUNNING, "progress_commits": 2, "started_at": "2024-01-01T00:00:00"
+        })
+
+        # 새 프로세스의 워커가 시작 시 이어서 실행
+        worker = BackfillWorker(db_path)
+        assert worker.resume_interrupted_tasks() == ["interrupted"]
+        for _ in range(100):
+            if worker.get_task_status("interrupted")['status'] == TaskState.COMPLETED:
+                break
+            time.sleep(0.1)
+
+        status = worker.get_task_status("interrupted")
+        assert status['total_commits'] == 3 and status['progress_percentage'] == 100.0
+        assert set(status['phase_seconds']) == {"count", "git", "parse", "db", "reconcile"}
+
+        task = TaskManager(db).get_task("interrupted")
+        print(f"Resumed task: {task['status']} {task['progress_commits']} commits, checkpoint {task['checkpoint_loc']}")
+        assert task['status'] == TaskState.COMPLETED and task['progress_commits'] == 3
+        assert task['checkpoint_loc'] == 30
+        assert history_manager.get_history_record(repo_id, offset=1)['id'] == kept['id']
+        assert history_manager.get_last_history_record(repo_id)['total_loc'] == 30
+        assert repo_manager.get_all_repositories()[0]['status'] == "idle"
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_pause_resume_and_cancel():
+    tmp_dir = tempfile.mkdtemp(prefix="cm_sync_")
+    db_path = os.path.join(tmp_dir, "sync.db")
+    try:
+        origin, clone = _setup(tmp_dir)
+        db = DatabaseConnection(db_path)
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        repo_id = repo_manager.add_repository("clone", clone)
+        worker = BackfillWorker(db_path)
+
+        # 스케줄러에 넘기기 전에 등록된 작업을 일시정지한 뒤 실행: 첫 중단 지점에서 멈춤
+        task = {
+            "task_id": "t1", "repo_id": repo_id, "task_type": TaskType.BACKFILL, "include_path": None,
+            "status": TaskState.PENDING, "progress_commits": 0, "total_commits": 0, "error": None,
+            "started_at": "2024-01-01T00:00:00"
+        }
+        worker._register_task(task)
+        TaskManager(db).save_task(task)
+        worker.pause_task("t1")
+        worker._run_backfill_process("t1", repo_id, clone, cancel_event=threading.Event())
+        assert worker.get_task_status("t1")['status'] == TaskState.PAUSED
+        assert TaskManager(db).get_task("t1")['status'] == TaskState.PAUSED
+        assert repo_manager.get_all_repositories()[0]['status'] == "paused"
+        try:
+            worker.pause_task("t1")
+            assert False, "paused task cannot be paused again"
+        except ValueError:
+            pass
+
+        # 재개: 스케줄러에서 끝까지 실행
+        assert worker.resume_task("t1")['status'] in (TaskState.PENDING, TaskState.RUNNING, TaskState.COMPLETED)
+        for _ in range(100):
+            if worker.get_task_status("t1")['status'] == TaskState.COMPLETED:
+                break
+            time.sleep(0.1)
+        assert worker.get_task_status("t1")['status'] == TaskState.COMPLETED
+        assert history_manager.get_last_history_record(repo_id)['total_loc'] == 30
+        assert repo_manager.get_all_repositories()[0]['status'] == "idle"
+
+        # 완료된 작업은 취소할 수 없고, 없는 작업은 None
+        try:
+            worker.cancel_task("t1")
+            assert False, "completed task cannot be cancelled"
+        except ValueError:
+            pass
+        assert worker.cancel_task("missing") is None
+
+        # 동기화 작업도 같은 방식으로 중단: 실행 전에 취소하면 히스토리는 그대로
+        _commit(origin, "f3.txt", 5, "c3")
+        task_id = worker.start_sync(repo_id, clone)
+        worker.cancel_task(task_id)
+        for _ in range(100):
+            if not worker._scheduler.is_pending(("sync", repo_id)):
+                break
+            time.sleep(0.05)
+        status = worker.get_task_status(task_id)
+        print(f"Cancelled sync: {status['status']}")
+        assert status['status'] in (TaskState.CANCELLED, TaskState.COMPLETED)
+        if status['status'] == TaskState.CANCELLED:
+            assert history_manager.get_last_history_record(repo_id)['total_loc'] == 30
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def test_grouped_registrations_share_one_pass():
+    """같은 저장소의 여러 등록을 묶어 백필/동기화한 결과가 등록별 단독 실행과 같아야 함"""
+    tmp_dir = tempfile.mkdtemp(prefix="cm_group_")
+    db_path = os.path.join(tmp_dir, "group.db")
+    try:
+        origin, clone = _setup(tmp_dir)
+        _commit(origin, "f1.txt", 4, "shrink f1")
+        _git(clone, "pull", "-q")
+        db = DatabaseConnection(db_path)
+        repo_manager = RepositoryManager(db)
+        history_manager = HistoryManager(db)
+        worker = BackfillWorker(db_path)
+        include_paths = [None, "f1.txt", "./f2.txt", None]
+        ids = [repo_manager.add_repository(f"r{i}", clone, path) for i, path in enumerate(include_paths)]
+
+        worker._run_backfill_group([(f"b{i}", repo_id, path, False) for i, (repo_id, path)
+                                    in enumerate(zip(ids[:3], include_paths))], clone)
+        worker._run_backfill_process("single", ids[3], clone, None)
+        totals = [history_manager.get_last_history_record(repo_id)['total_loc'] for repo_id in ids]
+        print(f"Grouped backfill totals: {totals}")
+        assert totals == [24, 4, 10, 24]
+        # f1.txt 등록은 f1을 바꾼 커밋 2개만 기록
+        assert history_manager.get_history_record(ids[1], offset=1) is not None
+        assert history_manager.get_history_record(ids[1], offset=2) is None
+        assert history_manager.get_last_language_totals(ids[0]) == history_manager.get_last_language_totals(ids[3])
+
+        _commit(origin, "f2.txt", 1, "shrink f2")
+        worker._run_sync_group([(f"s{i}", repo_id, path) for i, (repo_id, path)
+                                in enumerate(zip(ids[:3], include_paths))], clone)
+        worker._run_sync_process(ids[3], clone, None)
+        totals = [history_manager.get_last_history_record(repo_id)['total_loc'] for repo_id in ids]
+        print(f"Grouped sync totals: {totals}")
+        assert totals == [15, 4, 1, 15]
+        assert all(repo['status'] == "idle" for repo in repo_manager.get_all_repositories())
+        db.close()
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    test_sync_skips_when_upstream_unchanged()
+    test_sync_skips_when_upstream_tip_is_merge()
+    test_sync_rewinds_rewritten_history()
+    test_backfill_resumes_from_checkpoint()
+    test_pause_resume_and_cancel()
+    test_grouped_registrations_share_one_pass()